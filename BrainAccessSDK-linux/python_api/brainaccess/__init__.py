@@ -4,4 +4,11 @@ __author__ = """neurotechnology"""
 __email__ = 'support@neurotechnology.com'
 __version__ = '3.5.0'
 
-import brainaccess.core
+from brainaccess.utils.exceptions import BrainAccessException
+
+try:
+    import brainaccess.core  # noqa: F401
+except BrainAccessException:
+    # without the core library only brainaccess.connect.processor is usable,
+    # importing brainaccess.core raises the loading error again
+    pass
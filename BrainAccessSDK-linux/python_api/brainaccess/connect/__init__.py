@@ -1,3 +1,4 @@
-from brainaccess.libload import load_library
+from brainaccess.libload import load_optional_library
 
-_dll = load_library("babciconnect")
+# processor falls back to its NumPy backend when the library is missing
+_dll = load_optional_library("babciconnect")
@@ -0,0 +1,222 @@
+"""NumPy/SciPy implementations of the brainaccess.connect.processor functions
+
+Same signatures and outputs as the library backed functions, usable
+without the native library, e.g. in process pools on analysis machines.
+Select them with processor.set_backend("numpy") or call them directly.
+"""
+
+from typing import Optional
+
+import numpy as np
+from scipy import signal
+
+from brainaccess.utils.exceptions import BrainAccessException
+
+# default sampling rate for get_signal_quality
+SIGNAL_QUALITY_SAMPLING_FREQ = 250.0
+# get_signal_quality thresholds, data in microvolts
+MIN_STD_UV = 0.5
+MAX_STD_UV = 200.0
+MAX_PEAK_TO_PEAK_UV = 2000.0
+MAX_LINE_NOISE_RATIO = 0.5
+
+
+def _as_2d(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    return x.reshape((x.shape[0], -1))
+
+
+def _store(result: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """Result in out if given, checked like the library backend does"""
+    if out is None:
+        return result
+    if out.shape != result.shape or out.dtype != np.float64:
+        raise BrainAccessException(
+            f"out must be a float64 array of shape {result.shape}"
+        )
+    out[...] = result
+    return out
+
+
+def get_signal_quality(
+    x: np.ndarray,
+    out: Optional[np.ndarray] = None,
+    sampling_freq: float = SIGNAL_QUALITY_SAMPLING_FREQ,
+) -> np.ndarray:
+    """Signal quality for each channel: 0 bad, 1 amplitude ok, 2 also low line noise
+
+    Approximates the library measure with amplitude limits on the detrended
+    signal and the share of 50/60 Hz power, thresholds are module constants.
+    The levels are not calibrated against the library, which is why
+    processor never falls back to this function on its own.
+    """
+    x = signal.detrend(_as_2d(x), axis=-1)
+    std_ = x.std(axis=-1)
+    peak_to_peak = np.ptp(x, axis=-1)
+    amplitude_ok = (
+        (std_ > MIN_STD_UV) & (std_ < MAX_STD_UV) & (peak_to_peak < MAX_PEAK_TO_PEAK_UV)
+    )
+    freqs = np.fft.rfftfreq(x.shape[1], 1 / sampling_freq)
+    power = np.abs(np.fft.rfft(x, axis=-1)) ** 2
+    line = ((freqs >= 48) & (freqs <= 52)) | ((freqs >= 58) & (freqs <= 62))
+    total = power[:, freqs > 1].sum(axis=-1)
+    line_ratio = np.divide(
+        power[:, line].sum(axis=-1), total, out=np.ones_like(total), where=total > 0
+    )
+    return _store(amplitude_ok * (1.0 + (line_ratio < MAX_LINE_NOISE_RATIO)), out)
+
+
+def detrend(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Remove linear trend from each channel"""
+    return _store(signal.detrend(_as_2d(x), axis=-1, type="linear"), out)
+
+
+def mad(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Median absolute deviation for each channel"""
+    x = _as_2d(x)
+    deviation = np.abs(x - np.median(x, axis=-1, keepdims=True))
+    return _store(np.median(deviation, axis=-1), out)
+
+
+def get_minmax(
+    x: np.ndarray,
+    out_min: Optional[np.ndarray] = None,
+    out_max: Optional[np.ndarray] = None,
+) -> dict[str, np.ndarray]:
+    """Min and max for each channel"""
+    x = _as_2d(x)
+    return {
+        "min": _store(x.min(axis=-1), out_min),
+        "max": _store(x.max(axis=-1), out_max),
+    }
+
+
+def median(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Median for each channel"""
+    return _store(np.median(_as_2d(x), axis=-1), out)
+
+
+def mean(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Mean for each channel"""
+    return _store(_as_2d(x).mean(axis=-1), out)
+
+
+def std(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Population standard deviation for each channel"""
+    return _store(_as_2d(x).std(axis=-1), out)
+
+
+def demean(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Subtract mean from each channel"""
+    x = _as_2d(x)
+    return _store(x - x.mean(axis=-1, keepdims=True), out)
+
+
+def standardize(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Subtract mean and divide by standard deviation for each channel"""
+    x = _as_2d(x)
+    demeaned = x - x.mean(axis=-1, keepdims=True)
+    return _store(demeaned / x.std(axis=-1, keepdims=True), out)
+
+
+def ewma(
+    x: np.ndarray, alpha: float = 0.001, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Exponentially weighted moving average of each channel
+
+    Bias corrected average (pandas ewm with adjust=True), computed with
+    two first order IIR filters.
+    """
+    x = _as_2d(x)
+    decay = [1.0, -(1.0 - alpha)]
+    weighted = signal.lfilter([1.0], decay, x, axis=-1)
+    weights = signal.lfilter([1.0], decay, np.ones(x.shape[1]))
+    return _store(weighted / weights, out)
+
+
+def ewma_standardize(
+    x: np.ndarray,
+    alpha: float = 0.001,
+    epsilon: float = 1e-4,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Exponentially weighted moving average standardization
+
+    Subtracts the moving average and divides by the moving standard
+    deviation, which is bounded below by epsilon.
+    """
+    demeaned = _as_2d(x) - ewma(x, alpha)
+    variance = ewma(demeaned * demeaned, alpha)
+    return _store(demeaned / np.maximum(epsilon, np.sqrt(variance)), out)
+
+
+def _filtfilt(
+    sos: np.ndarray, x: np.ndarray, out: Optional[np.ndarray]
+) -> np.ndarray:
+    return _store(signal.sosfiltfilt(sos, _as_2d(x), axis=-1), out)
+
+
+def filter_notch(
+    x: np.ndarray,
+    sampling_freq: float,
+    center_freq: float,
+    width_freq: float,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Butterworth 4th order zero phase bandstop filter"""
+    sos = signal.butter(
+        4,
+        [center_freq - width_freq / 2, center_freq + width_freq / 2],
+        btype="bandstop",
+        output="sos",
+        fs=sampling_freq,
+    )
+    return _filtfilt(sos, x, out)
+
+
+def filter_bandpass(
+    x: np.ndarray,
+    sampling_freq: float,
+    freq_low: float,
+    freq_high: float,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Butterworth 5th order zero phase bandpass filter"""
+    sos = signal.butter(
+        5, [freq_low, freq_high], btype="bandpass", output="sos", fs=sampling_freq
+    )
+    return _filtfilt(sos, x, out)
+
+
+def filter_highpass(
+    x: np.ndarray, sampling_freq: float, freq: float, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Butterworth 5th order zero phase high-pass filter"""
+    sos = signal.butter(5, freq, btype="highpass", output="sos", fs=sampling_freq)
+    return _filtfilt(sos, x, out)
+
+
+def filter_lowpass(
+    x: np.ndarray, sampling_freq: float, freq: float, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Butterworth 5th order zero phase low-pass filter"""
+    sos = signal.butter(5, freq, btype="lowpass", output="sos", fs=sampling_freq)
+    return _filtfilt(sos, x, out)
+
+
+def fft(
+    x: np.ndarray,
+    sampling_freq: float,
+    out_mag: Optional[np.ndarray] = None,
+    out_phase: Optional[np.ndarray] = None,
+) -> dict:
+    """One sided amplitude spectrum, same frequency grid as processor.fft"""
+    x = _as_2d(x)
+    time_points = x.shape[1]
+    spectrum = np.fft.rfft(x, axis=-1) / time_points
+    freqs = np.linspace(0, sampling_freq / 2, spectrum.shape[1])
+    return {
+        "freq": freqs,
+        "mag": _store(np.abs(spectrum) * 2, out_mag),
+        "phase": _store(np.angle(spectrum), out_phase),
+    }
@@ -1,10 +1,13 @@
 import ctypes
+import functools
 import numpy as np
+from scipy import signal
 
 from typing import Optional
 
+from brainaccess.libload import MissingLibrary
 from brainaccess.utils.exceptions import BrainAccessException
-from brainaccess.connect import _dll
+from brainaccess.connect import _dll, numpy_processor
 
 
 # ctypes
@@ -151,7 +154,133 @@ _dll.ba_bci_connect_minmax.argtypes = [
 _dll.ba_bci_connect_minmax.restype = None
 
 
-def get_signal_quality(x: np.ndarray) -> np.ndarray:
+# backends
+
+BACKENDS = ("library", "numpy")
+_default_backend = "numpy" if isinstance(_dll, MissingLibrary) else "library"
+# only approximated by numpy_processor, never selected without set_backend
+_LIBRARY_DEFAULT = ("get_signal_quality",)
+# function name: selected backend
+_backends: dict[str, str] = {}
+
+
+def _backend_function(f):
+    """Dispatches calls of a library function to the selected backend"""
+    numpy_f = getattr(numpy_processor, f.__name__)
+    if f.__name__ in _LIBRARY_DEFAULT:
+        _backends[f.__name__] = "library"
+    else:
+        _backends[f.__name__] = _default_backend
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        if _backends[f.__name__] == "numpy":
+            return numpy_f(*args, **kwargs)
+        return f(*args, **kwargs)
+
+    return wrapper
+
+
+def set_backend(backend: str, functions: Optional[list[str]] = None) -> None:
+    """Selects the implementation of the signal processing functions
+
+    The "library" backend calls the native bci connect library, the "numpy"
+    backend the NumPy/SciPy implementations in numpy_processor, which need
+    no native library and are the default when it cannot be loaded. The
+    exception is get_signal_quality, the NumPy version only approximates the
+    library measure and has to be selected here explicitly.
+
+    Parameters
+    -----------
+    backend: str
+        "library" or "numpy"
+    functions: list[str], default value = None
+        names of the functions to switch, all functions if None
+
+    """
+    if backend not in BACKENDS:
+        raise BrainAccessException(
+            f"Unknown backend {backend}, expected one of {BACKENDS}"
+        )
+    if backend == "library" and isinstance(_dll, MissingLibrary):
+        raise BrainAccessException(f"Library backend unavailable: {_dll.error}")
+    names = list(_backends) if functions is None else functions
+    unknown = [name for name in names if name not in _backends]
+    if unknown:
+        raise BrainAccessException(f"No backend selection for {unknown}")
+    for name in names:
+        _backends[name] = backend
+
+
+def get_backend(function: str) -> str:
+    """Returns the backend selected for a function
+
+    Parameters
+    -----------
+    function: str
+        function name, e.g. "filter_bandpass"
+
+    Returns
+    --------
+    str
+        "library" or "numpy"
+
+    """
+    if function not in _backends:
+        raise BrainAccessException(f"No backend selection for {function}")
+    return _backends[function]
+
+
+# buffers
+
+
+def _input(x: np.ndarray) -> np.ndarray:
+    """Data as C-contiguous float64, copied only if it is not already"""
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _scratch_input(x: np.ndarray) -> np.ndarray:
+    """Data as a C-contiguous float64 copy, for library functions that take a
+    non-const pointer and may reorder the data (median, mad)"""
+    return np.array(x, dtype=np.float64, order="C")
+
+
+def _pointer(x: np.ndarray):
+    """Pointer to the data of a C-contiguous float64 array, no copy"""
+    return x.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+
+
+def _output(out: Optional[np.ndarray], shape: tuple) -> np.ndarray:
+    """Result array the library writes to, out itself if given"""
+    if out is None:
+        return np.empty(shape)
+    if (
+        out.shape != shape
+        or out.dtype != np.float64
+        or not out.flags.c_contiguous
+        or not out.flags.writeable
+    ):
+        raise BrainAccessException(
+            f"out must be a writeable C-contiguous float64 array of shape {shape}"
+        )
+    return out
+
+
+def _filter_output(x: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """Filters work in place, data is copied once into the result array"""
+    if out is None:
+        return np.array(x, dtype=np.float64, order="C")
+    out = _output(out, x.shape)
+    np.copyto(out, x)
+    return out
+
+
+@_backend_function
+def get_signal_quality(
+    x: np.ndarray,
+    out: Optional[np.ndarray] = None,
+    sampling_freq: float = numpy_processor.SIGNAL_QUALITY_SAMPLING_FREQ,
+) -> np.ndarray:
     """Calculate signal quality for each channel in the data
     This function estimates the EEG signal quality for each
     channel based on amplitude variation and 50/60Hz noise level.
@@ -160,11 +289,17 @@ def get_signal_quality(x: np.ndarray) -> np.ndarray:
     then it means that they are really corrupted or the electrodes
     are not fitted. Eye or muscle artifacts are not evaluated by
     this function, signals containing theses should still pass the quality measures.
+    Without the library this raises BrainAccessException unless the approximate
+    numpy version was selected with set_backend("numpy", ["get_signal_quality"]).
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels,)
+    sampling_freq: float
+        data sampling rate, only used by the numpy backend
 
     Returns
     --------
@@ -174,22 +309,31 @@ def get_signal_quality(x: np.ndarray) -> np.ndarray:
         * 1 - signal passed amplitude related quality measures
         * 2 - signal also do not contain significant amounts of 50/60Hz noise
     """
+    if isinstance(_dll, MissingLibrary):
+        raise BrainAccessException(
+            f"{_dll.error}, select the approximate NumPy signal quality with "
+            'set_backend("numpy", ["get_signal_quality"])'
+        )
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_result = np.ctypeslib.as_ctypes(np.zeros(chans))
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_get_signal_quality(c_arr, chans, time_points, c_result)
-    return np.array(c_result[0:chans])
+    _x = _scratch_input(x)
+    result = _output(out, (chans,))
+    _dll.ba_bci_connect_get_signal_quality(
+        _pointer(_x), chans, time_points, _pointer(result)
+    )
+    return result
 
 
-def detrend(x: np.ndarray) -> np.ndarray:
+@_backend_function
+def detrend(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
     """Remove linear trend from each channel
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time)
 
     Returns
     -----------
@@ -199,20 +343,22 @@ def detrend(x: np.ndarray) -> np.ndarray:
 
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_result = np.ctypeslib.as_ctypes(np.zeros(chans * time_points))
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_detrend(c_arr, chans, time_points, c_result)
-    return np.array(c_result[: chans * time_points]).reshape((chans, time_points))
+    _x = _scratch_input(x)
+    result = _output(out, (chans, time_points))
+    _dll.ba_bci_connect_detrend(_pointer(_x), chans, time_points, _pointer(result))
+    return result
 
 
-def mad(x: np.ndarray) -> np.ndarray:
+@_backend_function
+def mad(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
     """Calculate median absolute deviation for each channel in the data
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels,)
 
     Returns
     --------
@@ -221,20 +367,28 @@ def mad(x: np.ndarray) -> np.ndarray:
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_result = np.ctypeslib.as_ctypes(np.zeros(chans))
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_mad(c_arr, chans, time_points, c_result)
-    return np.array(c_result)
-
-
-def get_minmax(x: np.ndarray) -> dict[str, np.ndarray]:
+    _x = _scratch_input(x)
+    result = _output(out, (chans,))
+    _dll.ba_bci_connect_mad(_pointer(_x), chans, time_points, _pointer(result))
+    return result
+
+
+@_backend_function
+def get_minmax(
+    x: np.ndarray,
+    out_min: Optional[np.ndarray] = None,
+    out_max: Optional[np.ndarray] = None,
+) -> dict[str, np.ndarray]:
     """Calculate min and max for each channel in the data
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out_min: np.ndarray, default value = None
+        preallocated float64 array for the minimums, shape (channels,)
+    out_max: np.ndarray, default value = None
+        preallocated float64 array for the maximums, shape (channels,)
 
     Returns
     --------
@@ -243,25 +397,25 @@ def get_minmax(x: np.ndarray) -> dict[str, np.ndarray]:
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    result = np.zeros(chans)
-    c_result_min = np.ctypeslib.as_ctypes(result.copy())
-    c_result_max = np.ctypeslib.as_ctypes(result.copy())
-    _dll.ba_bci_connect_minmax(c_arr, chans, time_points, c_result_min, c_result_max)
-    return {
-        "min": np.array(c_result_min[0:chans]),
-        "max": np.array(c_result_max[0:chans]),
-    }
+    _x = _scratch_input(x)
+    result_min = _output(out_min, (chans,))
+    result_max = _output(out_max, (chans,))
+    _dll.ba_bci_connect_minmax(
+        _pointer(_x), chans, time_points, _pointer(result_min), _pointer(result_max)
+    )
+    return {"min": result_min, "max": result_max}
 
 
-def median(x: np.ndarray) -> np.ndarray:
+@_backend_function
+def median(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
     """Calculate median for each channel in the data
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels,)
 
     Returns
     --------
@@ -270,21 +424,22 @@ def median(x: np.ndarray) -> np.ndarray:
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    result = np.zeros(chans)
-    c_result = np.ctypeslib.as_ctypes(result)
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_median(c_arr, chans, time_points, c_result)
-    return np.array(c_result[0:chans])
+    _x = _scratch_input(x)
+    result = _output(out, (chans,))
+    _dll.ba_bci_connect_median(_pointer(_x), chans, time_points, _pointer(result))
+    return result
 
 
-def mean(x: np.ndarray) -> np.ndarray:
+@_backend_function
+def mean(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
     """Calculate mean for each channel in the data
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels,)
 
     Returns
     --------
@@ -293,21 +448,22 @@ def mean(x: np.ndarray) -> np.ndarray:
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    result = np.zeros(chans)
-    c_result = np.ctypeslib.as_ctypes(result)
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_mean(c_arr, chans, time_points, c_result)
-    return np.array(c_result[0:chans])
+    _x = _input(x)
+    result = _output(out, (chans,))
+    _dll.ba_bci_connect_mean(_pointer(_x), chans, time_points, _pointer(result))
+    return result
 
 
-def std(x: np.ndarray) -> np.ndarray:
+@_backend_function
+def std(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
     """Calculate standard deviation for each channel in the data
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels,)
 
     Returns
     --------
@@ -316,21 +472,22 @@ def std(x: np.ndarray) -> np.ndarray:
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    result = np.zeros(chans)
-    c_result = np.ctypeslib.as_ctypes(result)
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_std(c_arr, chans, time_points, c_result)
-    return np.array(c_result[0:chans])
+    _x = _input(x)
+    result = _output(out, (chans,))
+    _dll.ba_bci_connect_std(_pointer(_x), chans, time_points, _pointer(result))
+    return result
 
 
-def demean(x: np.ndarray) -> np.ndarray:
+@_backend_function
+def demean(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
     """Subtract mean from each channel
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time)
 
     Returns
     -----------
@@ -340,20 +497,22 @@ def demean(x: np.ndarray) -> np.ndarray:
 
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_result = np.ctypeslib.as_ctypes(np.zeros(chans * time_points))
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_demean(c_arr, chans, time_points, c_result)
-    return np.array(c_result[: chans * time_points]).reshape((chans, time_points))
+    _x = _input(x)
+    result = _output(out, (chans, time_points))
+    _dll.ba_bci_connect_demean(_pointer(_x), chans, time_points, _pointer(result))
+    return result
 
 
-def standardize(x: np.ndarray) -> np.ndarray:
+@_backend_function
+def standardize(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
     """Data standardization
 
     Parameters
     -----------
     x: np.ndarray
         data array, shape (channels, time)
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time)
 
     Returns
     -----------
@@ -364,14 +523,16 @@ def standardize(x: np.ndarray) -> np.ndarray:
 
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_result = np.ctypeslib.as_ctypes(np.zeros(chans * time_points))
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_standartize(c_arr, chans, time_points, c_result)
-    return np.array(c_result[: chans * time_points]).reshape((chans, time_points))
+    _x = _input(x)
+    result = _output(out, (chans, time_points))
+    _dll.ba_bci_connect_standartize(_pointer(_x), chans, time_points, _pointer(result))
+    return result
 
 
-def ewma(x: np.ndarray, alpha: float = 0.001) -> np.ndarray:
+@_backend_function
+def ewma(
+    x: np.ndarray, alpha: float = 0.001, out: Optional[np.ndarray] = None
+) -> np.ndarray:
     """Exponential weighed moving average helper_function
 
     Parameters
@@ -380,6 +541,8 @@ def ewma(x: np.ndarray, alpha: float = 0.001) -> np.ndarray:
         data array, shape (channels, time)
     alpha: float
         new factor
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time)
 
     Returns
     -----------
@@ -389,15 +552,20 @@ def ewma(x: np.ndarray, alpha: float = 0.001) -> np.ndarray:
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_result = np.ctypeslib.as_ctypes(np.zeros(chans * time_points))
-    c_arr = np.ctypeslib.as_ctypes(_x)
-    _dll.ba_bci_connect_ewma(c_arr, chans, time_points, np.float64(alpha), c_result)
-    return np.array(c_result[: chans * time_points]).reshape((chans, time_points))
+    _x = _input(x)
+    result = _output(out, (chans, time_points))
+    _dll.ba_bci_connect_ewma(
+        _pointer(_x), chans, time_points, np.float64(alpha), _pointer(result)
+    )
+    return result
 
 
+@_backend_function
 def ewma_standardize(
-    x: np.ndarray, alpha: float = 0.001, epsilon: float = 1e-4
+    x: np.ndarray,
+    alpha: float = 0.001,
+    epsilon: float = 1e-4,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """Exponential weighed moving average standardization
 
@@ -411,6 +579,8 @@ def ewma_standardize(
         Represents the degree of weighting decrease, a constant smoothing factor between 0 and 1. A higher alpha discounts older observations faster.
     epsilon: float
         Stabilizer for division by zero variance
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time)
 
     Returns
     -----------
@@ -420,17 +590,26 @@ def ewma_standardize(
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_result = np.ctypeslib.as_ctypes(np.zeros(chans * time_points))
-    c_arr = np.ctypeslib.as_ctypes(_x)
+    _x = _input(x)
+    result = _output(out, (chans, time_points))
     _dll.ba_bci_connect_ewma_standartize(
-        c_arr, chans, time_points, np.float64(alpha), np.float64(epsilon), c_result
+        _pointer(_x),
+        chans,
+        time_points,
+        np.float64(alpha),
+        np.float64(epsilon),
+        _pointer(result),
     )
-    return np.array(c_result[: chans * time_points]).reshape((chans, time_points))
+    return result
 
 
+@_backend_function
 def filter_notch(
-    x: np.ndarray, sampling_freq: float, center_freq: float, width_freq: float
+    x: np.ndarray,
+    sampling_freq: float,
+    center_freq: float,
+    width_freq: float,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """Notch filter at desired frequency
 
@@ -446,7 +625,9 @@ def filter_notch(
         notch filter center frequency
     width_freq: float
         notch filter width
-
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time),
+        may be x itself to filter in place
 
     Returns
     -----------
@@ -461,21 +642,25 @@ def filter_notch(
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_arr = np.ctypeslib.as_ctypes(_x)
+    result = _filter_output(x, out)
     _dll.ba_bci_connect_filter_notch(
-        c_arr,
+        _pointer(result),
         ctypes.c_size_t(chans),
         ctypes.c_size_t(time_points),
         ctypes.c_double(sampling_freq),
         ctypes.c_double(center_freq),
         ctypes.c_double(width_freq),
     )
-    return np.array(c_arr[: chans * time_points]).reshape((chans, time_points))
+    return result
 
 
+@_backend_function
 def filter_bandpass(
-    x: np.ndarray, sampling_freq: float, freq_low: float, freq_high: float
+    x: np.ndarray,
+    sampling_freq: float,
+    freq_low: float,
+    freq_high: float,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """Bandpass filter
 
@@ -491,7 +676,9 @@ def filter_bandpass(
         frequency to filter from
     freq_high: float
         frequency to filter to
-
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time),
+        may be x itself to filter in place
 
     Returns
     -----------
@@ -506,20 +693,22 @@ def filter_bandpass(
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_arr = np.ctypeslib.as_ctypes(_x)
+    result = _filter_output(x, out)
     _dll.ba_bci_connect_filter_bandpass(
-        c_arr,
+        _pointer(result),
         ctypes.c_size_t(chans),
         ctypes.c_size_t(time_points),
         ctypes.c_double(sampling_freq),
         ctypes.c_double(freq_low),
         ctypes.c_double(freq_high),
     )
-    return np.array(c_arr[: chans * time_points]).reshape((chans, time_points))
+    return result
 
 
-def filter_highpass(x: np.ndarray, sampling_freq: float, freq: float) -> np.ndarray:
+@_backend_function
+def filter_highpass(
+    x: np.ndarray, sampling_freq: float, freq: float, out: Optional[np.ndarray] = None
+) -> np.ndarray:
     """High-pass filter
 
     Butterworth 5th order zero phase high-pass filter
@@ -532,6 +721,9 @@ def filter_highpass(x: np.ndarray, sampling_freq: float, freq: float) -> np.ndar
         data sampling rate
     freq: float
         edge frequency
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time),
+        may be x itself to filter in place
 
     Returns
     -----------
@@ -546,19 +738,21 @@ def filter_highpass(x: np.ndarray, sampling_freq: float, freq: float) -> np.ndar
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_arr = np.ctypeslib.as_ctypes(_x)
+    result = _filter_output(x, out)
     _dll.ba_bci_connect_filter_highpass(
-        c_arr,
+        _pointer(result),
         ctypes.c_size_t(chans),
         ctypes.c_size_t(time_points),
         ctypes.c_double(sampling_freq),
         ctypes.c_double(freq),
     )
-    return np.array(c_arr[: chans * time_points]).reshape((chans, time_points))
+    return result
 
 
-def filter_lowpass(x: np.ndarray, sampling_freq: float, freq: float) -> np.ndarray:
+@_backend_function
+def filter_lowpass(
+    x: np.ndarray, sampling_freq: float, freq: float, out: Optional[np.ndarray] = None
+) -> np.ndarray:
     """Low-pass filter
 
     Butterworth 5th order zero phase low-pass filter
@@ -571,6 +765,9 @@ def filter_lowpass(x: np.ndarray, sampling_freq: float, freq: float) -> np.ndarr
         data sampling rate
     freq: float
         edge frequency
+    out: np.ndarray, default value = None
+        preallocated float64 result array, shape (channels, time),
+        may be x itself to filter in place
 
     Returns
     -----------
@@ -585,19 +782,24 @@ def filter_lowpass(x: np.ndarray, sampling_freq: float, freq: float) -> np.ndarr
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_arr = np.ctypeslib.as_ctypes(_x)
+    result = _filter_output(x, out)
     _dll.ba_bci_connect_filter_lowpass(
-        c_arr,
+        _pointer(result),
         ctypes.c_size_t(chans),
         ctypes.c_size_t(time_points),
         ctypes.c_double(sampling_freq),
         ctypes.c_double(freq),
     )
-    return np.array(c_arr[: chans * time_points]).reshape((chans, time_points))
+    return result
 
 
-def fft(x: np.ndarray, sampling_freq: float) -> dict:
+@_backend_function
+def fft(
+    x: np.ndarray,
+    sampling_freq: float,
+    out_mag: Optional[np.ndarray] = None,
+    out_phase: Optional[np.ndarray] = None,
+) -> dict:
     """Compute the discrete Fourier Transform (DFT) with the efficient Fast Fourier Transform (FFT) algorithm
 
     Parameters
@@ -606,6 +808,10 @@ def fft(x: np.ndarray, sampling_freq: float) -> dict:
         data array, shape (channels, time)
     sampling_freq: float
         data sampling rate
+    out_mag: np.ndarray, default value = None
+        preallocated float64 array for the amplitudes, shape (channels, freqs)
+    out_phase: np.ndarray, default value = None
+        preallocated float64 array for the phases, shape (channels, freqs)
 
     Returns
     -----------
@@ -618,20 +824,21 @@ def fft(x: np.ndarray, sampling_freq: float) -> dict:
     """
     chans = x.shape[0]
     time_points = x.shape[1]
-    _x = x.copy().ravel(order="C").astype(np.float64)
-    c_arr = np.ctypeslib.as_ctypes(_x)
+    _x = _input(x)
     n_time_steps = (time_points - (time_points % 2)) // 2 + 1
-    c_result_mag = np.ctypeslib.as_ctypes(np.zeros(chans * n_time_steps))
-    c_result_phase = np.ctypeslib.as_ctypes(np.zeros(chans * n_time_steps))
+    mags = _output(out_mag, (chans, n_time_steps))
+    phases = _output(out_phase, (chans, n_time_steps))
     _dll.ba_bci_connect_fft(
-        c_arr, chans, time_points, sampling_freq, c_result_mag, c_result_phase
+        _pointer(_x),
+        chans,
+        time_points,
+        sampling_freq,
+        _pointer(mags),
+        _pointer(phases),
     )
     freqs = np.linspace(0, sampling_freq / 2, n_time_steps)
-    mags = np.array(c_result_mag[: chans * n_time_steps]).reshape((chans, n_time_steps))
-    phases = np.array(c_result_phase[: chans * n_time_steps]).reshape(
-        (chans, n_time_steps)
-    )
-    return {"freq": freqs, "mag": mags * 2, "phase": phases}
+    mags *= 2
+    return {"freq": freqs, "mag": mags, "phase": phases}
 
 
 def cut_into_epochs(
@@ -639,9 +846,13 @@ def cut_into_epochs(
     sfreq: float,
     epoch_length: Optional[float] = None,
     overlap: float = 0.5,
+    copy: bool = False,
 ) -> np.ndarray:
     """Cut data into epochs
 
+    Epochs are strided windows over data, only epochs fully inside the data
+    are returned.
+
     Args:
       data: np.ndarray: (n_channels, n_times)
       sfreq: float:
@@ -650,6 +861,8 @@ def cut_into_epochs(
         length of epoch in seconds
       overlap: float:  (Default value = 0.0)
         ratio of overlap between epochs
+      copy: bool:  (Default value = False)
+        return a contiguous copy instead of a read-only view into data
 
     Returns:
       output: np.ndarray: (n_epochs, n_channels, n_times)
@@ -659,7 +872,6 @@ def cut_into_epochs(
         data = data.reshape((1, -1))
     if data.ndim > 2:
         raise BrainAccessException("data must be 1D or 2D")
-    n_channels = data.shape[0]
     n_times = data.shape[1]
     if epoch_length is None:
         _epoch_length = n_times / sfreq
@@ -672,16 +884,17 @@ def cut_into_epochs(
         overlap = 1 - overlap
     else:
         overlap = 1
-    n_epochs = int(np.floor(n_times / _epoch_length / overlap))
-    epochs = np.zeros((n_epochs, n_channels, _epoch_length))
-    for idx, _ in enumerate(epochs):
-        dat = data[
-            :,
-            int(idx * _epoch_length * overlap) : int(idx * _epoch_length * overlap)
-            + _epoch_length,
-        ]
-        if dat.shape[1] == _epoch_length:
-            epochs[idx] = dat
+    step = max(round(_epoch_length * overlap), 1)
+    if _epoch_length < 1 or n_times < _epoch_length:
+        epochs = np.zeros((0, data.shape[0], max(_epoch_length, 0)), dtype=data.dtype)
+    else:
+        # (n_channels, n_epochs, n_times) view, no data is copied
+        windows = np.lib.stride_tricks.sliding_window_view(
+            data, _epoch_length, axis=1
+        )[:, ::step]
+        epochs = windows.transpose((1, 0, 2))
+    if copy:
+        return np.ascontiguousarray(epochs)
     return epochs
 
 
@@ -691,6 +904,7 @@ def get_bands(
     epoch_length: Optional[float] = None,
     overlap: float = 0.1,
     normalize: bool = False,
+    method: str = "fft",
 ):
     """EEG power in delta, theta, alpha, beta and gamma frequency bands for each channel
 
@@ -706,6 +920,9 @@ def get_bands(
         Ratio of overlap between epochs
       normalize: bool:  (Default value = False)
         Normalize power in each frequency band by total power
+      method: str:  (Default value = "fft")
+        "fft" for the squared FFT magnitude of each epoch or "welch" for a
+        Welch PSD of each epoch, see get_pow_freq_bands
 
     Returns:
         output: dict:
@@ -718,20 +935,16 @@ def get_bands(
     """
     # cut into epochs to average out noise
     data = cut_into_epochs(data, sfreq, epoch_length=epoch_length, overlap=overlap)
-    # calculate power in each frequency band
-    _bands = []
-    for epoch in data:
-        epoch = demean(epoch)
-        _bands.append(
-            get_pow_freq_bands(
-                epoch,
-                sfreq,
-                freq_bands=np.array([0.5, 4.0, 8.0, 13.0, 30.0, 100.0]),
-                normalize=normalize,
-            )
-        )
+    # power in each frequency band of all epochs at once
+    bands = get_pow_freq_bands(
+        data,
+        sfreq,
+        freq_bands=np.array([0.5, 4.0, 8.0, 13.0, 30.0, 100.0]),
+        normalize=normalize,
+        demean_epochs=True,
+        method=method,
+    )
     # average over epochs
-    bands = np.array(_bands)
     bands = np.mean(bands, axis=0)
     return {
         "delta": list(bands[:, 0]),
@@ -742,16 +955,88 @@ def get_bands(
     }
 
 
+@functools.lru_cache(maxsize=32)
+def _band_masks(n_times: int, sfreq: float, freq_bands: tuple) -> np.ndarray:
+    """Float (n_bands, n_freqs) masks selecting FFT bins of each frequency band,
+    band edges are inclusive"""
+    n_freqs = (n_times - (n_times % 2)) // 2 + 1
+    freqs = np.linspace(0, sfreq / 2, n_freqs)
+    edges = np.asarray(freq_bands, dtype=np.float64)
+    masks = (freqs >= edges[:-1, None]) & (freqs <= edges[1:, None])
+    masks = masks.astype(np.float64)
+    masks.flags.writeable = False
+    return masks
+
+
+@functools.lru_cache(maxsize=32)
+def _welch_plan(
+    n_times: int, sfreq: float, freq_bands: tuple, segment_length: int
+) -> tuple:
+    """Hann window, segment step and count, density weights and band masks
+    of a Welch PSD
+
+    Weights include the PSD scaling, the frequency resolution and the
+    one-sided doubling, so band power is the mean segment periodogram times
+    the masks and total power the periodogram times the weights.
+    """
+    window = signal.get_window("hann", segment_length)
+    step = segment_length - segment_length // 2
+    n_segments = (n_times - segment_length) // step + 1
+    freqs = np.fft.rfftfreq(segment_length, 1 / sfreq)
+    edges = np.asarray(freq_bands, dtype=np.float64)
+    masks = (freqs >= edges[:-1, None]) & (freqs <= edges[1:, None])
+    weights = np.full(freqs.shape, 2.0)
+    weights[0] = 1.0
+    if segment_length % 2 == 0:
+        weights[-1] = 1.0
+    # power spectral density times the bin width
+    weights /= np.sum(window**2) * segment_length
+    masks = masks * weights
+    for array in (window, weights, masks):
+        array.flags.writeable = False
+    return window, step, n_segments, weights, masks
+
+
+def _welch_band_power(
+    rows: np.ndarray, sfreq: float, freq_bands: tuple, segment_length: Optional[int]
+) -> tuple:
+    """Band power and total power of each row from a Welch PSD"""
+    n_times = rows.shape[-1]
+    if segment_length is None:
+        segment_length = int(sfreq)
+    segment_length = max(1, min(segment_length, n_times))
+    window, step, n_segments, weights, masks = _welch_plan(
+        n_times, sfreq, freq_bands, segment_length
+    )
+    # (rows, segments, segment_length) view, no data is copied
+    segments = np.lib.stride_tricks.sliding_window_view(
+        rows, segment_length, axis=-1
+    )[:, ::step][:, :n_segments]
+    segments = segments - segments.mean(axis=-1, keepdims=True)
+    segments *= window
+    periodogram = np.abs(np.fft.rfft(segments, axis=-1))
+    periodogram **= 2
+    periodogram = periodogram.mean(axis=1)
+    return periodogram @ masks.T, periodogram @ weights
+
+
 def get_pow_freq_bands(
     data: np.ndarray,
     sfreq: float,
     freq_bands: np.ndarray = np.array([0.5, 4.0, 8.0, 13.0, 30.0, 100.0]),
     normalize: bool = False,
+    demean_epochs: bool = False,
+    method: str = "fft",
+    segment_length: Optional[int] = None,
 ) -> np.ndarray:
     """Power Spectrum (computed by frequency bands).
 
+    Data of several epochs is processed with a single FFT call. Windows,
+    segment plans and band masks are cached per (n_times, sfreq, freq_bands),
+    so repeated calls on equally sized windows only compute the FFTs.
+
     Args:
-      data: np.ndarray: (n_channels, n_times)
+      data: np.ndarray: (n_channels, n_times) or (n_epochs, n_channels, n_times)
       sfreq: float:
         sampling frequency
       freq_bands: np.ndarray:  (Default value = np.array([0.5, 4.0, 8.0, 13.0, 30.0,
@@ -759,27 +1044,44 @@ def get_pow_freq_bands(
         frequency intervals defining bands: delta, theta, alpha, beta, gamma (default)
       normalize: bool:  (Default value = True)
         normalize power in each frequency band by total power
+      demean_epochs: bool:  (Default value = False)
+        subtract the mean of each channel before the FFT
+      method: str:  (Default value = "fft")
+        "fft": squared FFT magnitude of the whole window summed over each band
+        "welch": Welch PSD (Hann windowed, 50% overlapping segments, each
+        demeaned) integrated over each band, less noisy at lower resolution
+      segment_length: Optional[int]:  (Default value = None)
+        Welch segment length in samples, one second if None
 
     Returns:
       output: ndarray, shape (n_channels, (len(freq_bands)- 1),)
+        or (n_epochs, n_channels, (len(freq_bands)- 1),) for 3D data
 
     """
-    n_channels = data.shape[0]
-    fb = np.zeros((len(freq_bands) - 1, 2))
-    for idx, x in enumerate(freq_bands[:-1]):
-        fb[idx, 0] = x
-        fb[idx, 1] = freq_bands[idx + 1]
-    n_freq_bands = fb.shape[0]
+    if method not in ("fft", "welch"):
+        raise BrainAccessException(f"Unknown method {method}, use fft or welch")
+    n_times = data.shape[-1]
+    bands = tuple(np.asarray(freq_bands, dtype=np.float64))
+    n_bands = len(bands) - 1
+    rows = data.reshape((-1, n_times))
+    if rows.shape[0] == 0:
+        return np.zeros(data.shape[:-1] + (n_bands,))
+    if method == "welch":
+        # segments are demeaned anyway
+        pow_freq_bands, total = _welch_band_power(
+            rows, float(sfreq), bands, segment_length
+        )
+        if normalize:
+            pow_freq_bands = np.divide(pow_freq_bands, total[:, None])
+        return pow_freq_bands.reshape(data.shape[:-1] + (n_bands,))
+    masks = _band_masks(n_times, float(sfreq), bands)
+    if demean_epochs:
+        rows = demean(rows)
     # fft
-    fft_data = fft(data, sfreq)
-    freqs = fft_data["freq"]
-    psd = fft_data["mag"] ** 2
+    psd = fft(rows, sfreq)["mag"]
+    psd **= 2
     # power in each frequency band
-    pow_freq_bands = np.empty((n_channels, n_freq_bands))
-    for j in range(n_freq_bands):
-        mask = np.logical_and(freqs >= fb[j, 0], freqs <= fb[j, 1])
-        psd_band = psd[:, mask]
-        pow_freq_bands[:, j] = np.sum(psd_band, axis=-1)
+    pow_freq_bands = psd @ masks.T
     if normalize:
         pow_freq_bands = np.divide(pow_freq_bands, np.sum(psd, axis=-1)[:, None])
-    return pow_freq_bands
+    return pow_freq_bands.reshape(data.shape[:-1] + (masks.shape[0],))
@@ -0,0 +1,171 @@
+import typing
+
+import numpy as np
+from scipy import signal
+
+from brainaccess.utils.exceptions import BrainAccessException
+
+
+class StreamFilter:
+    """Causal IIR filter for live data
+
+    Butterworth filters in second order sections that are applied chunk by
+    chunk, carrying the filter state (zi) from one chunk to the next, so every
+    chunk costs the same regardless of how long the stream has been running
+    and the output equals filtering the whole stream at once.
+
+    Unlike the zero phase filters in brainaccess.connect.processor the output
+    is causal and therefore has the phase delay of the filter.
+    """
+
+    def __init__(self, sos: np.ndarray) -> None:
+        """
+        Parameters
+        ------------
+        sos: np.ndarray
+            second order sections, shape (n_sections, 6)
+
+        """
+        self.sos = np.atleast_2d(np.asarray(sos, dtype=np.float64))
+        if self.sos.ndim != 2 or self.sos.shape[1] != 6:
+            raise BrainAccessException("sos must have shape (n_sections, 6)")
+        self._zi_step = signal.sosfilt_zi(self.sos)
+        self._zi: typing.Optional[np.ndarray] = None
+
+    @classmethod
+    def bandpass(
+        cls, sampling_freq: float, freq_low: float, freq_high: float, order: int = 5
+    ) -> "StreamFilter":
+        """Butterworth bandpass filter
+
+        Parameters
+        -----------
+        sampling_freq: float
+            data sampling rate
+        freq_low: float
+            frequency to filter from
+        freq_high: float
+            frequency to filter to
+        order: int
+            filter order
+
+        """
+        return cls(
+            signal.butter(
+                order,
+                [freq_low, freq_high],
+                btype="bandpass",
+                output="sos",
+                fs=sampling_freq,
+            )
+        )
+
+    @classmethod
+    def notch(
+        cls,
+        sampling_freq: float,
+        center_freq: float,
+        width_freq: float,
+        order: int = 4,
+    ) -> "StreamFilter":
+        """Butterworth bandstop filter around center_freq
+
+        Parameters
+        -----------
+        sampling_freq: float
+            data sampling rate
+        center_freq: float
+            notch filter center frequency
+        width_freq: float
+            notch filter width
+        order: int
+            filter order
+
+        """
+        return cls(
+            signal.butter(
+                order,
+                [center_freq - width_freq / 2, center_freq + width_freq / 2],
+                btype="bandstop",
+                output="sos",
+                fs=sampling_freq,
+            )
+        )
+
+    @classmethod
+    def highpass(
+        cls, sampling_freq: float, freq: float, order: int = 5
+    ) -> "StreamFilter":
+        """Butterworth high-pass filter
+
+        Parameters
+        -----------
+        sampling_freq: float
+            data sampling rate
+        freq: float
+            edge frequency
+        order: int
+            filter order
+
+        """
+        return cls(
+            signal.butter(order, freq, btype="highpass", output="sos", fs=sampling_freq)
+        )
+
+    @classmethod
+    def lowpass(
+        cls, sampling_freq: float, freq: float, order: int = 5
+    ) -> "StreamFilter":
+        """Butterworth low-pass filter
+
+        Parameters
+        -----------
+        sampling_freq: float
+            data sampling rate
+        freq: float
+            edge frequency
+        order: int
+            filter order
+
+        """
+        return cls(
+            signal.butter(order, freq, btype="lowpass", output="sos", fs=sampling_freq)
+        )
+
+    @classmethod
+    def chain(cls, *filters: "StreamFilter") -> "StreamFilter":
+        """Single filter applying the given filters one after another"""
+        return cls(np.vstack([f.sos for f in filters]))
+
+    def reset(self) -> None:
+        """Forgets the state, the next chunk starts a new stream"""
+        self._zi = None
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Filters the next chunk of the stream
+
+        Parameters
+        -----------
+        chunk: np.ndarray
+            data chunk, shape (channels, time)
+
+        Returns
+        -----------
+        np.ndarray
+            filtered chunk, shape (channels, time)
+
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim == 1:
+            chunk = chunk.reshape((1, -1))
+        if chunk.shape[1] == 0:
+            return chunk.copy()
+        if self._zi is None:
+            # steady state for the first sample avoids a step transient
+            self._zi = self._zi_step[:, np.newaxis, :] * chunk[np.newaxis, :, :1]
+        elif self._zi.shape[1] != chunk.shape[0]:
+            raise BrainAccessException(
+                f"Expected {self._zi.shape[1]} channels, got {chunk.shape[0]}"
+            )
+        out, self._zi = signal.sosfilt(self.sos, chunk, axis=-1, zi=self._zi)
+        return out
@@ -0,0 +1,468 @@
+"""Python stand-in for the bacore library
+
+Implements the bacore functions used by brainaccess.core and
+brainaccess.core.eeg_manager with a simulated device that streams synthetic
+EEG from brainaccess.utils.synthetic, so EEGManager and acquisition.EEG can
+be run end to end without a device or the native library. It is loaded in
+place of bacore when the BRAINACCESS_FAKE_CORE environment variable is set
+before brainaccess is imported, e.g.:
+    BRAINACCESS_FAKE_CORE=1 python -m unittest discover -s tests
+
+Functions take and return the same values as the library functions called
+through ctypes: callbacks are called through their ctypes prototypes and
+chunks are passed as per channel buffers of the stream channel data types.
+"""
+
+import ctypes
+import threading
+import typing
+
+import numpy as np
+
+from brainaccess.utils.synthetic import SyntheticEEG, SyntheticStream
+
+# brainaccess.core.eeg_channel, not imported as it needs the loaded library
+SAMPLE_NUMBER = 0
+ELECTRODE_MEASUREMENT = 1
+DIGITAL_INPUT = 2049
+ACCELEROMETER = 2561
+
+# stream channel data types, indexes of eeg_manager._types_map
+_FLOAT, _UINT8, _SIZE_T, _DOUBLE = 0, 1, 2, 3
+_DATA_TYPES = [ctypes.c_float, ctypes.c_uint8, ctypes.c_size_t, ctypes.c_double]
+
+# brainaccess.core.gain_mode.GainMode values and their multipliers
+_GAIN_MULTIPLIERS = {2: 4, 3: 6, 4: 8, 5: 12}
+_GAIN_UNKNOWN = 0xFF
+
+_ERROR_OK = 0
+_ERROR_CONNECTION = 1
+_ERROR_WRONG_VALUE = 3
+
+_NOT_IN_STREAM = ctypes.c_size_t(-1).value
+_FEATURES_HANDLE = 1
+
+
+def _value(arg):
+    """Python value of an argument that may be passed as a ctypes object"""
+    if isinstance(arg, ctypes._SimpleCData):
+        return arg.value
+    return arg
+
+
+def _target(arg):
+    """Object an output argument from ctypes.byref or ctypes.pointer points to"""
+    if isinstance(arg, ctypes._Pointer):
+        return arg.contents
+    return arg._obj
+
+
+def _store_pointer(arg, buffer) -> None:
+    """Points an output pointer argument to buffer"""
+    ctypes.c_void_p.from_address(ctypes.addressof(_target(arg))).value = (
+        ctypes.addressof(buffer)
+    )
+
+
+class _FakeFunction:
+    """Library function, argtypes and restype can be declared like on ctypes"""
+
+    def __init__(self, function: typing.Callable) -> None:
+        self.function = function
+        self.argtypes = None
+        self.restype = None
+
+    def __call__(self, *args):
+        return self.function(*args)
+
+
+class _Manager:
+    """State of a simulated EEG manager and its device"""
+
+    def __init__(self, handle: int) -> None:
+        self.handle = handle
+        self.connected = False
+        self.stream: typing.Optional[SyntheticStream] = None
+        self.chunk_callback = None
+        self.chunk_user_data = None
+        self.disconnect_callback = None
+        self.disconnect_user_data = None
+        self.battery_callback = None
+        self.battery_user_data = None
+        self.enabled: typing.Set[int] = set()
+        self.stream_channels: typing.List[int] = []
+        self.gains: typing.Dict[int, int] = {}
+        self.bias: typing.Dict[int, int] = {}
+        self.impedance_mode = 0
+        self.last_sample = 0
+        self.annotations: typing.List[typing.Tuple[int, bytes]] = []
+        self.lock = threading.Lock()
+        # buffers returned through output pointers must outlive the call
+        self.keep: dict = {}
+
+
+class FakeBacore:
+    """Simulated bacore library with one device.
+
+    The device streams the sample number, the electrodes, an optional
+    accelerometer and a digital input, in the order of get_channel_index.
+    Electrodes carry SyntheticEEG signals in microvolts, sent by a
+    SyntheticStream thread at the device rate like the library reader thread
+    does, including lost chunks if a dropout rate is set. Annotations are
+    stamped with the latest sent sample number.
+    """
+
+    def __init__(
+        self,
+        device_name: str = "BA MAXI 000",
+        device_model: int = 2,
+        electrodes: int = 32,
+        sfreq: int = 250,
+        has_accel: bool = True,
+        chunk_size: int = 10,
+        dropout_rate: float = 0.0,
+        signal: typing.Optional[dict] = None,
+        seed: typing.Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        ------------
+        device_name: str
+            name found by scan, at most 19 characters
+        device_model: int
+            brainaccess.core.device_model.DeviceModel value, 2 is MAXI
+        electrodes: int
+            number of electrodes
+        sfreq: int
+            sampling frequency in Hz
+        has_accel: bool
+            whether the accelerometer channels are streamed
+        chunk_size: int
+            default samples per chunk, changed by config_set_chunk_size
+        dropout_rate: float
+            probability that a chunk is lost
+        signal: dict, default value = None
+            keyword arguments of SyntheticEEG, e.g. alpha or blink_rate
+        seed: int, default value = None
+            random seed of the signal and dropouts
+
+        """
+        self.device_name = device_name
+        self.device_model = device_model
+        self.electrodes = electrodes
+        self.sfreq = sfreq
+        self.has_accel = has_accel
+        self.chunk_size = chunk_size
+        self.dropout_rate = dropout_rate
+        self.signal = dict(signal or {})
+        self.seed = seed
+        self.initialized = False
+        self._managers: typing.Dict[int, _Manager] = {}
+        self._next_handle = 1
+        self._keep: dict = {}
+        # channels of the device and their stream data types, in stream order
+        self.device_channels = {SAMPLE_NUMBER: _SIZE_T}
+        for i in range(electrodes):
+            self.device_channels[ELECTRODE_MEASUREMENT + i] = _DOUBLE
+        if has_accel:
+            for i in range(3):
+                self.device_channels[ACCELEROMETER + i] = _FLOAT
+        self.device_channels[DIGITAL_INPUT] = _UINT8
+        for name in dir(self):
+            if name.startswith("ba_"):
+                setattr(self, name, _FakeFunction(getattr(self, name)))
+
+    # brainaccess.core
+
+    def ba_core_init(self) -> int:
+        self.initialized = True
+        return _ERROR_OK
+
+    def ba_core_close(self) -> None:
+        for manager in list(self._managers.values()):
+            self._stop_stream(manager)
+        self.initialized = False
+
+    def ba_core_get_version(self):
+        from brainaccess.core.version import Version
+
+        version = self._keep["version"] = Version(3, 5, 0)
+        return ctypes.pointer(version)
+
+    def ba_core_device_count(self) -> int:
+        return 1
+
+    def ba_core_device_get_name(self, buffer, index) -> None:
+        if _value(index) == 0:
+            buffer.value = self.device_name.encode("utf-8")[: len(buffer) - 1]
+
+    def ba_core_device_get_address(self, buffer, index) -> None:
+        if _value(index) == 0:
+            buffer.value = b"00:00:00:00:00:00"
+
+    def ba_core_scan(self, adapter_index) -> int:
+        return _ERROR_OK
+
+    def ba_core_config_set_log_level(self, log_level) -> int:
+        return _ERROR_OK
+
+    def ba_core_config_set_chunk_size(self, chunk_size) -> int:
+        if _value(chunk_size) < 1:
+            return 1
+        self.chunk_size = _value(chunk_size)
+        return _ERROR_OK
+
+    def ba_core_config_enable_logging(self, enable) -> int:
+        return _ERROR_OK
+
+    def ba_core_set_core_log_path(self, file_path, append, buffer_size) -> int:
+        return _ERROR_OK
+
+    def ba_core_config_timestamp(self, enable) -> int:
+        return _ERROR_OK
+
+    def ba_core_config_autoflush(self, enable) -> int:
+        return _ERROR_OK
+
+    def ba_core_config_thread_id(self, enable) -> int:
+        return _ERROR_OK
+
+    def ba_core_config_set_update_path(self, file_path) -> int:
+        return _ERROR_OK
+
+    def ba_is_version_compatible(self, expected, actual) -> bool:
+        return _target(expected).major == _target(actual).major
+
+    def ba_gain_mode_to_multiplier(self, gain_mode) -> int:
+        return _GAIN_MULTIPLIERS.get(_value(gain_mode), -1)
+
+    def ba_multiplier_to_gain_mode(self, multiplier) -> int:
+        for gain_mode, value in _GAIN_MULTIPLIERS.items():
+            if value == _value(multiplier):
+                return gain_mode
+        return _GAIN_UNKNOWN
+
+    # brainaccess.core.device_features
+
+    def ba_core_device_features_get(self, device_info) -> typing.Optional[int]:
+        if _target(device_info)._device_model != self.device_model:
+            return None
+        return _FEATURES_HANDLE
+
+    def ba_core_device_features_has_gyro(self, handle) -> bool:
+        return False
+
+    def ba_core_device_features_has_accel(self, handle) -> bool:
+        return self.has_accel
+
+    def ba_core_device_features_is_bipolar(self, handle) -> bool:
+        return False
+
+    def ba_core_device_features_electrode_count(self, handle) -> int:
+        return self.electrodes
+
+    # brainaccess.core.eeg_manager
+
+    def ba_eeg_manager_new(self) -> int:
+        handle = self._next_handle
+        self._next_handle += 1
+        self._managers[handle] = _Manager(handle)
+        return handle
+
+    def ba_eeg_manager_free(self, handle) -> None:
+        manager = self._managers.pop(_value(handle))
+        self._stop_stream(manager)
+
+    def ba_eeg_manager_connect(self, handle, device_index, callback, user_data) -> int:
+        manager = self._managers[_value(handle)]
+        manager.connected = _value(device_index) == 0
+        callback(manager.connected, user_data)
+        return _ERROR_OK if manager.connected else _ERROR_CONNECTION
+
+    def ba_eeg_manager_is_connected(self, handle) -> bool:
+        return self._managers[_value(handle)].connected
+
+    def ba_eeg_manager_disconnect(self, handle) -> None:
+        manager = self._managers[_value(handle)]
+        self._stop_stream(manager)
+        manager.connected = False
+        with manager.lock:
+            manager.annotations = []
+
+    def ba_eeg_manager_start_stream(self, handle, callback, user_data) -> int:
+        manager = self._managers[_value(handle)]
+        if not manager.connected:
+            return _ERROR_CONNECTION
+        if manager.stream is not None:
+            return _ERROR_WRONG_VALUE
+        generator = SyntheticEEG(
+            n_channels=self.electrodes, sfreq=self.sfreq, seed=self.seed, **self.signal
+        )
+        manager.last_sample = 0
+        manager.stream_channels = self._stream_channels(manager)
+        manager.keep["stream_types"] = (ctypes.c_uint8 * len(manager.stream_channels))(
+            *[self.device_channels[channel] for channel in manager.stream_channels]
+        )
+        manager.stream = SyntheticStream(
+            lambda chunk, chunk_size: self._send_chunk(manager, chunk, chunk_size),
+            generator,
+            chunk_size=self.chunk_size,
+            dropout_rate=self.dropout_rate,
+            seed=self.seed,
+        )
+        manager.stream.start()
+        callback(user_data)
+        return _ERROR_OK
+
+    def ba_eeg_manager_stop_stream(self, handle, callback, user_data) -> int:
+        manager = self._managers[_value(handle)]
+        if manager.stream is None:
+            return _ERROR_WRONG_VALUE
+        self._stop_stream(manager)
+        callback(user_data)
+        return _ERROR_OK
+
+    def ba_eeg_manager_is_streaming(self, handle) -> bool:
+        return self._managers[_value(handle)].stream is not None
+
+    def ba_eeg_manager_load_config(self, handle, callback, user_data) -> int:
+        callback(user_data)
+        return _ERROR_OK
+
+    def ba_eeg_manager_get_battery_info(self, handle):
+        from brainaccess.core.battery_info import BatteryInfo
+
+        return BatteryInfo(100, False, False)
+
+    def ba_eeg_manager_set_channel_enabled(self, handle, channel, state) -> None:
+        enabled = self._managers[_value(handle)].enabled
+        if _value(state):
+            enabled.add(_value(channel))
+        else:
+            enabled.discard(_value(channel))
+
+    def ba_eeg_manager_set_channel_gain(self, handle, channel, gain) -> None:
+        self._managers[_value(handle)].gains[_value(channel)] = _value(gain)
+
+    def ba_eeg_manager_set_channel_bias(self, handle, channel, polarity) -> None:
+        self._managers[_value(handle)].bias[_value(channel)] = _value(polarity)
+
+    def ba_eeg_manager_set_impedance_mode(self, handle, mode) -> None:
+        self._managers[_value(handle)].impedance_mode = _value(mode)
+
+    def ba_eeg_manager_get_device_info(self, handle):
+        from brainaccess.core.device_info import DeviceInfo
+        from brainaccess.core.version import Version
+
+        manager = self._managers[_value(handle)]
+        info = manager.keep["device_info"] = DeviceInfo(
+            self.device_model, Version(1, 0, 0), Version(1, 0, 0), 1
+        )
+        return ctypes.pointer(info)
+
+    def ba_eeg_manager_get_channel_index(self, handle, channel) -> int:
+        manager = self._managers[_value(handle)]
+        if manager.stream is None:
+            stream_channels = self._stream_channels(manager)
+        else:
+            stream_channels = manager.stream_channels
+        try:
+            return stream_channels.index(_value(channel))
+        except ValueError:
+            return _NOT_IN_STREAM
+
+    def ba_eeg_manager_get_sample_frequency(self, handle) -> int:
+        return self.sfreq
+
+    def ba_eeg_manager_set_callback_chunk(self, handle, callback, user_data) -> None:
+        manager = self._managers[_value(handle)]
+        with manager.lock:
+            manager.chunk_callback = callback
+            manager.chunk_user_data = user_data
+
+    def ba_eeg_manager_set_callback_battery(self, handle, callback, user_data) -> None:
+        manager = self._managers[_value(handle)]
+        manager.battery_callback = callback
+        manager.battery_user_data = user_data
+
+    def ba_eeg_manager_set_callback_disconnect(
+        self, handle, callback, user_data
+    ) -> None:
+        manager = self._managers[_value(handle)]
+        manager.disconnect_callback = callback
+        manager.disconnect_user_data = user_data
+
+    def ba_eeg_manager_start_update(self, handle, callback, user_data) -> int:
+        callback(user_data, 1, 1)
+        return _ERROR_OK
+
+    def ba_eeg_manager_annotate(self, handle, annotation) -> int:
+        manager = self._managers[_value(handle)]
+        with manager.lock:
+            manager.annotations.append((manager.last_sample, _value(annotation)))
+        return _ERROR_OK
+
+    def ba_eeg_manager_get_annotations(self, handle, annotations, size) -> None:
+        from brainaccess.core.annotation import Annotation
+
+        manager = self._managers[_value(handle)]
+        with manager.lock:
+            stored = list(manager.annotations)
+        array = (Annotation * max(len(stored), 1))(*stored)
+        manager.keep["annotations"] = array
+        _store_pointer(annotations, array)
+        _target(size).value = len(stored)
+
+    def ba_eeg_manager_clear_annotations(self, handle) -> None:
+        manager = self._managers[_value(handle)]
+        with manager.lock:
+            manager.annotations = []
+
+    def ba_eeg_manager_get_stream_channel_data_types(self, handle, types, size) -> None:
+        stream_types = self._managers[_value(handle)].keep["stream_types"]
+        _store_pointer(types, stream_types)
+        _target(size).value = len(stream_types)
+
+    # simulated device
+
+    def disconnect_device(self, handle: int) -> None:
+        """Simulates losing the connection, calls the disconnect callback"""
+        manager = self._managers[handle]
+        self._stop_stream(manager)
+        manager.connected = False
+        if manager.disconnect_callback is not None:
+            manager.disconnect_callback(manager.disconnect_user_data)
+
+    def _stream_channels(self, manager: _Manager) -> typing.List[int]:
+        """The sample number and the enabled channels, in stream order"""
+        return [
+            channel
+            for channel in self.device_channels
+            if channel == SAMPLE_NUMBER or channel in manager.enabled
+        ]
+
+    def _stop_stream(self, manager: _Manager) -> None:
+        stream, manager.stream = manager.stream, None
+        if stream is not None:
+            stream.stop()
+
+    def _send_chunk(
+        self, manager: _Manager, chunk: np.ndarray, chunk_size: int
+    ) -> None:
+        """Passes a synthetic chunk to the chunk callback as the library does"""
+        buffers = []
+        for channel in manager.stream_channels:
+            data_type = np.dtype(_DATA_TYPES[self.device_channels[channel]])
+            if channel == SAMPLE_NUMBER:
+                buffers.append(chunk[0].astype(data_type))
+            elif channel < ELECTRODE_MEASUREMENT + self.electrodes:
+                buffers.append(chunk[channel].astype(data_type))
+            else:
+                # motionless device, no digital input
+                buffers.append(np.zeros(chunk_size, dtype=data_type))
+        pointers = (ctypes.c_void_p * len(buffers))(*[b.ctypes.data for b in buffers])
+        with manager.lock:
+            manager.last_sample = int(chunk[0, -1])
+            callback, user_data = manager.chunk_callback, manager.chunk_user_data
+        if callback is not None:
+            callback(pointers, chunk_size, user_data)
@@ -0,0 +1,102 @@
+import typing
+import numpy as np
+
+
+class SampleGapDetector:
+    """Detects lost samples from the device sample counter.
+
+    Every chunk is checked with a single vectorized difference of its
+    Sample channel, including the step from the last sample of the
+    previous chunk, so dropouts between chunks are found as well.
+    """
+
+    def __init__(self, sample_row: typing.Optional[int] = None) -> None:
+        """
+        Parameters
+        ------------
+        sample_row: int, default value = None
+            chunk row of the Sample channel, chunks are not checked until set
+
+        """
+        self.sample_row = sample_row
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears counters and detected gaps"""
+        self.received = 0
+        self.missing = 0
+        self.discontinuities = 0
+        self.gaps: typing.List[typing.Tuple[int, int]] = []
+        self._last: typing.Optional[int] = None
+
+    def check(self, chunk: np.ndarray) -> int:
+        """Checks the continuity of a chunk
+
+        Parameters
+        ------------
+        chunk: np.ndarray
+            data chunk, shape (channels, samples)
+
+        Returns
+        --------
+        int
+            number of samples missing before and inside the chunk
+        """
+        if self.sample_row is None:
+            return 0
+        numbers = np.asarray(chunk[self.sample_row]).astype(np.int64)
+        if numbers.size == 0:
+            return 0
+        self.received += numbers.size
+        if self._last is None:
+            previous = numbers[:-1]
+            steps = np.diff(numbers)
+        else:
+            previous = np.concatenate(([self._last], numbers[:-1]))
+            steps = np.diff(numbers, prepend=self._last)
+        self._last = int(numbers[-1])
+        jumps = np.flatnonzero(steps != 1)
+        if jumps.size == 0:
+            return 0
+        lost = steps[jumps] > 1
+        # repeated or reset counters cannot tell how much was lost
+        self.discontinuities += int(np.count_nonzero(~lost))
+        starts = previous[jumps][lost] + 1
+        missing = steps[jumps][lost] - 1
+        self.gaps.extend(zip(starts.tolist(), missing.tolist()))
+        total = int(missing.sum())
+        self.missing += total
+        return total
+
+    def annotations(self) -> dict:
+        """Gaps as annotations placed at the first missing sample number
+
+        Returns
+        --------
+        dict
+            annotations and timestamps lists, as returned by
+            EEGManager.get_annotations
+        """
+        gaps = list(self.gaps)
+        return {
+            "annotations": [f"Gap: {missing} samples lost" for _, missing in gaps],
+            "timestamps": [start for start, _ in gaps],
+        }
+
+    def stats(self) -> dict:
+        """Returns loss counters
+
+        Returns
+        --------
+        dict
+            received and missing sample counts, number of gaps,
+            counter discontinuities (repeats or resets) and lost fraction
+        """
+        expected = self.received + self.missing
+        return {
+            "received": self.received,
+            "missing": self.missing,
+            "gaps": len(self.gaps),
+            "discontinuities": self.discontinuities,
+            "loss_ratio": self.missing / expected if expected else 0.0,
+        }
@@ -0,0 +1,142 @@
+import tempfile
+import threading
+import time
+from unittest import TestCase, skipIf
+
+import mne
+import numpy as np
+
+from brainaccess.utils.checkpoint import RecordingCheckpointer, merge_segments
+
+try:
+    from brainaccess.utils.acquisition import EEGData
+except Exception:
+    # importing brainaccess fails when libbacore cannot be loaded
+    EEGData = None
+
+CHANNELS = 4
+SFREQ = 250
+FIRST_SAMPLE = 1000
+
+
+class _Acquisition:
+    """The parts of acquisition.EEG used by the checkpointer"""
+
+    mode = "accumulate"
+    precision = "double"
+
+    def __init__(self) -> None:
+        ch_names = [f"EEG{idx}" for idx in range(CHANNELS)] + ["Sample"]
+        ch_types = ["eeg"] * CHANNELS + ["syst"]
+        self.info = mne.create_info(ch_names, SFREQ, ch_types=ch_types)
+        self.data = EEGData(self.info, threading.Lock(), precision="double")
+        # stream rows differ from the info order
+        self.channels_indexes = {idx: (idx + 1) % 5 for idx in range(5)}
+        self.annotations = {"annotations": [], "timestamps": []}
+        self.sample = FIRST_SAMPLE
+        self.rng = np.random.default_rng(0)
+
+    def push(self, samples: int) -> None:
+        chunk = np.zeros((5, samples))
+        chunk[1:] = self.rng.normal(size=(CHANNELS, samples))
+        chunk[0] = np.arange(self.sample, self.sample + samples)
+        self.sample += samples
+        self.data.append(chunk)
+
+    def annotate(self, msg: str) -> None:
+        self.annotations["annotations"].append(msg)
+        self.annotations["timestamps"].append(self.sample - 1)
+
+    def get_annotations(self) -> dict:
+        self.data.annotations = {
+            key: list(value) for key, value in self.annotations.items()
+        }
+        return self.data.annotations
+
+
+@skipIf(EEGData is None, "BrainAccess core library not available")
+class TestRecordingCheckpointer(TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.eeg = _Acquisition()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_merged_segments_equal_recording(self) -> None:
+        checkpointer = RecordingCheckpointer(
+            self.eeg, f"{self.tmp_dir.name}/segments", interval=None
+        )
+        checkpointer.start()
+        for index in range(5):
+            self.eeg.push(300)
+            self.eeg.annotate(f"BLOCK_{index}")
+            self.eeg.push(200)
+            checkpointer.checkpoint()
+        self.assertIsNone(checkpointer.checkpoint())
+        self.eeg.push(100)
+        checkpointer.stop()
+        self.assertEqual(len(checkpointer.segments), 6)
+
+        merged = merge_segments(
+            f"{self.tmp_dir.name}/segments",
+            f"{self.tmp_dir.name}/merged_raw.fif",
+            precision="double",
+        )
+        self.eeg.get_annotations()
+        self.eeg.data.convert_to_mne(
+            channels_indexes=list(self.eeg.channels_indexes.values())
+        )
+        expected = self.eeg.data.mne_raw
+        np.testing.assert_array_equal(merged.get_data(), expected.get_data())
+        np.testing.assert_allclose(merged.annotations.onset, expected.annotations.onset)
+        self.assertEqual(
+            list(merged.annotations.description), [f"BLOCK_{i}" for i in range(5)]
+        )
+        saved = mne.io.read_raw_fif(
+            f"{self.tmp_dir.name}/merged_raw.fif", verbose=False
+        )
+        self.assertEqual(saved.n_times, expected.n_times)
+
+    def test_late_annotation_written_once(self) -> None:
+        checkpointer = RecordingCheckpointer(
+            self.eeg, f"{self.tmp_dir.name}/segments", interval=None
+        )
+        checkpointer.start()
+        self.eeg.push(500)
+        self.eeg.annotate("EARLY")
+        checkpointer.checkpoint()
+        # stamped with the last sample of the written segment
+        self.eeg.annotate("LATE")
+        self.eeg.push(200)
+        self.eeg.annotate("NEXT")
+        checkpointer.checkpoint()
+        self.eeg.push(100)
+        checkpointer.stop()
+
+        merged = merge_segments(
+            f"{self.tmp_dir.name}/segments",
+            f"{self.tmp_dir.name}/merged_raw.fif",
+            precision="double",
+        )
+        self.assertEqual(
+            list(merged.annotations.description), ["EARLY", "LATE", "NEXT"]
+        )
+        # the late annotation starts the segment after the one it was stamped in
+        positions = self.eeg.data.zeros_at_start + np.array([499, 500, 699])
+        np.testing.assert_allclose(merged.annotations.onset, positions / SFREQ)
+
+    def test_requested_checkpoint_runs_in_background(self) -> None:
+        checkpointer = RecordingCheckpointer(
+            self.eeg, f"{self.tmp_dir.name}/segments", interval=None
+        )
+        checkpointer.start()
+        self.eeg.push(250)
+        checkpointer.request()
+        deadline = time.monotonic() + 2.0
+        while not checkpointer.segments and time.monotonic() < deadline:
+            time.sleep(0.01)
+        checkpointer.stop(final=False)
+        self.assertEqual(len(checkpointer.segments), 1)
+        checkpointer.remove()
+        self.assertEqual(list(checkpointer.directory.parent.iterdir()), [])
@@ -0,0 +1,84 @@
+import threading
+import time
+import warnings
+from unittest import TestCase
+
+from brainaccess.utils.chunk_queue import ChunkQueue
+
+
+class TestChunkQueue(TestCase):
+    def setUp(self) -> None:
+        self.delivered: list = []
+        self.queue = ChunkQueue(
+            lambda chunk, size: self.delivered.append((chunk, size)), maxsize=4
+        )
+
+    def tearDown(self) -> None:
+        self.queue.stop()
+
+    def test_full_queue_drops_incoming_chunks(self) -> None:
+        # no consumer yet, the queue fills up
+        accepted = [self.queue.put(index, 10) for index in range(7)]
+        self.assertEqual(accepted, [True] * 4 + [False] * 3)
+        self.assertEqual(len(self.queue), 4)
+        self.queue.start()
+        self.assertTrue(self.queue.join())
+        # queued chunks are kept, the ones arriving while full are lost
+        self.assertEqual(self.delivered, [(index, 10) for index in range(4)])
+        self.assertEqual(
+            self.queue.stats(),
+            {
+                "received": 7,
+                "delivered": 4,
+                "dropped": 3,
+                "size": 0,
+                "high_water_mark": 4,
+            },
+        )
+
+    def test_delivers_in_order(self) -> None:
+        self.queue.start()
+        for index in range(50):
+            while not self.queue.put(index, 1):
+                time.sleep(0.001)
+        self.assertTrue(self.queue.join())
+        self.assertEqual([chunk for chunk, _ in self.delivered], list(range(50)))
+
+    def test_stop_drains_queue(self) -> None:
+        release = threading.Event()
+
+        def slow(chunk, size) -> None:
+            release.wait()
+            self.delivered.append(chunk)
+
+        queue = ChunkQueue(slow, maxsize=8)
+        queue.start()
+        for index in range(5):
+            queue.put(index, 1)
+        self.assertFalse(queue.join(timeout=0.05))
+        release.set()
+        queue.stop()
+        self.assertEqual(self.delivered, list(range(5)))
+        self.assertEqual(queue.stats()["delivered"], 5)
+        self.assertIsNone(queue._thread)
+
+    def test_failing_callback_does_not_stop_consumer(self) -> None:
+        def failing(chunk, size) -> None:
+            if chunk == 1:
+                raise RuntimeError("callback failed")
+            self.delivered.append(chunk)
+
+        queue = ChunkQueue(failing)
+        queue.start()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            for index in range(3):
+                queue.put(index, 1)
+            self.assertTrue(queue.join())
+            queue.stop()
+        self.assertEqual(self.delivered, [0, 2])
+        self.assertEqual(len(caught), 1)
+
+    def test_rejects_empty_queue(self) -> None:
+        with self.assertRaises(ValueError):
+            ChunkQueue(print, maxsize=0)
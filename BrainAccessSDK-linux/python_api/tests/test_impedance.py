@@ -0,0 +1,58 @@
+from unittest import TestCase
+
+import numpy as np
+
+from brainaccess.utils.impedance import (
+    BOARD_RESISTOR_OHMS,
+    IMPEDANCE_DRIVE_AMPS,
+    ImpedanceEstimator,
+    impedance_from_std,
+)
+
+SFREQ = 250
+SECONDS = 8
+
+
+def _drive_signal(amplitudes_uv: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """31.2 Hz drive signal on slow drift and noise, rows: Sample, electrodes"""
+    t = np.arange(SECONDS * SFREQ) / SFREQ
+    drive = amplitudes_uv[:, None] * np.sin(2 * np.pi * 31.2 * t)
+    drift = 500.0 * np.sin(2 * np.pi * 0.2 * t)
+    noise = rng.normal(scale=1.0, size=drive.shape)
+    sample = np.arange(t.size, dtype=np.float64)[None]
+    return np.concatenate((sample, drive + drift + noise))
+
+
+class TestImpedanceEstimator(TestCase):
+    def test_impedance_from_std(self) -> None:
+        ohms = np.array([10e3, 100.0])
+        std = (ohms + BOARD_RESISTOR_OHMS) * IMPEDANCE_DRIVE_AMPS / np.sqrt(2) * 1e6
+        np.testing.assert_allclose(impedance_from_std(std), [10.0, 0.1])
+        self.assertEqual(impedance_from_std(np.array([0.0]))[0], 0)
+
+    def test_streaming_matches_window_std(self) -> None:
+        amplitudes = np.array([100.0, 400.0, 1000.0])
+        data = _drive_signal(amplitudes, np.random.default_rng(0))
+        estimator = ImpedanceEstimator(SFREQ, rows=[1, 2, 3], window=1.0)
+        self.assertIsNone(estimator.impedances())
+        for start in range(0, data.shape[1], 10):
+            estimator.update(data[:, start : start + 10])
+        self.assertEqual(estimator.samples, data.shape[1])
+        # the sine amplitude over sqrt(2), drift and noise are filtered out
+        np.testing.assert_allclose(estimator.std(), amplitudes / np.sqrt(2), rtol=0.05)
+        np.testing.assert_allclose(
+            estimator.impedances(),
+            impedance_from_std(amplitudes / np.sqrt(2)),
+            rtol=0.05,
+        )
+
+    def test_chunk_size_does_not_matter(self) -> None:
+        data = _drive_signal(np.array([200.0]), np.random.default_rng(1))
+        results = []
+        for chunk_size in (1, 7, 50):
+            estimator = ImpedanceEstimator(SFREQ, rows=[1], window=2.0)
+            for start in range(0, data.shape[1], chunk_size):
+                estimator.update(data[:, start : start + chunk_size])
+            results.append(estimator.std())
+        np.testing.assert_allclose(results[1], results[0])
+        np.testing.assert_allclose(results[2], results[0])
@@ -0,0 +1,413 @@
+from unittest import TestCase, skipIf
+
+import numpy as np
+from scipy import signal
+
+from brainaccess.connect import numpy_processor, processor
+from brainaccess.libload import MissingLibrary
+
+LIBRARY_AVAILABLE = not isinstance(processor._dll, MissingLibrary)
+
+CHANNELS = 4
+SFREQ = 250
+SAMPLES = 3 * SFREQ
+
+
+def _create_signal(rng: np.random.Generator) -> np.ndarray:
+    t = np.arange(SAMPLES) / SFREQ
+    eeg = rng.normal(scale=10.0, size=(CHANNELS, SAMPLES))
+    eeg += 20.0 * np.sin(2 * np.pi * 10 * t)
+    eeg += 15.0 * np.sin(2 * np.pi * 50 * t)
+    return eeg + np.linspace(0, 30, SAMPLES)
+
+
+class TestNumpyBackend(TestCase):
+    def setUp(self) -> None:
+        self.x = _create_signal(np.random.default_rng(0))
+
+    def test_statistics(self) -> None:
+        x = self.x
+        np.testing.assert_allclose(numpy_processor.mean(x), x.mean(axis=1))
+        np.testing.assert_allclose(numpy_processor.std(x), x.std(axis=1))
+        np.testing.assert_allclose(numpy_processor.median(x), np.median(x, axis=1))
+        minmax = numpy_processor.get_minmax(x)
+        np.testing.assert_allclose(minmax["min"], x.min(axis=1))
+        np.testing.assert_allclose(minmax["max"], x.max(axis=1))
+        deviation = np.abs(x - np.median(x, axis=1)[:, None])
+        np.testing.assert_allclose(
+            numpy_processor.mad(x), np.median(deviation, axis=1)
+        )
+
+    def test_detrend_removes_line(self) -> None:
+        trend = np.vstack([np.linspace(-5, 5, 100), np.linspace(3, 1, 100)])
+        np.testing.assert_allclose(numpy_processor.detrend(trend), 0, atol=1e-12)
+
+    def test_standardize(self) -> None:
+        z = numpy_processor.standardize(self.x)
+        np.testing.assert_allclose(z.mean(axis=1), 0, atol=1e-12)
+        np.testing.assert_allclose(z.std(axis=1), 1)
+
+    def test_ewma_matches_adjusted_average(self) -> None:
+        x = self.x[:, :200]
+        alpha = 0.05
+        expected = np.empty_like(x)
+        for n in range(x.shape[1]):
+            weights = (1 - alpha) ** np.arange(n, -1, -1)
+            expected[:, n] = x[:, : n + 1] @ weights / weights.sum()
+        np.testing.assert_allclose(numpy_processor.ewma(x, alpha), expected)
+
+    def test_ewma_standardize_bounded_by_epsilon(self) -> None:
+        constant = np.full((2, 100), 7.0)
+        np.testing.assert_allclose(
+            numpy_processor.ewma_standardize(constant, 0.1, 1e-4), 0, atol=1e-8
+        )
+        z = numpy_processor.ewma_standardize(self.x, 0.01)
+        self.assertEqual(z.shape, self.x.shape)
+        self.assertLess(np.abs(z[:, SFREQ:]).max(), 10)
+
+    def test_filters(self) -> None:
+        x = numpy_processor.detrend(self.x)
+        freqs = np.fft.rfftfreq(SAMPLES, 1 / SFREQ)
+        index_10 = np.argmin(np.abs(freqs - 10))
+        index_50 = np.argmin(np.abs(freqs - 50))
+
+        def amplitude(y: np.ndarray, index: int) -> float:
+            return float(np.abs(np.fft.rfft(y, axis=1))[:, index].mean())
+
+        notched = numpy_processor.filter_notch(x, SFREQ, 50, 4)
+        self.assertLess(amplitude(notched, index_50), 0.05 * amplitude(x, index_50))
+        self.assertGreater(amplitude(notched, index_10), 0.9 * amplitude(x, index_10))
+        lowpassed = numpy_processor.filter_lowpass(x, SFREQ, 30)
+        self.assertLess(amplitude(lowpassed, index_50), 0.05 * amplitude(x, index_50))
+        highpassed = numpy_processor.filter_highpass(x, SFREQ, 30)
+        self.assertLess(amplitude(highpassed, index_10), 0.05 * amplitude(x, index_10))
+        bandpassed = numpy_processor.filter_bandpass(x, SFREQ, 5, 15)
+        self.assertLess(amplitude(bandpassed, index_50), 0.05 * amplitude(x, index_50))
+        sos = signal.butter(5, [5, 15], btype="bandpass", output="sos", fs=SFREQ)
+        np.testing.assert_allclose(bandpassed, signal.sosfiltfilt(sos, x, axis=1))
+
+    def test_fft_amplitude(self) -> None:
+        t = np.arange(SAMPLES) / SFREQ
+        x = np.vstack([3.0 * np.sin(2 * np.pi * 10 * t), np.ones(SAMPLES)])
+        result = numpy_processor.fft(x, SFREQ)
+        self.assertEqual(result["mag"].shape, (2, SAMPLES // 2 + 1))
+        self.assertAlmostEqual(result["freq"][-1], SFREQ / 2)
+        self.assertAlmostEqual(result["mag"][0, 30], 3.0)
+        self.assertAlmostEqual(result["mag"][1, 0], 2.0)
+
+    def test_out_arrays(self) -> None:
+        out = np.empty(CHANNELS)
+        self.assertIs(numpy_processor.mean(self.x, out=out), out)
+        np.testing.assert_allclose(out, self.x.mean(axis=1))
+        filtered = np.empty_like(self.x)
+        result = numpy_processor.filter_lowpass(self.x, SFREQ, 30, out=filtered)
+        self.assertIs(result, filtered)
+        n_freqs = SAMPLES // 2 + 1
+        mag, phase = np.empty((CHANNELS, n_freqs)), np.empty((CHANNELS, n_freqs))
+        result = numpy_processor.fft(self.x, SFREQ, out_mag=mag, out_phase=phase)
+        self.assertIs(result["mag"], mag)
+        self.assertIs(result["phase"], phase)
+        with self.assertRaises(processor.BrainAccessException):
+            numpy_processor.std(self.x, out=np.empty(CHANNELS + 1))
+
+    def test_signal_quality(self) -> None:
+        rng = np.random.default_rng(1)
+        t = np.arange(SAMPLES) / SFREQ
+        clean = rng.normal(scale=10.0, size=SAMPLES)
+        noisy = clean + 100.0 * np.sin(2 * np.pi * 50 * t)
+        flat = np.zeros(SAMPLES)
+        quality = numpy_processor.get_signal_quality(np.vstack([clean, noisy, flat]))
+        np.testing.assert_array_equal(quality, [2, 1, 0])
+
+    def test_signal_quality_sampling_freq(self) -> None:
+        rng = np.random.default_rng(1)
+        sfreq = 2 * SFREQ
+        t = np.arange(3 * sfreq) / sfreq
+        clean = rng.normal(scale=10.0, size=len(t))
+        noisy = clean + 100.0 * np.sin(2 * np.pi * 50 * t)
+        quality = numpy_processor.get_signal_quality(
+            [clean, noisy], sampling_freq=sfreq
+        )
+        np.testing.assert_array_equal(quality, [2, 1])
+        # read as 250 Hz data the line noise falls at 25 Hz
+        quality = numpy_processor.get_signal_quality([clean, noisy])
+        np.testing.assert_array_equal(quality, [2, 2])
+
+    def test_list_input(self) -> None:
+        x = self.x[:, :10]
+        np.testing.assert_allclose(numpy_processor.mean(x.tolist()), x.mean(axis=1))
+        np.testing.assert_allclose(
+            numpy_processor.detrend(x.tolist()), numpy_processor.detrend(x)
+        )
+
+
+class TestBackendSelection(TestCase):
+    def setUp(self) -> None:
+        self.backends = dict(processor._backends)
+
+    def tearDown(self) -> None:
+        processor._backends.update(self.backends)
+
+    def test_numpy_backend_dispatch(self) -> None:
+        processor.set_backend("numpy", ["mean"])
+        self.assertEqual(processor.get_backend("mean"), "numpy")
+        x = _create_signal(np.random.default_rng(2))
+        np.testing.assert_allclose(processor.mean(x), x.mean(axis=1))
+        bands = processor.get_bands(x, SFREQ, epoch_length=1.0)
+        self.assertEqual(len(bands["alpha"]), CHANNELS)
+
+    def test_unknown_backend(self) -> None:
+        with self.assertRaises(processor.BrainAccessException):
+            processor.set_backend("cuda")
+        with self.assertRaises(processor.BrainAccessException):
+            processor.set_backend("numpy", ["cut_into_epochs"])
+
+    @skipIf(LIBRARY_AVAILABLE, "bci connect library available")
+    def test_numpy_default_without_library(self) -> None:
+        self.assertEqual(processor.get_backend("filter_bandpass"), "numpy")
+        with self.assertRaises(processor.BrainAccessException):
+            processor.set_backend("library")
+
+    @skipIf(LIBRARY_AVAILABLE, "bci connect library available")
+    def test_no_signal_quality_fallback(self) -> None:
+        x = _create_signal(np.random.default_rng(2))
+        self.assertEqual(processor.get_backend("get_signal_quality"), "library")
+        with self.assertRaises(processor.BrainAccessException):
+            processor.get_signal_quality(x)
+        processor.set_backend("numpy", ["get_signal_quality"])
+        np.testing.assert_array_equal(
+            processor.get_signal_quality(x, sampling_freq=SFREQ),
+            numpy_processor.get_signal_quality(x, sampling_freq=SFREQ),
+        )
+
+
+def _loop_epochs(x: np.ndarray, length: int, step: int) -> np.ndarray:
+    """Epochs sliced one window at a time"""
+    starts = range(0, x.shape[1] - length + 1, step)
+    return np.array([x[:, start : start + length] for start in starts])
+
+
+class TestEpochs(TestCase):
+    def setUp(self) -> None:
+        self.x = _create_signal(np.random.default_rng(6))
+
+    def test_matches_window_loop(self) -> None:
+        for epoch_length, overlap in [
+            (1.0, 0.5),
+            (1.0, 0.0),
+            (0.7, 0.9),
+            (0.5, 0.25),
+            (3.0, 0.5),
+        ]:
+            with self.subTest(epoch_length=epoch_length, overlap=overlap):
+                length = int(epoch_length * SFREQ)
+                step = max(round(length * (1 - overlap)), 1)
+                epochs = processor.cut_into_epochs(
+                    self.x, SFREQ, epoch_length, overlap=overlap
+                )
+                np.testing.assert_array_equal(
+                    epochs, _loop_epochs(self.x, length, step)
+                )
+
+    def test_view_and_copy(self) -> None:
+        epochs = processor.cut_into_epochs(self.x, SFREQ, 1.0)
+        self.assertTrue(np.shares_memory(epochs, self.x))
+        self.assertFalse(epochs.flags.writeable)
+        copied = processor.cut_into_epochs(self.x, SFREQ, 1.0, copy=True)
+        self.assertTrue(copied.flags.c_contiguous)
+        self.assertFalse(np.shares_memory(copied, self.x))
+        np.testing.assert_array_equal(copied, epochs)
+
+    def test_shorter_than_epoch(self) -> None:
+        epochs = processor.cut_into_epochs(self.x[:, :100], SFREQ, 1.0)
+        self.assertEqual(epochs.shape, (0, CHANNELS, SFREQ))
+
+
+class TestBatchedBands(TestCase):
+    """Band powers of all epochs at once equal the per epoch computation"""
+
+    bands = np.array([0.5, 4.0, 8.0, 13.0, 30.0, 100.0])
+
+    def setUp(self) -> None:
+        self.x = _create_signal(np.random.default_rng(7))
+
+    def _per_epoch(self, normalize: bool) -> np.ndarray:
+        epochs = processor.cut_into_epochs(self.x, SFREQ, 1.0, overlap=0.1)
+        return np.array(
+            [
+                processor.get_pow_freq_bands(
+                    processor.demean(epoch), SFREQ, self.bands, normalize=normalize
+                )
+                for epoch in epochs
+            ]
+        )
+
+    def test_get_pow_freq_bands(self) -> None:
+        epochs = processor.cut_into_epochs(self.x, SFREQ, 1.0, overlap=0.1)
+        for normalize in (False, True):
+            with self.subTest(normalize=normalize):
+                batched = processor.get_pow_freq_bands(
+                    epochs, SFREQ, self.bands, normalize=normalize, demean_epochs=True
+                )
+                np.testing.assert_allclose(batched, self._per_epoch(normalize))
+
+    def test_get_bands(self) -> None:
+        for normalize in (False, True):
+            with self.subTest(normalize=normalize):
+                bands = processor.get_bands(
+                    self.x, SFREQ, epoch_length=1.0, normalize=normalize
+                )
+                expected = self._per_epoch(normalize).mean(axis=0)
+                for index, name in enumerate(
+                    ["delta", "theta", "alpha", "beta", "gamma"]
+                ):
+                    np.testing.assert_allclose(bands[name], expected[:, index])
+
+
+class TestWelchBandPower(TestCase):
+    bands = np.array([0.5, 4.0, 8.0, 13.0, 30.0, 100.0])
+
+    def setUp(self) -> None:
+        self.x = _create_signal(np.random.default_rng(4))
+
+    def _reference(self, x: np.ndarray) -> np.ndarray:
+        freqs, psd = signal.welch(x, SFREQ, nperseg=SFREQ)
+        df = freqs[1] - freqs[0]
+        return np.stack(
+            [
+                psd[..., (freqs >= low) & (freqs <= high)].sum(axis=-1) * df
+                for low, high in zip(self.bands[:-1], self.bands[1:])
+            ],
+            axis=-1,
+        )
+
+    def test_matches_scipy_welch(self) -> None:
+        power = processor.get_pow_freq_bands(
+            self.x, SFREQ, self.bands, method="welch"
+        )
+        np.testing.assert_allclose(power, self._reference(self.x))
+        self.assertEqual(int(np.argmax(power[0])), 2)
+
+    def test_epochs_reuse_plan(self) -> None:
+        epochs = processor.cut_into_epochs(self.x, SFREQ, 2.0, overlap=0.5)
+        processor._welch_plan.cache_clear()
+        power = processor.get_pow_freq_bands(epochs, SFREQ, self.bands, method="welch")
+        processor.get_pow_freq_bands(epochs, SFREQ, self.bands, method="welch")
+        self.assertEqual(processor._welch_plan.cache_info().misses, 1)
+        self.assertEqual(power.shape, (len(epochs), CHANNELS, 5))
+        np.testing.assert_allclose(power[1], self._reference(epochs[1]))
+
+    def test_normalize(self) -> None:
+        power = processor.get_pow_freq_bands(
+            self.x, SFREQ, np.array([0.0, SFREQ / 2]), normalize=True, method="welch"
+        )
+        np.testing.assert_allclose(power, 1.0)
+
+
+class TestInputUnchanged(TestCase):
+    """No function modifies its input, the library ones get a copy where the
+    library takes a non-const pointer"""
+
+    functions = [
+        ("get_signal_quality", ()),
+        ("detrend", ()),
+        ("mad", ()),
+        ("get_minmax", ()),
+        ("median", ()),
+        ("mean", ()),
+        ("std", ()),
+        ("demean", ()),
+        ("standardize", ()),
+        ("ewma", (0.01,)),
+        ("ewma_standardize", (0.01, 1e-4)),
+        ("filter_bandpass", (SFREQ, 1, 40)),
+        ("fft", (SFREQ,)),
+    ]
+
+    def setUp(self) -> None:
+        self.backends = dict(processor._backends)
+
+    def tearDown(self) -> None:
+        processor._backends.update(self.backends)
+
+    def _check(self, backend: str) -> None:
+        x = _create_signal(np.random.default_rng(5))
+        expected = x.copy()
+        for name, args in self.functions:
+            with self.subTest(backend=backend, function=name):
+                processor.set_backend(backend, [name])
+                getattr(processor, name)(x, *args)
+                np.testing.assert_array_equal(x, expected)
+
+    def test_numpy(self) -> None:
+        self._check("numpy")
+
+    @skipIf(not LIBRARY_AVAILABLE, "bci connect library not available")
+    def test_library(self) -> None:
+        self._check("library")
+
+
+@skipIf(not LIBRARY_AVAILABLE, "bci connect library not available")
+class TestBackendParity(TestCase):
+    """Both backends give the same results, signal quality is only approximated
+    by the numpy backend and is not compared"""
+
+    def setUp(self) -> None:
+        self.x = _create_signal(np.random.default_rng(3))
+
+    def tearDown(self) -> None:
+        processor.set_backend("library")
+
+    def _both(self, name: str, *args) -> tuple:
+        processor.set_backend("library", [name])
+        library = getattr(processor, name)(self.x, *args)
+        processor.set_backend("numpy", [name])
+        return library, getattr(processor, name)(self.x, *args)
+
+    def test_array_functions(self) -> None:
+        for name, args in [
+            ("detrend", ()),
+            ("mad", ()),
+            ("median", ()),
+            ("mean", ()),
+            ("std", ()),
+            ("demean", ()),
+            ("standardize", ()),
+            ("ewma", (0.01,)),
+            ("ewma_standardize", (0.01, 1e-4)),
+            ("filter_notch", (SFREQ, 50, 4)),
+            ("filter_bandpass", (SFREQ, 1, 40)),
+            ("filter_highpass", (SFREQ, 1)),
+            ("filter_lowpass", (SFREQ, 40)),
+        ]:
+            with self.subTest(name):
+                library, numpy = self._both(name, *args)
+                np.testing.assert_allclose(numpy, library, rtol=1e-6, atol=1e-6)
+
+    def test_dict_functions(self) -> None:
+        for name, args, keys in [
+            ("get_minmax", (), ("min", "max")),
+            ("fft", (SFREQ,), ("freq", "mag")),
+        ]:
+            library, numpy = self._both(name, *args)
+            for key in keys:
+                with self.subTest(name, key=key):
+                    np.testing.assert_allclose(
+                        numpy[key], library[key], rtol=1e-6, atol=1e-6
+                    )
+
+    def test_out_arrays(self) -> None:
+        processor.set_backend("library")
+        filtered = np.empty_like(self.x)
+        result = processor.filter_bandpass(self.x, SFREQ, 1, 40, out=filtered)
+        self.assertIs(result, filtered)
+        np.testing.assert_allclose(
+            filtered, processor.filter_bandpass(self.x, SFREQ, 1, 40)
+        )
+        in_place = self.x.copy()
+        processor.filter_bandpass(in_place, SFREQ, 1, 40, out=in_place)
+        np.testing.assert_allclose(in_place, filtered)
+        out = np.empty(CHANNELS)
+        self.assertIs(processor.std(self.x, out=out), out)
+        with self.assertRaises(processor.BrainAccessException):
+            processor.std(self.x, out=np.empty(CHANNELS, dtype=np.float32))
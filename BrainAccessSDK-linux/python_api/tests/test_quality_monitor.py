@@ -0,0 +1,105 @@
+import threading
+import time
+from unittest import TestCase, skipIf
+
+import mne
+import numpy as np
+
+from brainaccess.connect import processor
+from brainaccess.libload import MissingLibrary
+from brainaccess.utils.exceptions import BrainAccessException
+from brainaccess.utils.quality_monitor import SignalQualityMonitor
+
+LIBRARY_AVAILABLE = not isinstance(processor._dll, MissingLibrary)
+
+SFREQ = 250
+CHANNELS = ["Fz", "Cz", "Pz"]
+
+
+class _Acquisition:
+    """Stands in for acquisition.EEG, data grows as chunks arrive"""
+
+    def __init__(self) -> None:
+        self.info = mne.create_info(
+            CHANNELS + ["Sample"], SFREQ, ch_types=["eeg"] * 3 + ["syst"]
+        )
+        self.data = np.zeros((4, 0))
+        self.annotations: list = []
+        self.lock = threading.Lock()
+        self.rng = np.random.default_rng(0)
+
+    def push(self, seconds: float, flat: tuple = ()) -> None:
+        samples = int(seconds * SFREQ)
+        chunk = self.rng.normal(scale=10.0, size=(4, samples))
+        for name in flat:
+            chunk[CHANNELS.index(name)] = 0.0
+        with self.lock:
+            self.data = np.concatenate((self.data, chunk), axis=1)
+
+    def get_tail(self, tim=None, samples=None) -> np.ndarray:
+        with self.lock:
+            return self.data[:, -samples:].copy()
+
+    def annotate(self, msg: str) -> None:
+        self.annotations.append(msg)
+
+
+class TestSignalQualityMonitor(TestCase):
+    def setUp(self) -> None:
+        self.eeg = _Acquisition()
+        self.backend = processor.get_backend("get_signal_quality")
+        if not LIBRARY_AVAILABLE:
+            processor.set_backend("numpy", ["get_signal_quality"])
+
+    def tearDown(self) -> None:
+        processor._backends["get_signal_quality"] = self.backend
+
+    @skipIf(LIBRARY_AVAILABLE, "bci connect library available")
+    def test_no_silent_numpy_fallback(self) -> None:
+        processor._backends["get_signal_quality"] = self.backend
+        monitor = SignalQualityMonitor(self.eeg)
+        with self.assertRaises(BrainAccessException):
+            monitor.start()
+        self.assertFalse(monitor.running)
+
+    def test_waits_for_full_window(self) -> None:
+        monitor = SignalQualityMonitor(self.eeg, window=2.0)
+        self.eeg.push(1.0)
+        self.assertIsNone(monitor.check())
+        self.assertIsNone(monitor.latest())
+
+    def test_annotates_degradation_and_recovery(self) -> None:
+        monitor = SignalQualityMonitor(self.eeg, window=2.0)
+        self.eeg.push(2.0)
+        result = monitor.check()
+        self.assertEqual(result["quality"], {"Fz": 2, "Cz": 2, "Pz": 2})
+        self.assertEqual(self.eeg.annotations, [])
+
+        self.eeg.push(2.0, flat=("Cz",))
+        result = monitor.check()
+        self.assertEqual(result["degraded"], ["Cz"])
+        self.assertIs(monitor.latest(), result)
+        # a lasting problem is annotated once
+        self.eeg.push(2.0, flat=("Cz",))
+        monitor.check()
+        self.eeg.push(2.0)
+        monitor.check()
+        self.assertEqual(
+            self.eeg.annotations,
+            ["Signal quality degraded: Cz", "Signal quality recovered: Cz"],
+        )
+
+    def test_background_thread_publishes(self) -> None:
+        results = []
+        monitor = SignalQualityMonitor(
+            self.eeg, window=1.0, interval=0.01, callback=results.append
+        )
+        self.eeg.push(1.0)
+        monitor.start()
+        deadline = time.monotonic() + 2.0
+        while monitor.checks < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        monitor.stop()
+        self.assertFalse(monitor.running)
+        self.assertGreaterEqual(len(results), 3)
+        self.assertEqual(monitor.latest()["degraded"], [])
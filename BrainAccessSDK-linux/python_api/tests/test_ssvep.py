@@ -0,0 +1,90 @@
+from unittest import TestCase, mock
+
+import numpy as np
+
+from brainaccess.connect import SSVEP as ssvep_module
+from brainaccess.connect.SSVEP import SSVEP, _reference_basis
+
+SFREQ = 250
+FREQUENCIES = [8.0, 10.0, 12.0, 15.0]
+
+
+def _recording(targets: list, seconds: float, rng: np.random.Generator) -> np.ndarray:
+    """Occipital channels following one stimulation frequency per segment"""
+    segments = []
+    for target in targets:
+        t = np.arange(int(seconds * SFREQ)) / SFREQ
+        phases = rng.uniform(0, 2 * np.pi, size=(4, 1))
+        response = np.sin(2 * np.pi * target * t + phases)
+        response += 0.5 * np.sin(2 * np.pi * 2 * target * t + phases)
+        segments.append(response + rng.normal(scale=2.0, size=response.shape))
+    return np.concatenate(segments, axis=1)
+
+
+class TestPredictWindows(TestCase):
+    def setUp(self) -> None:
+        self.model = SSVEP(FREQUENCIES, SFREQ)
+        self.x = _recording([10.0, 15.0, 8.0], 6.0, np.random.default_rng(0))
+
+    def test_classifies_each_window(self) -> None:
+        classes, scores = self.model.predict_windows(self.x, 2.0, 0.5)
+        starts = np.arange(len(classes)) * 0.5
+        self.assertEqual(scores.shape, (len(classes), len(FREQUENCIES)))
+        # windows fully inside one segment
+        inside = (starts % 6.0) <= 4.0
+        expected = np.array([1, 3, 0])[(starts // 6.0).astype(int)]
+        np.testing.assert_array_equal(classes[inside], expected[inside])
+        self.assertTrue(np.all((scores > 0) & (scores <= 1 + 1e-12)))
+
+    def test_batch_matches_single_windows(self) -> None:
+        _, scores = self.model.predict_windows(self.x, 2.0, 1.0)
+        for index in (0, 5, len(scores) - 1):
+            window = self.x[:, index * SFREQ : index * SFREQ + 2 * SFREQ]
+            _, single = self.model.predict_windows(window, 2.0, 1.0)
+            np.testing.assert_allclose(single[0], scores[index])
+
+    def test_batches_match_single_pass(self) -> None:
+        classes, scores = self.model.predict_windows(self.x, 2.0, 0.1)
+        with mock.patch.object(ssvep_module, "WINDOW_BATCH", 7):
+            batched_classes, batched = self.model.predict_windows(self.x, 2.0, 0.1)
+        self.assertGreater(len(scores), 7)
+        np.testing.assert_array_equal(batched_classes, classes)
+        np.testing.assert_allclose(batched, scores)
+
+    def test_references_are_cached(self) -> None:
+        _reference_basis.cache_clear()
+        self.model.predict_windows(self.x, 2.0, 0.5)
+        self.model.predict_windows(self.x[:, :1000], 2.0, 0.5)
+        self.assertEqual(_reference_basis.cache_info().misses, 1)
+        basis = _reference_basis(500, float(SFREQ), tuple(FREQUENCIES), 2)
+        np.testing.assert_allclose(basis[0].T @ basis[0], np.eye(4), atol=1e-12)
+
+
+class TestFrequencies(TestCase):
+    def _predicted_frequencies(self, model: SSVEP) -> list:
+        """Frequencies the library receives from predict"""
+        received = []
+
+        def classify(x, n_times, n_chans, sample_rate, frequencies, n_freqs, score):
+            received.extend(frequencies[i] for i in range(n_freqs))
+            return 0
+
+        with mock.patch.object(ssvep_module, "_dll") as dll:
+            dll.ba_bci_connect_ssvep_classify.side_effect = classify
+            model.predict(np.zeros((4, SFREQ)))
+        return received
+
+    def test_reassigned_before_predict(self) -> None:
+        model = SSVEP(FREQUENCIES, SFREQ)
+        model.frequencies = np.array([6.0, 7.5])
+        self.assertEqual(self._predicted_frequencies(model), [6.0, 7.5])
+        model.frequencies = [9.0, 11.0, 13.0, 17.0, 19.0]
+        self.assertEqual(
+            self._predicted_frequencies(model), [9.0, 11.0, 13.0, 17.0, 19.0]
+        )
+
+    def test_pointer_follows_frequencies(self) -> None:
+        model = SSVEP(FREQUENCIES, SFREQ)
+        model.frequencies = [6.0, 7.5]
+        pointed = [model._c_frequencies[i] for i in range(len(model.frequencies))]
+        self.assertEqual(pointed, [6.0, 7.5])
@@ -0,0 +1,150 @@
+"""Chunk size benchmark
+
+Sweeps chunk sizes with a synthetic real-time stream and reports, per size,
+the Python side cost of the chunk callback (conversion of the library
+buffers, gap check and storage as done by acquisition.EEG), the delay from
+a sample being measured to it being stored and the latency until an
+annotation made at a random time has its sample in the stored data.
+Bluetooth transport is not simulated, its delay adds to every value.
+
+Runs without a device, usage:
+    python benchmarks/chunk_size.py [--seconds 5] [--budget 0.1]
+"""
+
+import argparse
+import ctypes
+import threading
+import time
+
+import numpy as np
+
+from brainaccess.core.eeg_manager import _chunk_array
+from brainaccess.utils.buffer import GrowableBuffer
+from brainaccess.utils.chunk_size import chunk_size_for_latency
+from brainaccess.utils.sample_gaps import SampleGapDetector
+
+SAMPLE_RATE = 250
+EEG_CHANNELS = 32
+CHUNK_SIZES = [1, 2, 5, 10, 25, 50, 100, 250]
+ANNOTATIONS_PER_SECOND = 4
+
+
+class SyntheticStream:
+    """Delivers chunks laid out like the library does (one buffer per channel)
+    at the moment their last sample would have been measured"""
+
+    def __init__(self, chunk_size: int, seconds: float, callback) -> None:
+        self.chunk_size = chunk_size
+        self.chunks = max(1, int(seconds * SAMPLE_RATE) // chunk_size)
+        self.callback = callback
+        # electrodes are float32, the sample number size_t, like the device stream
+        self.ctypes = [ctypes.c_size_t] + [ctypes.c_float] * EEG_CHANNELS
+        self._buffers = [(ctype * chunk_size)() for ctype in self.ctypes]
+        self._pointers = (ctypes.c_void_p * len(self._buffers))(
+            *[ctypes.addressof(buffer) for buffer in self._buffers]
+        )
+        self.chunk_data = ctypes.cast(self._pointers, ctypes.POINTER(ctypes.c_void_p))
+        self._rng = np.random.default_rng(0)
+        self.start_time = 0.0
+
+    def sample_time(self, sample: np.ndarray) -> np.ndarray:
+        """perf_counter time at which the given samples were measured"""
+        return self.start_time + (sample + 1) / SAMPLE_RATE
+
+    def _fill(self, first_sample: int) -> None:
+        samples = np.arange(first_sample, first_sample + self.chunk_size)
+        np.ctypeslib.as_array(self._buffers[0])[:] = samples
+        noise = self._rng.normal(scale=20e-6, size=(EEG_CHANNELS, self.chunk_size))
+        for buffer, row in zip(self._buffers[1:], noise):
+            np.ctypeslib.as_array(buffer)[:] = row
+
+    def run(self) -> None:
+        self.start_time = time.perf_counter()
+        for index in range(self.chunks):
+            first_sample = index * self.chunk_size
+            self._fill(first_sample)
+            last_sample = first_sample + self.chunk_size - 1
+            delay = self.sample_time(last_sample) - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.callback(self.chunk_data, self.chunk_size)
+
+
+def run_chunk_size(chunk_size: int, seconds: float) -> dict:
+    types = None
+    buffer = GrowableBuffer(EEG_CHANNELS + 1, capacity=int(seconds * SAMPLE_RATE))
+    gaps = SampleGapDetector(sample_row=0)
+    cpu = []
+    stored = []
+
+    def callback(chunk_data, size) -> None:
+        nonlocal types
+        start = time.thread_time()
+        if types is None:
+            types = [(ctype * size, np.dtype(ctype)) for ctype in stream.ctypes]
+        chunk = _chunk_array(chunk_data, types, size)
+        gaps.check(chunk)
+        buffer.append(chunk)
+        cpu.append(time.thread_time() - start)
+        stored.append(time.perf_counter())
+
+    stream = SyntheticStream(chunk_size, seconds, callback)
+    thread = threading.Thread(target=stream.run)
+    thread.start()
+    thread.join()
+
+    stored_at = np.asarray(stored)
+    last_samples = np.arange(1, len(stored_at) + 1) * chunk_size - 1
+    # every sample of a chunk is stored when the callback returns
+    sample_delay = stored_at[:, np.newaxis] - stream.sample_time(
+        last_samples[:, np.newaxis] - np.arange(chunk_size)
+    )
+    # annotations at random times, their sample is the next one measured
+    duration = len(stored_at) * chunk_size / SAMPLE_RATE
+    annotated = np.random.default_rng(1).uniform(
+        0, duration - chunk_size / SAMPLE_RATE, int(duration * ANNOTATIONS_PER_SECOND)
+    )
+    annotated_sample = np.ceil(annotated * SAMPLE_RATE).astype(int)
+    delivered = stored_at[annotated_sample // chunk_size]
+    annotation_latency = delivered - (stream.start_time + annotated)
+    cpu_us = np.asarray(cpu) * 1e6
+    return {
+        "callbacks_per_second": SAMPLE_RATE / chunk_size,
+        "callback_us": float(np.median(cpu_us)),
+        "cpu_percent": float(cpu_us.sum() / 1e6 / duration * 100),
+        "mean_delay_ms": float(sample_delay.mean() * 1e3),
+        "max_delay_ms": float(sample_delay.max() * 1e3),
+        "annotation_ms": float(annotation_latency.mean() * 1e3),
+        "missing": gaps.missing,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument(
+        "--budget", type=float, default=None, help="latency budget in seconds"
+    )
+    args = parser.parse_args()
+
+    print(f"{EEG_CHANNELS + 1} channels, {SAMPLE_RATE} Hz, {args.seconds:g} s each")
+    print(
+        f"{'chunk':>5} {'calls/s':>8} {'callback (us)':>14} {'cpu (%)':>8}"
+        f" {'delay mean/max (ms)':>20} {'annotation (ms)':>16}"
+    )
+    for chunk_size in CHUNK_SIZES:
+        result = run_chunk_size(chunk_size, args.seconds)
+        assert result["missing"] == 0
+        delay = f"{result['mean_delay_ms']:.1f}/{result['max_delay_ms']:.1f}"
+        print(
+            f"{chunk_size:>5} {result['callbacks_per_second']:>8.1f}"
+            f" {result['callback_us']:>14.1f} {result['cpu_percent']:>8.3f}"
+            f" {delay:>20} {result['annotation_ms']:>16.1f}"
+        )
+    if args.budget is not None:
+        chunk_size = chunk_size_for_latency(SAMPLE_RATE, args.budget)
+        print(f"chunk size for a {args.budget * 1e3:g} ms budget: {chunk_size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Rolling buffer benchmark
+
+Compares the per chunk cost of the old np.roll based rolling window
+with the circular buffer used by acquisition.EEGData_roll
+for increasing window lengths.
+
+Runs without a device, usage:
+    python benchmarks/roll_buffer.py
+"""
+
+import timeit
+
+import numpy as np
+
+from brainaccess.utils.buffer import RingBuffer
+
+SAMPLE_RATE = 250
+CHANNELS = 34  # 32 electrodes, sample number and streaming channels
+CHUNK_SIZE = 25
+WINDOWS_SECONDS = [2, 5, 10, 20, 60, 120]
+REPEATS = 2000
+
+
+def roll_append(data: np.ndarray, chunk: np.ndarray) -> np.ndarray:
+    data = np.roll(data, -chunk.shape[1], axis=1)
+    data[:, -chunk.shape[1] :] = chunk
+    return data
+
+
+def main() -> None:
+    chunk = np.random.standard_normal((CHANNELS, CHUNK_SIZE))
+    print(f"{CHANNELS} channels, {CHUNK_SIZE} samples per chunk, {SAMPLE_RATE} Hz")
+    print(f"{'window (s)':>10} {'np.roll (us)':>14} {'ring (us)':>10} {'speedup':>8}")
+    for seconds in WINDOWS_SECONDS:
+        length = seconds * SAMPLE_RATE
+        data = np.zeros((CHANNELS, length))
+        ring = RingBuffer(CHANNELS, length)
+
+        def _roll():
+            nonlocal data
+            data = roll_append(data, chunk)
+
+        roll_us = timeit.timeit(_roll, number=REPEATS) / REPEATS * 1e6
+        ring_us = (
+            timeit.timeit(lambda: ring.append(chunk), number=REPEATS) / REPEATS * 1e6
+        )
+        print(
+            f"{seconds:>10} {roll_us:>14.2f} {ring_us:>10.2f}"
+            f" {roll_us / ring_us:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 import ctypes
+import functools
+import typing
+
 import numpy as np
 
 from brainaccess.connect import _dll
 from brainaccess.utils.exceptions import BrainAccessException
 
+# windows scored together by predict_windows, bounds its temporary arrays
+WINDOW_BATCH = 256
+
 # ctypes
 
 _dll.ba_bci_connect_ssvep_classify.argtypes = [
@@ -33,9 +39,28 @@ class SSVEP:
             data sampling rate
 
         """
-        self.frequencies = np.array(frequencies)
+        self.frequencies = frequencies
         self.sample_rate = sample_rate
 
+    @property
+    def frequencies(self) -> np.ndarray:
+        """Stimulation frequencies"""
+        return self._frequencies
+
+    @frequencies.setter
+    def frequencies(self, frequencies: list) -> None:
+        self._frequencies = np.array(frequencies)
+        self._set_c_frequencies()
+
+    def _set_c_frequencies(self) -> None:
+        """ctypes copy of the frequencies, rebuilt only when they change"""
+        self._frequencies64 = np.ascontiguousarray(
+            self._frequencies, dtype=np.float64
+        )
+        self._c_frequencies = self._frequencies64.ctypes.data_as(
+            ctypes.POINTER(ctypes.c_double)
+        )
+
     def predict(
         self, x: np.ndarray, frequencies: list = None, sample_rate: float = None
     ) -> tuple:
@@ -71,24 +96,138 @@ class SSVEP:
 
         """
         if frequencies is not None:
-            self.frequencies = np.array(frequencies)
+            self.frequencies = frequencies
         if sample_rate is not None:
             self.sample_rate = sample_rate
-        _x = x.copy().ravel(order="C").astype(np.float64)
-        c_arr = np.ctypeslib.as_ctypes(_x)
-        freqs = np.ctypeslib.as_ctypes(self.frequencies.astype(np.float64))
-        score = np.ctypeslib.as_ctypes(np.zeros(1).astype(np.float64))
+        _x = np.ascontiguousarray(x, dtype=np.float64)
+        score = (ctypes.c_double * 1)()
         n_chans = x.shape[0]
         n_time_steps = x.shape[1]
         res = _dll.ba_bci_connect_ssvep_classify(
-            c_arr,
+            _x.ctypes.data_as(ctypes.POINTER(ctypes.c_double)),
             n_time_steps,
             n_chans,
             self.sample_rate,
-            freqs,
-            len(self.frequencies),
+            self._c_frequencies,
+            len(self._frequencies64),
             score,
         )
         # if res != 0:
         #     raise BrainAccessException("SSVEP prediction failed")
         return res, score[0]
+
+    def predict_windows(
+        self,
+        x: np.ndarray,
+        window_length: float,
+        step: float,
+        harmonics: int = 2,
+        frequencies: typing.Optional[list] = None,
+        sample_rate: typing.Optional[float] = None,
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Classify every sliding window of a long buffer in one call
+
+        Uses canonical correlation analysis (CCA) between each window and sine
+        and cosine references of every stimulation frequency and its harmonics.
+        Windows are strided views of x, the orthonormalized references are
+        cached per window length, sample rate, frequencies and harmonics, and
+        windows are scored WINDOW_BATCH at a time with batched linear algebra,
+        so temporary memory does not grow with the length of x.
+
+        Parameters
+        ------------
+        x: np.ndarray
+            EEG data (channels x samples), e.g. a whole recording
+        window_length: float
+            window length in seconds
+        step: float
+            seconds between the starts of consecutive windows
+        harmonics: int
+            number of harmonics in the reference signals
+        frequencies: list
+            list of stimulation frequencies
+        sample_rate: float
+            data sampling rate
+
+        Returns
+        ---------
+        np.ndarray:
+            index into frequencies of the target of each window
+        np.ndarray:
+            canonical correlations, shape (windows, frequencies), window i
+            starts at sample i * round(step * sample_rate)
+
+        Warnings
+        ----------
+        Data must have the same properties as for predict. Scores are CCA
+        correlations and not comparable with the score returned by predict.
+
+        """
+        if frequencies is not None:
+            self.frequencies = frequencies
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if len(self.frequencies) == 0:
+            raise BrainAccessException("No stimulation frequencies given")
+        n_samples = int(round(window_length * self.sample_rate))
+        n_step = max(int(round(step * self.sample_rate)), 1)
+        if n_samples < 2 or x.shape[1] < n_samples:
+            raise BrainAccessException("Data is shorter than one window")
+        references = _reference_basis(
+            n_samples,
+            float(self.sample_rate),
+            tuple(float(f) for f in self.frequencies),
+            harmonics,
+        )
+        # (windows, samples, channels) view of x, batches are copied when demeaned
+        windows = np.lib.stride_tricks.sliding_window_view(
+            np.asarray(x, dtype=np.float64), n_samples, axis=1
+        )[:, ::n_step].transpose((1, 2, 0))
+        scores = np.concatenate(
+            [
+                _cca_scores(windows[start : start + WINDOW_BATCH], references)
+                for start in range(0, len(windows), WINDOW_BATCH)
+            ]
+        )
+        return np.argmax(scores, axis=1), scores
+
+
+def _cca_scores(windows: np.ndarray, references: np.ndarray) -> np.ndarray:
+    """Largest canonical correlation of each window with each reference basis
+
+    Returns
+    ---------
+    np.ndarray:
+        shape (windows, frequencies)
+    """
+    windows = windows - windows.mean(axis=1, keepdims=True)
+    basis, _ = np.linalg.qr(windows)
+    # canonical correlations are the singular values of Qx^T Qy
+    products = np.einsum("wsc,fsr->wfcr", basis, references)
+    return np.linalg.svd(products, compute_uv=False)[..., 0]
+
+
+@functools.lru_cache(maxsize=16)
+def _reference_basis(
+    n_samples: int, sample_rate: float, frequencies: tuple, harmonics: int
+) -> np.ndarray:
+    """Orthonormal basis of the sine and cosine references of each frequency
+
+    Returns
+    ---------
+    np.ndarray:
+        read-only, shape (frequencies, samples, 2 * harmonics)
+    """
+    t = np.arange(n_samples) / sample_rate
+    phases = (
+        2
+        * np.pi
+        * np.asarray(frequencies)[:, None, None]
+        * np.arange(1, harmonics + 1)[None, None, :]
+        * t[None, :, None]
+    )
+    references = np.concatenate((np.sin(phases), np.cos(phases)), axis=2)
+    references -= references.mean(axis=1, keepdims=True)
+    basis, _ = np.linalg.qr(references)
+    basis.flags.writeable = False
+    return basis
@@ -7,6 +7,7 @@ from multimethod import multimethod
 from typing import Callable, Union, Optional
 
 from brainaccess.utils.exceptions import _callback, _handle_error, BrainAccessException
+from brainaccess.utils.chunk_queue import ChunkQueue
 from brainaccess.core import _dll
 from brainaccess.core.battery_info import BatteryInfo
 from brainaccess.core.device_info import DeviceInfo
@@ -175,7 +176,7 @@ def _callback_stop_stream(data: ctypes.c_void_p) -> None:
     with _managers_mtx:
         mgr = _managers.get(data)
         if mgr is not None:
-            with mgr._callback_stop_stream_mix:
+            with mgr._callback_stop_stream_mtx:
                 cbk = mgr._callback_stop_stream
                 if cbk is not None:
                     cbk()
@@ -197,7 +198,7 @@ def _callback_start_stream(data: ctypes.c_void_p) -> None:
     with _managers_mtx:
         mgr = _managers.get(data)
         if mgr is not None:
-            with mgr._callback_start_stream_mix:
+            with mgr._callback_start_stream_mtx:
                 cbk = mgr._callback_start_stream
                 if cbk is not None:
                     cbk()
@@ -209,29 +210,45 @@ def _callback_start_stream(data: ctypes.c_void_p) -> None:
 def _callback_chunk(chunk_data, chunk_size, data) -> None:
     with _managers_mtx:
         mgr = _managers.get(data)
-        if mgr is not None:
-            with mgr._callback_chunk_mtx:
-                cbk = mgr._callback_chunk
-                if cbk is not None:
-                    # Get channel sizes and type information
-                    types_ptr = ctypes.POINTER(ctypes.c_uint8)()
-                    types_size = ctypes.c_size_t()
-                    _dll.ba_eeg_manager_get_stream_channel_data_types(
-                        data, ctypes.byref(types_ptr), ctypes.byref(types_size)
-                    )
-                    types = [_types_map[types_ptr[i]] for i in range(types_size.value)]
-
-                    chunk_arrays = []
-                    for i, ctype in enumerate(types):
-                        data_pointer = ctypes.cast(
-                            chunk_data[i], ctypes.POINTER(ctype * chunk_size)
-                        )
-                        np_array = np.ctypeslib.as_array(
-                            data_pointer.contents, shape=(chunk_size,)
-                        )
-                        chunk_arrays.append(np_array)
-
-                    cbk(chunk_arrays, chunk_size)
+    if mgr is not None:
+        with mgr._callback_chunk_mtx:
+            cbk = mgr._callback_chunk
+            if cbk is not None:
+                types = _chunk_types(mgr, chunk_size)
+                cbk(_chunk_array(chunk_data, types, chunk_size), chunk_size)
+
+
+def _chunk_array(chunk_data, types: list, chunk_size: int) -> np.ndarray:
+    """Copies per channel library buffers into one (channels, chunk_size) array"""
+    addresses = chunk_data[: len(types)]
+    chunk = np.empty((len(types), chunk_size))
+    for i, (array_type, dtype) in enumerate(types):
+        chunk[i] = np.frombuffer(array_type.from_address(addresses[i]), dtype=dtype)
+    return chunk
+
+
+def _chunk_types(mgr: "EEGManager", chunk_size: int) -> list:
+    """Array type and numpy dtype of every stream channel for chunk_size samples.
+
+    Channel data types are queried from the library once per stream,
+    the caller must hold mgr._callback_chunk_mtx.
+    """
+    types = mgr._chunk_types.get(chunk_size)
+    if types is None:
+        if mgr._stream_types is None:
+            types_ptr = ctypes.POINTER(ctypes.c_uint8)()
+            types_size = ctypes.c_size_t()
+            _dll.ba_eeg_manager_get_stream_channel_data_types(
+                mgr._manager, ctypes.byref(types_ptr), ctypes.byref(types_size)
+            )
+            mgr._stream_types = [
+                _types_map[types_ptr[i]] for i in range(types_size.value)
+            ]
+        types = [
+            (ctype * chunk_size, np.dtype(ctype)) for ctype in mgr._stream_types
+        ]
+        mgr._chunk_types[chunk_size] = types
+    return types
 
 
 @ctypes.CFUNCTYPE(None, ctypes.POINTER(BatteryInfo), ctypes.c_void_p)
@@ -287,6 +304,10 @@ class EEGManager:
         self._callback_stop_stream_mtx = threading.Lock()
         self._callback_load_config_mtx = threading.Lock()
         self._callback_ota_update_mtx = threading.Lock()
+        # stream channel data types, reset on every start_stream
+        self._stream_types: Optional[list] = None
+        self._chunk_types: dict = {}
+        self._chunk_queue: Optional[ChunkQueue] = None
         self._manager = _dll.ba_eeg_manager_new()
         with _managers_mtx:
             _managers[self._manager] = self
@@ -310,6 +331,10 @@ class EEGManager:
         Must be called exactly once, after the manager is no longer needed
         """
         self.disconnect()  # prevent callback deadlock by disconnecting first.
+        with self._callback_chunk_mtx:
+            chunk_queue, self._chunk_queue = self._chunk_queue, None
+        if chunk_queue is not None:
+            chunk_queue.stop()
         with _managers_mtx:
             _dll.ba_eeg_manager_free(self._manager)
             del _managers[self._manager]
@@ -376,6 +401,9 @@ class EEGManager:
 
         if self.is_streaming():
             raise BrainAccessException("Stream already running")
+        with self._callback_chunk_mtx:
+            self._stream_types = None
+            self._chunk_types = {}
         return _handle_error(
             _dll.ba_eeg_manager_start_stream(
                 self._manager, _callback_start_stream, self._manager
@@ -405,7 +433,9 @@ class EEGManager:
         if not self.is_streaming():
             raise BrainAccessException("Stream not running")
         return _handle_error(
-            _dll.ba_eeg_manager_stop_stream(self._manager, _callback_stop_stream, None)
+            _dll.ba_eeg_manager_stop_stream(
+                self._manager, _callback_stop_stream, self._manager
+            )
         )
 
     def is_streaming(self) -> bool:
@@ -656,27 +686,78 @@ class EEGManager:
         """
         return _dll.ba_eeg_manager_get_sample_frequency(self._manager)
 
-    def set_callback_chunk(self, f: Callable) -> None:
+    def set_callback_chunk(
+        self, f: Callable, queue_size: Optional[int] = None
+    ) -> None:
         """Sets a callback to be called every time a chunk is available
 
         Warning
         -------
-        The callback may or may not run in the reader thread, and as such,
-        synchronization must be used to avoid race conditions, and the callback
-        itself must be as short as possible to avoid blocking communication
-        with the device.
+        Without queue_size the callback may or may not run in the reader thread,
+        and as such, synchronization must be used to avoid race conditions,
+        and the callback itself must be as short as possible to avoid blocking
+        communication with the device.
 
         Parameters
         ------------
         f
             callback Function to be called every time a chunk is available
             Set to null to disable.
+            It receives the chunk as a contiguous float64 array of shape
+            (stream channels, chunk_size), rows ordered as given by
+            get_channel_index, and chunk_size.
+        queue_size: int, optional
+            If given, chunks are handed to a bounded queue and f is called from
+            a dedicated consumer thread, so a slow callback never blocks the
+            stream. Chunks arriving while the queue is full are dropped,
+            see get_chunk_queue_stats.
         """
+        chunk_queue = None
+        if f is not None and queue_size:
+            chunk_queue = ChunkQueue(f, maxsize=queue_size)
+            chunk_queue.start()
         with self._callback_chunk_mtx:
-            self._callback_chunk = f
+            old_queue, self._chunk_queue = self._chunk_queue, chunk_queue
+            self._callback_chunk = chunk_queue.put if chunk_queue is not None else f
             _dll.ba_eeg_manager_set_callback_chunk(
                 self._manager, _callback_chunk if f is not None else None, self._manager
             )
+        if old_queue is not None:
+            old_queue.stop()
+
+    def get_chunk_queue_stats(self) -> Optional[dict]:
+        """Returns counters of the chunk queue set with set_callback_chunk
+
+        Returns
+        -------
+        dict
+            received, delivered and dropped chunk counts, current queue size
+            and its high water mark, None if no queue is used
+
+        """
+        chunk_queue = self._chunk_queue
+        if chunk_queue is None:
+            return None
+        return chunk_queue.stats()
+
+    def wait_chunk_queue(self, timeout: Optional[float] = 1.0) -> bool:
+        """Waits until all queued chunks were passed to the chunk callback
+
+        Parameters
+        ------------
+        timeout: float
+            maximum seconds to wait, None waits forever
+
+        Returns
+        -------
+        bool
+            True if the queue is empty or no queue is used
+
+        """
+        chunk_queue = self._chunk_queue
+        if chunk_queue is None:
+            return True
+        return chunk_queue.join(timeout)
 
     def set_callback_battery(self, callback: Union[Callable, None] = None) -> None:
         """Sets a callback to be called every time the battery status is updated
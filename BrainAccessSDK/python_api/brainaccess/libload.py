@@ -1,5 +1,6 @@
 import platform
 import ctypes
+import os
 
 from ctypes.util import find_library
 from os import listdir, getcwd
@@ -19,7 +20,15 @@ def get_lib_name(name: str) -> str:
         raise BrainAccessException(f'Unsupported platform "{platform_name}"')
 
 
+FAKE_CORE_VARIABLE = "BRAINACCESS_FAKE_CORE"
+
+
 def load_library(name: str) -> ctypes.CDLL:
+    if name == "bacore" and os.environ.get(FAKE_CORE_VARIABLE):
+        # simulated device for running without the library, see fake_bacore
+        from brainaccess.fake_bacore import FakeBacore
+
+        return FakeBacore()
     dll_name = get_lib_name(name)
     try:
         onlyfiles = [f for f in listdir(".") if isfile(join(".", f))]
@@ -37,3 +46,41 @@ def load_library(name: str) -> ctypes.CDLL:
                     raise BrainAccessException("Could not find " + dll_name)
     except OSError:
         raise BrainAccessException("Could not load " + dll_name)
+
+
+class MissingLibrary:
+    """Stands in for a library that could not be loaded.
+
+    Function prototypes can still be declared on it, calling any of its
+    functions raises the original loading error.
+    """
+
+    def __init__(self, name: str, error: BrainAccessException) -> None:
+        self.name = name
+        self.error = error
+
+    def __getattr__(self, symbol: str) -> "_MissingFunction":
+        function = _MissingFunction(self, symbol)
+        setattr(self, symbol, function)
+        return function
+
+
+class _MissingFunction:
+    def __init__(self, library: MissingLibrary, symbol: str) -> None:
+        self.library = library
+        self.symbol = symbol
+        self.argtypes = None
+        self.restype = None
+
+    def __call__(self, *args, **kwargs):
+        raise BrainAccessException(
+            f"Cannot call {self.symbol}: {self.library.error}"
+        )
+
+
+def load_optional_library(name: str):
+    """Loads a library, or returns a MissingLibrary if it is not available"""
+    try:
+        return load_library(name)
+    except BrainAccessException as e:
+        return MissingLibrary(name, e)
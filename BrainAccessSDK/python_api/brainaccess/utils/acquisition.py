@@ -12,9 +12,18 @@ from brainaccess.core.eeg_manager import EEGManager
 from brainaccess.core.impedance_measurement_mode import ImpedanceMeasurementMode
 from brainaccess.core.device_features import DeviceFeatures
 from brainaccess.utils.exceptions import BrainAccessException
+from brainaccess.utils.buffer import GrowableBuffer, RingBuffer
+from brainaccess.utils.sample_gaps import SampleGapDetector
+from brainaccess.utils.chunk_size import chunk_size_for_latency
+from brainaccess.utils.impedance import (  # noqa: F401
+    BOARD_RESISTOR_OHMS,
+    IMPEDANCE_DRIVE_AMPS,
+    ImpedanceEstimator,
+    impedance_from_std,
+)
 
-IMPEDANCE_DRIVE_AMPS = 6.0e-9  # 6 nA
-BOARD_RESISTOR_OHMS = 4.7e3  # 4.7 kOhm
+# sample storage data type for each FIF output format
+PRECISION_DTYPES = {"single": np.float32, "double": np.float64}
 
 
 class EEG:
@@ -25,16 +34,33 @@ class EEG:
     def __init__(
         self,
         mode: str = "accumulate",
+        precision: str = "double",
+        chunk_queue_size: typing.Optional[int] = None,
+        latency_budget: typing.Optional[float] = None,
     ) -> None:
         """Creates EEG object and initializes device with default parameters.
 
         Parameters
         -------------
         mode: str
-            Data storage modes accumulate (all data is accumulated in array)
-            or roll (only last x seconds preserved)
+            Data storage modes accumulate (all data is accumulated in array),
+            roll (only last x seconds preserved) or disk (data is streamed to
+            a BrainVision file given to start_acquisition)
+        precision: str
+            single (float32) or double (float64) sample storage and FIF output.
+            single halves memory and file size, the sample counter stays exact
+            for 2**24 samples (over 18 hours at 250 Hz)
+        chunk_queue_size: int, optional
+            store chunks from a consumer thread fed by a queue of this size,
+            so the device stream never waits for the data lock
+        latency_budget: float, optional
+            maximum delay in seconds from measurement to the chunk callback,
+            the largest chunk size within it is set when acquisition starts,
+            otherwise the chunk size from bacore.json is used
 
         """
+        if precision not in PRECISION_DTYPES:
+            raise BrainAccessException(f"Unsupported precision {precision}")
         self.directory = pathlib.Path.cwd()
         self.wait_max: int = 2
         self.time_step: float = 0.5
@@ -42,6 +68,12 @@ class EEG:
         self.eeg_channels: dict = {}
         self.bias_channels: typing.Optional[list] = None
         self.mode: str = mode
+        self.precision: str = precision
+        self.chunk_queue_size = chunk_queue_size
+        self.latency_budget = latency_budget
+        self.chunk_size: typing.Optional[int] = None
+        self.gap_detector = SampleGapDetector()
+        self.impedance_estimator: typing.Optional[ImpedanceEstimator] = None
         self.gain: GainMode = GainMode.X8
         bacore.init()
 
@@ -136,11 +168,27 @@ class EEG:
         self.chans = len(self.info.ch_names)
         if self.mode == "accumulate":
             self.lock = threading.Lock()
-            self.data = EEGData(eeg_info, lock=self.lock, zeros_at_start=zeros_at_start)
+            self.data = EEGData(
+                eeg_info,
+                lock=self.lock,
+                zeros_at_start=zeros_at_start,
+                precision=self.precision,
+            )
+        elif self.mode == "disk":
+            self.lock = threading.Lock()
+            self.data = EEGData_disk(
+                eeg_info,
+                lock=self.lock,
+                zeros_at_start=zeros_at_start,
+                precision=self.precision,
+            )
         else:
             self.lock = threading.Lock()
             self.data = EEGData_roll(
-                eeg_info, lock=self.lock, zeros_at_start=zeros_at_start
+                eeg_info,
+                lock=self.lock,
+                zeros_at_start=zeros_at_start,
+                precision=self.precision,
             )
 
     def _set_channels(self):
@@ -173,34 +221,80 @@ class EEG:
         for idx, value in enumerate(list(self.eeg_channels.keys())):
             if self.channels_type[value] == "EEG":
                 self.mgr.set_channel_gain(value, self.gain)
-        if self.mode == "accumulate":
-            self.mgr.set_callback_chunk(self._acq)
+        if self.mode in ["accumulate", "disk"]:
+            self.mgr.set_callback_chunk(self._acq, queue_size=self.chunk_queue_size)
         else:
-            self.mgr.set_callback_chunk(self._acq_roll)
+            self.mgr.set_callback_chunk(
+                self._acq_roll, queue_size=self.chunk_queue_size
+            )
+        if self.latency_budget is not None:
+            self.chunk_size = chunk_size_for_latency(
+                self.info["sfreq"], self.latency_budget
+            )
+            bacore.config_set_chunk_size(self.chunk_size)
         self.mgr.load_config()
+        self.gap_detector.sample_row = None
+        self.gap_detector.reset()
         try:
             self.mgr.start_stream()
         except Exception:
             raise BrainAccessException("Could not start stream")
         for key in self.channels_indexes.keys():
             self.channels_indexes[key] = self.mgr.get_channel_index(key)
+        self.gap_detector.sample_row = self.channels_indexes[eeg_channel.SAMPLE_NUMBER]
+        if self.mode == "disk":
+            self.data.set_channels_indexes(list(self.channels_indexes.values()))
 
-    def start_acquisition(self):
-        """Starts streaming and collecting data"""
+    def start_acquisition(self, fname: typing.Optional[str] = None):
+        """Starts streaming and collecting data
+
+        Parameters
+        -----------
+        fname: str (Default value = None)
+            recording file for disk mode, samples are written to it as they arrive
+
+        """
+        if self.mode == "disk":
+            if not fname:
+                self._error("Recording file name is required in disk mode")
+            self.data.open(fname)
         self._start_acquisition()
 
     def _stop_acquisition(self):
         """"""
         self.mgr.stop_stream()
+        # store chunks still waiting in the queue
+        if not self.mgr.wait_chunk_queue():
+            print("Chunk queue not drained, last chunks may be missing")
 
     def stop_acquisition(self):
         self._stop_acquisition()
+        if self.mode == "disk":
+            self.get_annotations()
+            self.data.close()
 
     def get_annotations(self):
-        """Returns annotations"""
-        self.data.annotations = self.mgr.get_annotations()
+        """Returns annotations, including detected sample gaps"""
+        annotations = self.mgr.get_annotations()
+        gaps = self.gap_detector.annotations()
+        self.data.annotations = {
+            "annotations": list(annotations["annotations"]) + gaps["annotations"],
+            "timestamps": list(annotations["timestamps"]) + gaps["timestamps"],
+        }
         return self.data.annotations
 
+    def get_packet_loss(self) -> dict:
+        """Returns live sample loss counters of the current acquisition
+
+        Returns
+        -------
+        dict
+            received and missing sample counts, number of gaps,
+            counter discontinuities and lost fraction
+
+        """
+        return self.gap_detector.stats()
+
     def annotate(self, msg: str) -> None:
         """
         Parameters
@@ -216,6 +310,7 @@ class EEG:
         tim: typing.Optional[float] = None,
         samples: typing.Optional[int] = None,
         annotations: bool = True,
+        incremental: bool = False,
     ) -> mne.io.BaseRaw:
         """Return MNE structure.
         If tim None returns all data otherwise last tim seconds
@@ -224,6 +319,9 @@ class EEG:
         -----------
         tim: float (Default value = None)
             time in seconds
+        incremental: bool (Default value = False)
+            accumulate mode only, copy only the samples received since the
+            previous incremental call. The returned raw is read-only
 
         Returns
         -------
@@ -233,13 +331,43 @@ class EEG:
         """
         if annotations:
             self.get_annotations()
+        kwargs = {"incremental": True} if incremental else {}
         self.data.convert_to_mne(
             tim=tim,
             samples=samples,
+            annotations=annotations,
             channels_indexes=list(self.channels_indexes.values()),
+            **kwargs,
         )
         return self.data.mne_raw
 
+    def get_tail(
+        self,
+        tim: typing.Optional[float] = None,
+        samples: typing.Optional[int] = None,
+    ) -> np.ndarray:
+        """Return the most recent samples without building an MNE structure.
+        Cost depends on the window size only, not on the recording length
+
+        Parameters
+        -----------
+        tim: float (Default value = None)
+            time in seconds
+        samples: int (Default value = None)
+            number of samples, used if tim is None
+
+        Returns
+        -------
+        np.ndarray
+            data of shape (channels, samples), channels ordered as in info
+
+        """
+        if tim:
+            samples = int(tim * self.info["sfreq"])
+        if not samples:
+            self._error("Provide tim or samples")
+        return self.data.tail(samples, list(self.channels_indexes.values()))
+
     def _acq(self, chunk, chunk_size):
         """function to acquire data with callback
         Parameters
@@ -249,7 +377,12 @@ class EEG:
         chunk_size: int
             size of the chunk
         """
-        self.data.data.append(np.array(chunk))
+        self.gap_detector.check(chunk)
+        estimator = self.impedance_estimator
+        if estimator is not None:
+            estimator.update(chunk)
+        with self.lock:
+            self.data.append(chunk)
 
     def _acq_roll(self, chunk, chunk_size):
         """function to acquire fixed size data with callback
@@ -260,8 +393,12 @@ class EEG:
         chunk_size: int
             size of the chunk
         """
-        self.data.data = np.roll(self.data.data, -chunk_size, axis=1)
-        self.data.data[:, -chunk_size:] = np.array(chunk)
+        self.gap_detector.check(chunk)
+        estimator = self.impedance_estimator
+        if estimator is not None:
+            estimator.update(chunk)
+        with self.lock:
+            self.data.append(chunk)
 
     def _create_info(self):
         """mne info structure creation"""
@@ -312,38 +449,144 @@ class EEG:
         list
             Impedances
         """
-        data = self.get_mne(tim=tim).filter(20, 40).get_data(picks="eeg")
+        picks = mne.pick_types(self.info, eeg=True)
+        data = self.get_tail(tim=tim)[picks]
+        data = mne.filter.filter_data(data, self.info["sfreq"], 20, 40, verbose=False)
         data = np.std(data, axis=1)
-        self.impedance = (
-            (np.sqrt(2.0) * data * 1.0e-6) / IMPEDANCE_DRIVE_AMPS -BOARD_RESISTOR_OHMS
-        ) / 1000
-        self.impedance[self.impedance < 0] = 0
+        self.impedance = impedance_from_std(data)
         return self.impedance
 
-    def start_impedance_measurement(self):
+    def get_impedances(self) -> typing.Optional[np.ndarray]:
+        """Impedances from the streaming estimator, updated with every chunk
+        Cheap enough to poll several times per second, unlike calc_impedances
+
+        Returns
+        -------
+        np.ndarray or None
+            impedances in kOhm of the EEG channels in info order,
+            None before the first chunk or outside impedance measurement
+        """
+        estimator = self.impedance_estimator
+        if estimator is None:
+            return None
+        impedance = estimator.impedances()
+        if impedance is not None:
+            self.impedance = impedance
+        return impedance
+
+    def start_impedance_measurement(self, window: float = 4.0):
+        """Starts streaming in impedance measurement mode
+
+        Parameters
+        ----------
+        window: float
+            time constant in seconds of the streaming impedance estimate
+
+        """
         self.mgr.set_impedance_mode(ImpedanceMeasurementMode.HZ_31_2)
         self.bias_channels = []
         self.start_acquisition()
+        picks = mne.pick_types(self.info, eeg=True)
+        stream_rows = list(self.channels_indexes.values())
+        rows = [stream_rows[pick] for pick in picks]
+        self.impedance_estimator = ImpedanceEstimator(
+            self.info["sfreq"], rows=rows, window=window
+        )
 
     def stop_impedance_measurement(self):
+        self.impedance_estimator = None
         self.stop_acquisition()
         self.mgr.set_impedance_mode(ImpedanceMeasurementMode.OFF)
 
 
+def _sample_row(info: mne.Info, channels_indexes: typing.Optional[list]) -> int:
+    """Chunk row of the Sample channel, the first row if it is not known"""
+    ch_types = info.get_channel_types()
+    if channels_indexes and "syst" in ch_types:
+        return channels_indexes[ch_types.index("syst")]
+    return 0
+
+
+def _sample_positions(numbers: np.ndarray, timestamps: typing.Any) -> np.ndarray:
+    """Positions of sample numbers in a recorded Sample channel
+
+    Lost samples are not in the data, so positions are looked up instead of
+    computed from the first sample number. A sample number inside a gap is
+    placed at the first sample after it, sample numbers before the first or
+    after the last recorded one are extrapolated.
+
+    Parameters
+    ------------
+    numbers: np.ndarray
+        recorded Sample channel, increasing
+    timestamps: list
+        sample numbers to look up
+
+    Returns
+    --------
+    np.ndarray
+        float positions into numbers
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    if len(numbers) == 0:
+        return np.zeros_like(timestamps)
+    positions = np.searchsorted(numbers, timestamps).astype(float)
+    before = timestamps < numbers[0]
+    positions[before] = timestamps[before] - numbers[0]
+    after = timestamps > numbers[-1]
+    positions[after] = len(numbers) - 1 + timestamps[after] - numbers[-1]
+    return positions
+
+
 class EEGData_roll:
-    """Data structure to store rolling EEG data buffer"""
+    """Data structure to store rolling EEG data buffer
 
-    def __init__(self, info, lock, zeros_at_start: int = 1):
+    The last zeros_at_start samples are kept in a circular buffer,
+    so adding a chunk does not move the rest of the window.
+    """
+
+    def __init__(
+        self, info, lock, zeros_at_start: int = 1, precision: str = "double"
+    ):
         if not lock:
             raise BrainAccessException("No lock passed")
         self.eeg_info: mne.Info = info
         self.mne_raw: mne.io.BaseRaw
         self.chans = len(info.ch_names)
         self.zeros_at_start = zeros_at_start
-        self.data = np.zeros((self.chans, self.zeros_at_start))
+        self.precision = precision
+        self._buffer = RingBuffer(
+            self.chans, self.zeros_at_start, dtype=PRECISION_DTYPES[precision]
+        )
         self.connectivity: list = []
         self.annotations: dict = {}
         self.lock = lock
+        # first sample of the stream and number of samples received since
+        self._first_samples: typing.Optional[np.ndarray] = None
+        self._received = 0
+
+    @property
+    def data(self) -> np.ndarray:
+        """Rolling window in chronological order, shape (channels, samples)"""
+        return self._buffer.view()
+
+    def append(self, chunk) -> None:
+        """Write a data chunk over the oldest samples
+
+        Parameters
+        ------------
+        chunk: np.ndarray or list
+            data chunk, shape (channels, samples)
+
+        """
+        chunk = np.asarray(chunk)
+        if self._first_samples is None:
+            self._first_samples = chunk[:, 0].copy()
+        self._received += chunk.shape[1]
+        self._buffer.append(chunk)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
 
     def save(self, fname: str):
         """
@@ -353,7 +596,9 @@ class EEGData_roll:
             filename to save data to
         """
         with self.lock:
-            self.mne_raw.save(fname=fname, verbose=False, overwrite=True, fmt="double")
+            self.mne_raw.save(
+                fname=fname, verbose=False, overwrite=True, fmt=self.precision
+            )
 
     def load(self, fname: str):
         self.mne_raw = mne.io.read_raw(fname, verbose=False)
@@ -380,68 +625,165 @@ class EEGData_roll:
 
         """
         with self.lock:
-            length = len(self.data)
+            length = len(self._buffer)
         if length > 0:
-            if annotations:
-                timestamp_correction = np.block(self.data)[0][0]
-                onset = []
-                description = []
-                for idx, annotation in enumerate(self.annotations["annotations"]):
-                    description.append(annotation)
-                    timestamp = self.annotations["timestamps"][idx]
-                    onset.append(
-                        (timestamp + self.zeros_at_start - timestamp_correction)
-                        / self.eeg_info["sfreq"]
-                    )
-                duration = np.repeat(0, len(onset))
             if tim:
                 # convert tim to samples
-                tim = int(tim * self.eeg_info["sfreq"])
-                with self.lock:
-                    data = np.array(self.data)  # .reshape(self.chans, -1)
-                    data = data[:, -tim:]
-                # fix annotations
-                if annotations:
-                    onset = [x - tim for x in onset]
-                    duration = np.repeat(0, len(onset))
-            elif samples:
-                with self.lock:
-                    data = np.array(self.data)  # .reshape(self.chans, -1)
-                    data = data[:, -samples:]
-                # fix annotations
-                if annotations:
-                    onset = [x - samples for x in onset]
-                    duration = np.repeat(0, len(onset))
+                samples = int(tim * self.eeg_info["sfreq"])
+            if samples:
+                data = self._copy_window(samples, channels_indexes)
             else:
-                with self.lock:
-                    data = np.array(self.data)  # .reshape(self.chans, -1)
-            # select right order channels
-            if channels_indexes:
-                data = data[channels_indexes]
+                data = self._copy_window(channels_indexes=channels_indexes)
             self.mne_raw = mne.io.RawArray(
                 data,
                 self.eeg_info,
                 verbose=False,
             )
             if annotations:
-                annot = mne.Annotations(onset, duration, description)
+                # Sample row of the returned data, the window may still start
+                # with zeros that are not part of the stream
+                row = _sample_row(self.eeg_info, channels_indexes)
+                if channels_indexes:
+                    row = channels_indexes.index(row)
+                with self.lock:
+                    received = min(self._received, length)
+                received = min(received, data.shape[1])
+                stream_start = data.shape[1] - received
+                positions = stream_start + _sample_positions(
+                    data[row, stream_start:],
+                    self.annotations.get("timestamps", []),
+                )
+                # onsets relative to the first returned sample
+                onset = positions / self.eeg_info["sfreq"]
+                duration = np.zeros(len(onset))
+                annot = mne.Annotations(
+                    onset, duration, list(self.annotations.get("annotations", []))
+                )
                 self.mne_raw.set_annotations(annot, verbose=False)
         else:
             print("No data to convert to MNE structure")
 
+    def tail(
+        self, samples: int, channels_indexes: typing.Optional[list] = None
+    ) -> np.ndarray:
+        """Copy of the last samples, cost depends only on the window size
+
+        Parameters
+        ------------
+        samples: int
+            number of most recent samples to return
+        channels_indexes: list, default value = None
+            buffer row of every channel in info order
+
+        Returns
+        --------
+        np.ndarray
+            shape (channels, min(samples, window length))
+        """
+        return self._copy_window(samples, channels_indexes)
+
+    def _copy_window(
+        self,
+        samples: typing.Optional[int] = None,
+        channels_indexes: typing.Optional[list] = None,
+    ) -> np.ndarray:
+        """Copy the window in chronological order, optionally only the last samples,
+        with channels in the requested order"""
+        # fancy indexing of the channels already copies
+        copy = not channels_indexes
+        with self.lock:
+            if samples is None:
+                data = self._buffer.view(copy=copy)
+            else:
+                data = self._buffer.tail(samples, copy=copy)
+            # select right order channels
+            if channels_indexes:
+                data = data[channels_indexes]
+        return data
+
 
 class EEGData:
-    """Object to store EEG data in accumulation mode"""
+    """Object to store EEG data in accumulation mode
+
+    Samples are kept in a single growable (channels x samples) buffer,
+    so appending is cheap and no concatenation is needed on conversion.
+    """
+
+    def __init__(
+        self,
+        info,
+        lock,
+        zeros_at_start: int = 2,
+        capacity: typing.Optional[int] = None,
+        precision: str = "double",
+    ):
+        """
+        Parameters
+        ------------
+        info: mne.Info
+            channel information
+        lock: threading.Lock
+            lock guarding the buffer
+        zeros_at_start: int
+            number of zero samples to prepend
+        capacity: int, default value = None
+            number of samples to preallocate, defaults to one minute of data
+        precision: str, default value = "double"
+            single or double, sample storage type and FIF output format
 
-    def __init__(self, info, lock, zeros_at_start: int = 2):
+        """
         self.eeg_info: mne.Info = info
         self.mne_raw: mne.io.BaseRaw
         self.lock = lock
         chans = len(info.ch_names)
         self.zeros_at_start = zeros_at_start
-        self.data: list = [np.zeros((chans, self.zeros_at_start))]
+        self.precision = precision
+        if capacity is None:
+            capacity = int(info["sfreq"] * 60)
+        self._buffer = GrowableBuffer(
+            chans,
+            capacity=max(capacity, zeros_at_start),
+            dtype=PRECISION_DTYPES[precision],
+        )
+        self._buffer.append(np.zeros((chans, self.zeros_at_start)))
         self.connectivity: list = []
         self.annotations: dict = {}
+        self._converted: typing.Optional[GrowableBuffer] = None
+        self._converted_rows: typing.Optional[list] = None
+        # first sample of the stream, annotations are aligned to it
+        self._first_samples: typing.Optional[np.ndarray] = None
+
+    @property
+    def data(self) -> np.ndarray:
+        """All accumulated samples, shape (channels, samples), without copying"""
+        return self._buffer.view()
+
+    def append(self, chunk) -> None:
+        """Append a data chunk
+
+        Parameters
+        ------------
+        chunk: np.ndarray or list
+            data chunk, shape (channels, samples)
+
+        """
+        chunk = np.asarray(chunk)
+        if self._first_samples is None:
+            self._first_samples = chunk[:, 0].copy()
+        self._buffer.append(chunk)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def clear(self) -> None:
+        """Drops the accumulated samples and annotations, keeping the capacity"""
+        with self.lock:
+            self._buffer.clear()
+            self._buffer.append(np.zeros((self._buffer.chans, self.zeros_at_start)))
+            self._first_samples = None
+            self.annotations = {}
+            self._converted = None
+            self._converted_rows = None
 
     def save(self, fname: str):
         """
@@ -451,7 +793,9 @@ class EEGData:
             filename to save data to
         """
         with self.lock:
-            self.mne_raw.save(fname=fname, verbose=False, overwrite=True, fmt="double")
+            self.mne_raw.save(
+                fname=fname, verbose=False, overwrite=True, fmt=self.precision
+            )
 
     def load(self, fname: str):
         self.mne_raw = mne.io.read_raw(fname, verbose=False)
@@ -462,6 +806,7 @@ class EEGData:
         samples: typing.Optional[int] = None,
         annotations: bool = True,
         channels_indexes: typing.Optional[list] = None,
+        incremental: bool = False,
     ):
         """Convert arrays to MNE.
         If tim None returns all data from acquisition start.
@@ -475,56 +820,474 @@ class EEGData:
             time in samples till the end to include in the output
         annotations: bool, default value = True
             should annotations be included
+        incremental: bool, default value = False
+            reuse the samples converted by the previous incremental call and
+            only copy the new ones. Applies to the full recording only, the
+            resulting raw shares memory with the cache and is read-only,
+            use mne_raw.copy() before processing it in place
 
         """
         with self.lock:
-            _length = len(self.data)
+            _length = len(self._buffer)
         if _length > 0:
-            if annotations:
-                timestamp_correction = np.block(self.data)[0][0]
-                onset = []
-                description = []
-                for idx, annotation in enumerate(self.annotations["annotations"]):
-                    description.append(annotation)
-                    timestamp = self.annotations["timestamps"][idx]
-                    onset.append(
-                        (timestamp + self.zeros_at_start - timestamp_correction)
-                        / self.eeg_info["sfreq"]
-                    )
-                duration = np.repeat(0, len(onset))
             if tim:
                 # convert tim to samples
-                tim = int(tim * self.eeg_info["sfreq"])
-                data = self._concat_data()
-                data = data[:, -tim:]
-                # fix annotations
-                if annotations:
-                    onset = [x - tim for x in onset]
-                    duration = np.repeat(0, len(onset))
-            elif samples:
-                data = self._concat_data()
-                data = data[:, -samples:]
-                # fix annotations
-                if annotations:
-                    onset = [x - samples for x in onset]
-                    duration = np.repeat(0, len(onset))
+                samples = int(tim * self.eeg_info["sfreq"])
+            if samples:
+                data = self._concat_data(samples, channels_indexes)
+            elif incremental:
+                data = self._update_converted(channels_indexes)
             else:
-                data = self._concat_data()
-            # select right order channels
-            if channels_indexes:
-                data = data[channels_indexes]
+                data = self._concat_data(channels_indexes=channels_indexes)
             self.mne_raw = mne.io.RawArray(
                 data,
                 self.eeg_info,
                 verbose=False,
             )
             if annotations:
-                annot = mne.Annotations(onset, duration, description)
+                positions, descriptions = self.annotation_positions(channels_indexes)
+                # onsets relative to the first returned sample
+                start = (_length - data.shape[1]) / self.eeg_info["sfreq"]
+                onset = positions / self.eeg_info["sfreq"] - start
+                duration = np.zeros(len(onset))
+                annot = mne.Annotations(onset, duration, descriptions)
                 self.mne_raw.set_annotations(annot, verbose=False)
         else:
             print("No data to convert to MNE structure")
 
-    def _concat_data(self):
+    def tail(
+        self, samples: int, channels_indexes: typing.Optional[list] = None
+    ) -> np.ndarray:
+        """Copy of the last samples, cost depends only on the window size
+
+        Parameters
+        ------------
+        samples: int
+            number of most recent samples to return
+        channels_indexes: list, default value = None
+            buffer row of every channel in info order
+
+        Returns
+        --------
+        np.ndarray
+            shape (channels, min(samples, len(data)))
+        """
+        return self._concat_data(samples, channels_indexes)
+
+    def segment(
+        self, start: int, channels_indexes: typing.Optional[list] = None
+    ) -> typing.Tuple[np.ndarray, int]:
+        """Copy of the samples stored from buffer position start on
+
+        Parameters
+        ------------
+        start: int
+            first buffer position to copy
+        channels_indexes: list, default value = None
+            buffer row of every channel in info order
+
+        Returns
+        --------
+        np.ndarray
+            shape (channels, samples)
+        int
+            buffer position after the last copied sample
+        """
+        with self.lock:
+            data = self._buffer.view()[:, start:]
+            end = start + data.shape[1]
+            if channels_indexes:
+                return data[channels_indexes], end
+            return data.copy(), end
+
+    def annotation_positions(
+        self, channels_indexes: typing.Optional[list] = None
+    ) -> typing.Tuple[np.ndarray, list]:
+        """Buffer positions and descriptions of the annotations
+
+        Returns
+        --------
+        np.ndarray
+            buffer position of every annotation, as used by convert_to_mne
+        list
+            annotation descriptions
+        """
+        row = _sample_row(self.eeg_info, channels_indexes)
         with self.lock:
-            data = np.block(self.data)
+            # lost samples are not in the buffer, positions follow the Sample row
+            positions = self.zeros_at_start + _sample_positions(
+                self._buffer.view()[row, self.zeros_at_start :],
+                self.annotations.get("timestamps", []),
+            )
+        return positions, list(self.annotations.get("annotations", []))
+
+    def _update_converted(
+        self, channels_indexes: typing.Optional[list] = None
+    ) -> np.ndarray:
+        """Copy samples added since the last call into the conversion cache
+
+        Returns
+        --------
+        np.ndarray
+            read-only view of all converted samples in info channel order
+        """
+        rows = list(channels_indexes) if channels_indexes else None
+        with self.lock:
+            if (
+                self._converted is None
+                or rows != self._converted_rows
+                # the buffer was cleared since the last call
+                or len(self._converted) > len(self._buffer)
+            ):
+                self._converted = GrowableBuffer(
+                    len(self.eeg_info.ch_names), capacity=self._buffer.capacity
+                )
+                self._converted_rows = rows
+            new = self._buffer.view()[:, len(self._converted) :]
+            self._converted.append(new[rows] if rows else new)
+        data = self._converted.view()
+        data.flags.writeable = False
         return data
+
+    def _concat_data(
+        self,
+        samples: typing.Optional[int] = None,
+        channels_indexes: typing.Optional[list] = None,
+    ) -> np.ndarray:
+        """Copy the stored data, optionally only the last samples,
+        with channels in the requested order"""
+        with self.lock:
+            if samples is None:
+                data = self._buffer.view()
+            else:
+                data = self._buffer.tail(samples)
+            # select right order channels, fancy indexing already copies
+            if channels_indexes:
+                return data[channels_indexes]
+            return data.copy()
+
+
+class EEGData_disk:
+    """Object to stream EEG data to disk while acquiring
+
+    Chunks are appended to a BrainVision binary file (multiplexed float32)
+    as they arrive, so memory use does not grow with the recording length
+    and closing the recording only writes the small header and marker files.
+    """
+
+    def __init__(
+        self, info, lock, zeros_at_start: int = 0, precision: str = "single"
+    ):
+        if not lock:
+            raise BrainAccessException("No lock passed")
+        self.eeg_info: mne.Info = info
+        self.mne_raw: mne.io.BaseRaw
+        # the recording file is always float32, precision applies to save
+        self.precision = precision
+        self.lock = lock
+        self.chans = len(info.ch_names)
+        self.zeros_at_start = zeros_at_start
+        self.connectivity: list = []
+        self.annotations: dict = {}
+        self.fname: typing.Optional[pathlib.Path] = None
+        self._fid: typing.Optional[typing.BinaryIO] = None
+        self._length = 0
+        self._first_samples: typing.Optional[np.ndarray] = None
+        self._channels_indexes: list = list(range(self.chans))
+        # first sample number and file position of every continuous run of
+        # samples, lost samples are not in the file
+        self._run_samples: typing.List[int] = []
+        self._run_positions: typing.List[int] = []
+        self._run_last = 0.0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def is_open(self) -> bool:
+        return self._fid is not None
+
+    def open(self, fname: typing.Union[str, pathlib.Path]) -> pathlib.Path:
+        """Starts a new recording file
+
+        Parameters
+        ------------
+        fname: str
+            recording file name, the extension is replaced with .vhdr
+            (header), .vmrk (markers) and .eeg (samples)
+
+        Returns
+        --------
+        pathlib.Path
+            path to the header file, which is passed to mne.io.read_raw_brainvision
+
+        """
+        self.close()
+        self.fname = pathlib.Path(fname).with_suffix(".vhdr")
+        self.fname.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            self._fid = open(self.fname.with_suffix(".eeg"), "wb", buffering=1 << 20)
+            self._length = 0
+            self._first_samples = None
+            self._run_samples = []
+            self._run_positions = []
+            self.annotations = {}
+            if self.zeros_at_start:
+                self._write(np.zeros((self.chans, self.zeros_at_start)))
+        self._write_header()
+        self._write_markers()
+        return self.fname
+
+    def set_channels_indexes(self, channels_indexes: list) -> None:
+        """Sets the position of each channel of info in the data chunks
+
+        Parameters
+        ------------
+        channels_indexes: list
+            chunk row of every channel in info order
+
+        """
+        self._channels_indexes = list(channels_indexes)
+        if self.fname is not None:
+            self._write_header()
+
+    def append(self, chunk) -> None:
+        """Append a data chunk to the recording file
+
+        Parameters
+        ------------
+        chunk: np.ndarray or list
+            data chunk, shape (channels, samples)
+
+        """
+        if self._fid is None:
+            return
+        chunk = np.asarray(chunk)
+        if chunk.shape[1] == 0:
+            return
+        numbers = chunk[_sample_row(self.eeg_info, self._channels_indexes)]
+        if self._first_samples is None:
+            self._first_samples = chunk[:, 0].copy()
+            steps = np.diff(numbers, prepend=numbers[0] - 2)
+        else:
+            steps = np.diff(numbers, prepend=self._run_last)
+        starts = np.flatnonzero(steps != 1)
+        self._run_samples.extend(numbers[starts].astype(np.int64).tolist())
+        self._run_positions.extend((self._length + starts).tolist())
+        self._run_last = numbers[-1]
+        self._write(chunk)
+
+    def _write(self, chunk: np.ndarray) -> None:
+        # multiplexed layout, all channels of one sample are stored together
+        self._fid.write(np.ascontiguousarray(chunk.T, dtype="<f4"))
+        self._length += chunk.shape[1]
+
+    def flush(self) -> None:
+        """Flushes buffered samples to disk"""
+        with self.lock:
+            if self._fid is not None:
+                self._fid.flush()
+
+    def close(self) -> None:
+        """Finishes the recording file and writes the markers"""
+        with self.lock:
+            if self._fid is None:
+                return
+            self._fid.close()
+            self._fid = None
+        self._write_header()
+        self._write_markers()
+
+    def move(self, fname: typing.Union[str, pathlib.Path]) -> pathlib.Path:
+        """Moves a closed recording to another location
+
+        Parameters
+        ------------
+        fname: str
+            new recording file name, the extension is replaced as in open
+
+        Returns
+        --------
+        pathlib.Path
+            path to the new header file
+
+        """
+        if self.fname is None or self.is_open:
+            raise BrainAccessException("No closed recording to move")
+        old = self.fname
+        self.fname = pathlib.Path(fname).with_suffix(".vhdr")
+        self.fname.parent.mkdir(parents=True, exist_ok=True)
+        old.with_suffix(".eeg").replace(self.fname.with_suffix(".eeg"))
+        old.unlink()
+        old.with_suffix(".vmrk").unlink()
+        self._write_header()
+        self._write_markers()
+        return self.fname
+
+    def tail(
+        self, samples: int, channels_indexes: typing.Optional[list] = None
+    ) -> np.ndarray:
+        """Reads the last samples back from the recording file
+
+        Parameters
+        ------------
+        samples: int
+            number of most recent samples to return
+        channels_indexes: list, default value = None
+            chunk row of every channel in info order
+
+        Returns
+        --------
+        np.ndarray
+            shape (channels, min(samples, len(data)))
+        """
+        if channels_indexes:
+            self._channels_indexes = list(channels_indexes)
+        self.flush()
+        with self.lock:
+            length = self._length
+        samples = min(int(samples), length)
+        data = np.fromfile(
+            self.fname.with_suffix(".eeg"),
+            dtype="<f4",
+            count=samples * self.chans,
+            offset=(length - samples) * self.chans * 4,
+        )
+        data = data.reshape((samples, self.chans)).T
+        return data[self._channels_indexes].astype(np.float64)
+
+    def _stream_ch_names(self) -> list:
+        """Channel names in the order of the rows of the data chunks"""
+        names = [f"ch{row}" for row in range(self.chans)]
+        for name, row in zip(self.eeg_info.ch_names, self._channels_indexes):
+            if row < self.chans:
+                names[row] = name
+        return names
+
+    def _write_header(self) -> None:
+        base = self.fname.with_suffix("")
+        ch_types = dict(
+            zip(self.eeg_info.ch_names, self.eeg_info.get_channel_types())
+        )
+        lines = [
+            "Brain Vision Data Exchange Header File Version 1.0",
+            "",
+            "[Common Infos]",
+            "Codepage=UTF-8",
+            f"DataFile={base.name}.eeg",
+            f"MarkerFile={base.name}.vmrk",
+            "DataFormat=BINARY",
+            "DataOrientation=MULTIPLEXED",
+            f"NumberOfChannels={self.chans}",
+            f"SamplingInterval={1e6 / self.eeg_info['sfreq']:g}",
+            "",
+            "[Binary Infos]",
+            "BinaryFormat=IEEE_FLOAT_32",
+            "",
+            "[Channel Infos]",
+        ]
+        for idx, name in enumerate(self._stream_ch_names()):
+            # samples are stored as received, like in the FIF output
+            unit = "V" if ch_types.get(name) == "eeg" else "n/a"
+            lines.append(f"Ch{idx + 1}={name.replace(',', chr(1))},,1,{unit}")
+        self.fname.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def _marker_positions(self) -> typing.Tuple[list, list]:
+        """Annotation sample positions from the start of the file"""
+        if not self.annotations or not self._run_samples:
+            return [], []
+        timestamps = np.asarray(self.annotations["timestamps"], dtype=np.int64)
+        samples = np.asarray(self._run_samples)
+        starts = np.asarray(self._run_positions)
+        run = np.maximum(np.searchsorted(samples, timestamps, side="right") - 1, 0)
+        positions = starts[run] + timestamps - samples[run]
+        # sample numbers inside a gap go to the first sample after it
+        ends = np.append(starts[1:], np.iinfo(np.int64).max)
+        positions = np.minimum(positions, ends[run])
+        return positions.tolist(), list(self.annotations["annotations"])
+
+    def _write_markers(self) -> None:
+        base = self.fname.with_suffix("")
+        lines = [
+            "Brain Vision Data Exchange Marker File, Version 1.0",
+            "",
+            "[Common Infos]",
+            "Codepage=UTF-8",
+            f"DataFile={base.name}.eeg",
+            "",
+            "[Marker Infos]",
+        ]
+        for idx, (position, description) in enumerate(
+            zip(*self._marker_positions())
+        ):
+            description = description.replace(",", chr(1))
+            lines.append(f"Mk{idx + 1}=Comment,{description},{position + 1},1,0")
+        self.fname.with_suffix(".vmrk").write_text(
+            "\n".join(lines) + "\n", encoding="utf-8"
+        )
+
+    def save(self, fname: str):
+        """
+        Parameters
+        ------------
+        fname: str
+            filename to save data to
+        """
+        with self.lock:
+            self.mne_raw.save(
+                fname=fname, verbose=False, overwrite=True, fmt=self.precision
+            )
+
+    def load(self, fname: str):
+        self.mne_raw = mne.io.read_raw(fname, verbose=False)
+
+    def convert_to_mne(
+        self,
+        tim: typing.Optional[float] = None,
+        samples: typing.Optional[int] = None,
+        annotations: bool = True,
+        channels_indexes: typing.Optional[list] = None,
+    ):
+        """Open the recording file as MNE structure without loading it to memory.
+        If tim None returns all data from acquisition start.
+        Otherwise last tim seconds
+
+        Parameters
+        ------------
+        tim: float, default value = None
+            time in seconds till the end to include in the output
+        samples: int, default value = None
+            time in samples till the end to include in the output
+        annotations: bool, default value = True
+            should annotations be included
+
+        """
+        if channels_indexes:
+            self._channels_indexes = list(channels_indexes)
+        if self.fname is None or self._length == 0:
+            print("No data to convert to MNE structure")
+            return
+        self.flush()
+        self._write_header()
+        with self.lock:
+            length = self._length
+        sfreq = self.eeg_info["sfreq"]
+        raw = mne.io.read_raw_brainvision(self.fname, preload=False, verbose=False)
+        raw.crop(tmax=(length - 1) / sfreq, include_tmax=True)
+        raw.reorder_channels(self.eeg_info.ch_names)
+        raw.set_channel_types(
+            dict(zip(self.eeg_info.ch_names, self.eeg_info.get_channel_types())),
+            verbose=False,
+        )
+        if annotations:
+            positions, description = self._marker_positions()
+            onset = np.array(positions, dtype=float) / sfreq
+            raw.set_annotations(
+                mne.Annotations(onset, np.zeros(len(onset)), description),
+                verbose=False,
+            )
+        if tim:
+            samples = int(tim * sfreq)
+        if samples and samples < length:
+            raw.crop(tmin=(length - samples) / sfreq)
+        self.mne_raw = raw
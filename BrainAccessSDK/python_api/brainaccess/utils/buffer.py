@@ -0,0 +1,228 @@
+import typing
+import numpy as np
+
+
+class GrowableBuffer:
+    """Contiguous (channels x samples) sample buffer.
+
+    Samples are written into a preallocated array whose capacity doubles
+    whenever it runs out, so appending a chunk is amortized O(chunk size)
+    and the stored data can be read back as a view without concatenation.
+    """
+
+    def __init__(
+        self,
+        chans: int,
+        capacity: int = 15000,
+        dtype: typing.Any = np.float64,
+    ) -> None:
+        """
+        Parameters
+        ------------
+        chans: int
+            number of channels (rows) in the buffer
+        capacity: int
+            number of samples to preallocate
+        dtype
+            sample data type
+
+        """
+        self.chans = chans
+        self._data = np.zeros((chans, max(int(capacity), 1)), dtype=dtype)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        """Number of samples that fit before the next reallocation"""
+        return self._data.shape[1]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._data.dtype
+
+    def _reserve(self, length: int) -> None:
+        capacity = self.capacity
+        if length <= capacity:
+            return
+        while capacity < length:
+            capacity *= 2
+        data = np.empty((self.chans, capacity), dtype=self._data.dtype)
+        data[:, : self._length] = self._data[:, : self._length]
+        self._data = data
+
+    def append(self, chunk: typing.Union[np.ndarray, list]) -> None:
+        """Append a chunk of samples
+
+        Parameters
+        ------------
+        chunk: np.ndarray or list
+            data chunk, shape (channels, samples) or a list of per channel arrays
+
+        """
+        if not isinstance(chunk, np.ndarray):
+            chunk = np.asarray(chunk)
+        if chunk.ndim == 1:
+            chunk = chunk.reshape((self.chans, -1))
+        n = chunk.shape[1]
+        self._reserve(self._length + n)
+        self._data[:, self._length : self._length + n] = chunk
+        self._length += n
+
+    def view(self) -> np.ndarray:
+        """Returns all stored samples without copying
+
+        Returns
+        --------
+        np.ndarray
+            view into the buffer, shape (channels, samples)
+
+        Warning
+        --------
+        The view is only valid until the next append that grows the buffer.
+        """
+        return self._data[:, : self._length]
+
+    def tail(self, samples: int) -> np.ndarray:
+        """Returns the last samples without copying
+
+        Parameters
+        ------------
+        samples: int
+            number of most recent samples to return
+
+        Returns
+        --------
+        np.ndarray
+            view into the buffer, shape (channels, min(samples, len(buffer)))
+        """
+        start = max(self._length - int(samples), 0)
+        return self._data[:, start : self._length]
+
+    def clear(self) -> None:
+        """Drops stored samples, keeping the allocated capacity"""
+        self._length = 0
+
+
+class RingBuffer:
+    """Fixed length (channels x samples) circular sample buffer.
+
+    New chunks overwrite the oldest samples at a write head, so appending
+    costs O(chunk size) regardless of the window length. Data is read back
+    in chronological order through :meth:`view` and :meth:`tail`.
+    """
+
+    def __init__(
+        self, chans: int, length: int, dtype: typing.Any = np.float64
+    ) -> None:
+        """
+        Parameters
+        ------------
+        chans: int
+            number of channels (rows) in the buffer
+        length: int
+            window length in samples
+        dtype
+            sample data type
+
+        """
+        self.chans = chans
+        self._data = np.zeros((chans, int(length)), dtype=dtype)
+        self._head = 0
+
+    def __len__(self) -> int:
+        return self._data.shape[1]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._data.dtype
+
+    @property
+    def head(self) -> int:
+        """Index where the next sample will be written"""
+        return self._head
+
+    def append(self, chunk: typing.Union[np.ndarray, list]) -> None:
+        """Write a chunk of samples over the oldest ones
+
+        Parameters
+        ------------
+        chunk: np.ndarray or list
+            data chunk, shape (channels, samples) or a list of per channel arrays
+
+        """
+        if not isinstance(chunk, np.ndarray):
+            chunk = np.asarray(chunk)
+        if chunk.ndim == 1:
+            chunk = chunk.reshape((self.chans, -1))
+        length = len(self)
+        if length == 0:
+            return
+        n = chunk.shape[1]
+        if n >= length:
+            self._data[:] = chunk[:, n - length :]
+            self._head = 0
+            return
+        end = self._head + n
+        if end <= length:
+            self._data[:, self._head : end] = chunk
+        else:
+            split = length - self._head
+            self._data[:, self._head :] = chunk[:, :split]
+            self._data[:, : n - split] = chunk[:, split:]
+        self._head = end % length
+
+    def view(self, copy: bool = False) -> np.ndarray:
+        """Returns the window in chronological order
+
+        Parameters
+        ------------
+        copy: bool
+            always return an array that does not share memory with the buffer
+
+        Returns
+        --------
+        np.ndarray
+            shape (channels, length), a view if the window is not wrapped,
+            otherwise an ordered copy
+        """
+        if self._head == 0:
+            return self._data.copy() if copy else self._data
+        return np.concatenate(
+            (self._data[:, self._head :], self._data[:, : self._head]), axis=1
+        )
+
+    def tail(self, samples: int, copy: bool = False) -> np.ndarray:
+        """Returns the last samples in chronological order
+
+        Parameters
+        ------------
+        samples: int
+            number of most recent samples to return
+        copy: bool
+            always return an array that does not share memory with the buffer
+
+        Returns
+        --------
+        np.ndarray
+            shape (channels, min(samples, length)), copied only if it wraps
+        """
+        samples = min(int(samples), len(self))
+        start = self._head - samples
+        if start >= 0:
+            data = self._data[:, start : self._head]
+            return data.copy() if copy else data
+        return np.concatenate(
+            (self._data[:, start:], self._data[:, : self._head]), axis=1
+        )
+
+    def oldest(self) -> np.ndarray:
+        """Returns the oldest sample of each channel without copying"""
+        return self._data[:, self._head % max(len(self), 1)]
+
+    def clear(self) -> None:
+        """Zeroes the window and resets the write head"""
+        self._data[:] = 0
+        self._head = 0
@@ -0,0 +1,220 @@
+"""Crash-safe checkpoints of an accumulating recording
+
+Merge the segments of an interrupted recording, usage:
+    python -m brainaccess.utils.checkpoint SEGMENT_DIR OUTPUT_raw.fif
+"""
+
+import argparse
+import os
+import pathlib
+import threading
+import typing
+import warnings
+
+import mne  # type: ignore
+import numpy as np
+
+from brainaccess.utils.exceptions import BrainAccessException
+
+SEGMENT_PATTERN = "segment_*_raw.fif"
+
+
+class RecordingCheckpointer:
+    """Periodically writes the samples and annotations received since the
+    previous checkpoint to numbered FIF segment files.
+
+    Checkpoints run in their own thread, at a fixed interval or right away
+    when requested (e.g. at the start of a break). The acquisition data lock
+    is only held to copy the new samples, so the stream is not slowed down by
+    file writing. Each segment is written under a temporary name and renamed,
+    so a crash leaves only complete segments, which merge_segments joins into
+    the recording get_mne would have returned.
+    """
+
+    def __init__(
+        self,
+        eeg,
+        directory: typing.Union[str, pathlib.Path],
+        interval: typing.Optional[float] = 60.0,
+    ) -> None:
+        """
+        Parameters
+        ------------
+        eeg: brainaccess.utils.acquisition.EEG
+            acquisition in accumulate mode
+        directory: str or pathlib.Path
+            folder for the segment files, created if needed
+        interval: float, default value = 60.0
+            seconds between checkpoints, None only checkpoints on request
+
+        """
+        if eeg.mode != "accumulate":
+            raise BrainAccessException("Checkpoints need accumulate mode")
+        self.eeg = eeg
+        self.directory = pathlib.Path(directory)
+        self.interval = interval
+        self.segments: typing.List[pathlib.Path] = []
+        self._next_sample = 0
+        self._written_annotations = 0
+        self._lock = threading.Lock()
+        self._requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts the checkpoint thread"""
+        if self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="brainaccess-checkpoint", daemon=True
+        )
+        self._thread.start()
+
+    def request(self) -> None:
+        """Asks for a checkpoint as soon as possible, does not wait for it"""
+        self._requested.set()
+
+    def stop(self, final: bool = True) -> None:
+        """Stops the checkpoint thread
+
+        Parameters
+        ------------
+        final: bool
+            write the samples received since the last checkpoint
+
+        """
+        self._stop.set()
+        self._requested.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if final:
+            self.checkpoint()
+
+    def remove(self) -> None:
+        """Deletes the segment files, e.g. once the full recording is saved"""
+        for segment in self.segments:
+            segment.unlink(missing_ok=True)
+        self.segments = []
+        try:
+            self.directory.rmdir()
+        except OSError:
+            pass
+
+    def checkpoint(self) -> typing.Optional[pathlib.Path]:
+        """Writes the samples received since the previous checkpoint
+
+        Returns
+        --------
+        pathlib.Path or None
+            the new segment file, None if there were no new samples
+        """
+        with self._lock:
+            channels_indexes = list(self.eeg.channels_indexes.values())
+            data, end = self.eeg.data.segment(self._next_sample, channels_indexes)
+            if end == self._next_sample:
+                return None
+            self.eeg.get_annotations()
+            positions, descriptions = self.eeg.data.annotation_positions(
+                channels_indexes
+            )
+            # every annotation goes to exactly one segment, the first one
+            # written after it is received, annotations stamped after the
+            # segment end wait for the next one
+            first = self._written_annotations
+            pending = positions[first:]
+            later = np.flatnonzero(pending >= end)
+            count = int(later[0]) if len(later) else len(pending)
+            # late annotations stamped inside the previous segment start this one
+            onsets = np.maximum(pending[:count], self._next_sample)
+            sfreq = self.eeg.info["sfreq"]
+            raw = mne.io.RawArray(data, self.eeg.info, verbose=False)
+            raw.set_annotations(
+                mne.Annotations(
+                    (onsets - self._next_sample) / sfreq,
+                    np.zeros(count),
+                    list(descriptions[first : first + count]),
+                ),
+                verbose=False,
+            )
+            fname = self.directory / f"segment_{len(self.segments):04d}_raw.fif"
+            partial = fname.with_name(f"partial_{fname.name}")
+            raw.save(partial, fmt=self.eeg.precision, overwrite=True, verbose=False)
+            os.replace(partial, fname)
+            self.segments.append(fname)
+            self._next_sample = end
+            self._written_annotations = first + count
+            return fname
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._requested.wait(self.interval)
+            self._requested.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.checkpoint()
+            except Exception as e:
+                # keep recording, the next checkpoint includes these samples
+                warnings.warn(f"Checkpoint failed: {e!r}")
+
+
+def merge_segments(
+    directory: typing.Union[str, pathlib.Path],
+    fname: typing.Union[str, pathlib.Path],
+    precision: str = "single",
+) -> mne.io.BaseRaw:
+    """Joins the segment files of a recording into one FIF file
+
+    Parameters
+    ------------
+    directory: str or pathlib.Path
+        folder with the segment files
+    fname: str or pathlib.Path
+        FIF file to write
+    precision: str
+        single or double FIF sample format
+
+    Returns
+    --------
+    mne.io.BaseRaw
+        the merged recording
+    """
+    segments = sorted(pathlib.Path(directory).glob(SEGMENT_PATTERN))
+    if not segments:
+        raise BrainAccessException(f"No segments found in {directory}")
+    raws = [mne.io.read_raw_fif(segment, verbose=False) for segment in segments]
+    sfreq = raws[0].info["sfreq"]
+    onsets, descriptions = [], []
+    offset = 0
+    for raw in raws:
+        onsets.extend((raw.annotations.onset + offset / sfreq).tolist())
+        descriptions.extend(raw.annotations.description.tolist())
+        offset += raw.n_times
+    # segments are contiguous, joined without boundary annotations
+    merged = mne.io.RawArray(
+        np.concatenate([raw.get_data() for raw in raws], axis=1),
+        raws[0].info,
+        verbose=False,
+    )
+    merged.set_annotations(
+        mne.Annotations(onsets, np.zeros(len(onsets)), descriptions), verbose=False
+    )
+    merged.save(fname, fmt=precision, overwrite=True, verbose=False)
+    return merged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge recording segment files")
+    parser.add_argument("directory", help="folder with the segment files")
+    parser.add_argument("output", help="FIF file to write")
+    parser.add_argument("--precision", choices=["single", "double"], default="single")
+    args = parser.parse_args()
+    raw = merge_segments(args.directory, args.output, args.precision)
+    print(f"{raw.n_times} samples written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import collections
+import threading
+import time
+import typing
+import warnings
+
+
+class ChunkQueue:
+    """Bounded handoff of data chunks from the stream thread to a consumer thread.
+
+    The stream thread only appends to a deque and signals an event, so it never
+    waits for the consumer callback. When the queue is full the incoming chunk
+    is dropped and counted instead of blocking the stream. Each counter is only
+    written by one thread (producer or consumer), so no lock is needed.
+    """
+
+    def __init__(self, callback: typing.Callable, maxsize: int = 256) -> None:
+        """
+        Parameters
+        ------------
+        callback: Callable
+            function called with (chunk, chunk_size) in the consumer thread
+        maxsize: int
+            number of chunks that can wait for the consumer
+
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.callback = callback
+        self.maxsize = maxsize
+        self.received = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.high_water_mark = 0
+        self._chunks: collections.deque = collections.deque()
+        self._ready = threading.Event()
+        self._running = False
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def start(self) -> None:
+        """Starts the consumer thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._consume, name="brainaccess-chunk-queue", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: typing.Optional[float] = 1.0) -> None:
+        """Delivers queued chunks and stops the consumer thread
+
+        Parameters
+        ------------
+        timeout: float
+            seconds to wait for the consumer thread
+
+        """
+        self._running = False
+        self._ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def put(self, chunk, chunk_size: int) -> bool:
+        """Queues a chunk without blocking, called from the stream thread
+
+        Returns
+        --------
+        bool
+            False if the queue was full and the chunk was dropped
+        """
+        self.received += 1
+        size = len(self._chunks)
+        if size >= self.maxsize:
+            self.dropped += 1
+            return False
+        self._chunks.append((chunk, chunk_size))
+        if size + 1 > self.high_water_mark:
+            self.high_water_mark = size + 1
+        self._ready.set()
+        return True
+
+    def join(self, timeout: typing.Optional[float] = 1.0) -> bool:
+        """Waits until every queued chunk was passed to the callback
+
+        Parameters
+        ------------
+        timeout: float
+            maximum seconds to wait, None waits forever
+
+        Returns
+        --------
+        bool
+            True if the queue was drained
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        while self.delivered < self.received - self.dropped:
+            if end is not None and time.monotonic() > end:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def stats(self) -> dict:
+        """Returns queue counters
+
+        Returns
+        --------
+        dict
+            received, delivered and dropped chunk counts, current queue size
+            and the largest queue size seen (high_water_mark)
+        """
+        return {
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "size": len(self._chunks),
+            "high_water_mark": self.high_water_mark,
+        }
+
+    def _consume(self) -> None:
+        while True:
+            self._ready.wait()
+            self._ready.clear()
+            while self._chunks:
+                chunk, chunk_size = self._chunks.popleft()
+                try:
+                    self.callback(chunk, chunk_size)
+                except Exception as e:
+                    # keep consuming, a failing callback must not stall the stream
+                    warnings.warn(f"Chunk callback failed: {e!r}")
+                self.delivered += 1
+            if not self._running:
+                return
@@ -0,0 +1,39 @@
+import math
+
+# assumed time between a full chunk and its callback (Bluetooth transport and
+# decoding), benchmarks/chunk_size.py measures the Python side on top of it
+DEFAULT_TRANSPORT_DELAY = 0.02
+
+
+def chunk_size_for_latency(
+    sfreq: float,
+    latency_budget: float,
+    transport_delay: float = DEFAULT_TRANSPORT_DELAY,
+    max_chunk_size: int = 250,
+) -> int:
+    """Largest chunk size that keeps the delay of every sample within a budget
+
+    The oldest sample of a chunk waits (chunk_size - 1) / sfreq seconds for
+    the chunk to fill before it is delivered. Larger chunks mean fewer
+    callbacks and less CPU per sample, so the largest size that fits is used.
+
+    Parameters
+    ------------
+    sfreq: float
+        sampling frequency in Hz
+    latency_budget: float
+        maximum delay in seconds from a sample being measured to the callback
+    transport_delay: float
+        delay in seconds added after the chunk is complete
+    max_chunk_size: int
+        upper limit for the chunk size
+
+    Returns
+    --------
+    int
+        chunk size, at least 1
+
+    """
+    # rounding keeps budgets that are exact multiples of the sample period
+    samples = math.floor(round((latency_budget - transport_delay) * sfreq, 6)) + 1
+    return max(1, min(samples, max_chunk_size))
@@ -0,0 +1,130 @@
+import functools
+import typing
+
+import numpy as np
+
+from brainaccess.connect.stream_filter import StreamFilter
+
+IMPEDANCE_DRIVE_AMPS = 6.0e-9  # 6 nA
+BOARD_RESISTOR_OHMS = 4.7e3  # 4.7 kOhm
+
+
+def impedance_from_std(std: np.ndarray) -> np.ndarray:
+    """Electrode impedance from the amplitude of the drive signal
+
+    Calculated as in https://openbci.com/community/openbci-measuring-electrode-impedance/
+
+    Parameters
+    ------------
+    std: np.ndarray
+        standard deviation of the 20-40 Hz filtered signal in microvolts
+
+    Returns
+    --------
+    np.ndarray
+        impedances in kOhm, negative values are set to 0
+    """
+    impedance = (
+        (np.sqrt(2.0) * np.asarray(std) * 1.0e-6) / IMPEDANCE_DRIVE_AMPS
+        - BOARD_RESISTOR_OHMS
+    ) / 1000
+    impedance[impedance < 0] = 0
+    return impedance
+
+
+@functools.lru_cache(maxsize=16)
+def _decay_weights(decay: float, chunk_size: int) -> np.ndarray:
+    """Weight of each sample of a chunk after the whole chunk was added"""
+    weights = decay ** np.arange(chunk_size - 1, -1, -1, dtype=np.float64)
+    weights.flags.writeable = False
+    return weights
+
+
+class ImpedanceEstimator:
+    """Streaming electrode impedance during impedance measurement mode.
+
+    Each chunk is band-pass filtered around the 31.2 Hz drive signal with a
+    causal filter that keeps its state, and exponentially weighted sums of the
+    filtered samples and their squares are updated with one matrix product.
+    Reading the impedances only takes the square root of the running
+    variance, so they can be refreshed many times per second.
+    """
+
+    def __init__(
+        self,
+        sfreq: float,
+        rows: typing.Optional[list] = None,
+        window: float = 4.0,
+        freq_low: float = 20.0,
+        freq_high: float = 40.0,
+    ) -> None:
+        """
+        Parameters
+        ------------
+        sfreq: float
+            sampling frequency in Hz
+        rows: list, default value = None
+            chunk rows of the electrodes, all rows if None
+        window: float
+            time constant of the running variance in seconds
+        freq_low: float
+            lower edge of the drive signal band
+        freq_high: float
+            upper edge of the drive signal band
+
+        """
+        self.sfreq = sfreq
+        self.rows = None if rows is None else list(rows)
+        self.window = window
+        self.decay = float(np.exp(-1.0 / (window * sfreq)))
+        self.filter = StreamFilter.bandpass(sfreq, freq_low, freq_high, order=4)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all samples"""
+        self.filter.reset()
+        self.samples = 0
+        self._state: typing.Optional[tuple] = None
+
+    def update(self, chunk: np.ndarray) -> None:
+        """Adds a chunk of samples
+
+        Parameters
+        ------------
+        chunk: np.ndarray
+            data chunk, shape (channels, samples)
+
+        """
+        data = np.asarray(chunk)
+        if self.rows is not None:
+            data = data[self.rows]
+        size = data.shape[1]
+        if size == 0:
+            return
+        filtered = self.filter.process(data)
+        weights = _decay_weights(self.decay, size)
+        added = (filtered @ weights, (filtered * filtered) @ weights, weights.sum())
+        if self._state is not None:
+            carry = self.decay**size
+            added = tuple(
+                previous * carry + new for previous, new in zip(self._state, added)
+            )
+        # replaced as a whole, readers in other threads see a consistent state
+        self._state = added
+        self.samples += size
+
+    def std(self) -> typing.Optional[np.ndarray]:
+        """Running standard deviation of the filtered signal, None before data"""
+        state = self._state
+        if state is None:
+            return None
+        total, total_squares, weight = state
+        mean = total / weight
+        return np.sqrt(np.maximum(total_squares / weight - mean * mean, 0.0))
+
+    def impedances(self) -> typing.Optional[np.ndarray]:
+        """Current impedances in kOhm, None before data"""
+        std = self.std()
+        if std is None:
+            return None
+        return impedance_from_std(std)
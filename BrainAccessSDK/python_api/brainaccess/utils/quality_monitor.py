@@ -0,0 +1,173 @@
+import threading
+import time
+import typing
+import warnings
+
+import mne  # type: ignore
+import numpy as np
+
+from brainaccess.connect import processor
+from brainaccess.libload import MissingLibrary
+from brainaccess.utils.exceptions import BrainAccessException
+
+# processor.get_signal_quality levels
+QUALITY_BAD = 0
+QUALITY_AMPLITUDE_OK = 1
+QUALITY_GOOD = 2
+
+
+class SignalQualityMonitor:
+    """Checks the signal quality of a running acquisition in the background.
+
+    At a fixed rate the monitor thread copies the last window of samples from
+    the acquisition buffer (EEG.get_tail, cost independent of the recording
+    length), runs processor.get_signal_quality on the EEG channels and
+    publishes the result, so a GUI only reads the latest value and never
+    waits for the computation. When a channel falls below min_quality, or
+    recovers, the recording is annotated.
+    """
+
+    def __init__(
+        self,
+        eeg,
+        window: float = 2.5,
+        interval: float = 1.0,
+        min_quality: int = QUALITY_AMPLITUDE_OK,
+        annotate: bool = True,
+        callback: typing.Optional[typing.Callable[[dict], None]] = None,
+    ) -> None:
+        """
+        Parameters
+        ------------
+        eeg: brainaccess.utils.acquisition.EEG
+            acquisition to monitor, set up and acquiring while running
+        window: float
+            seconds of data per check, get_signal_quality expects 2-3 seconds
+        interval: float
+            seconds between checks
+        min_quality: int
+            channels below this quality level count as degraded
+        annotate: bool
+            annotate the recording when channels degrade or recover
+        callback: Callable, default value = None
+            called from the monitor thread with every new result, see latest
+
+        """
+        if window <= 0 or interval <= 0:
+            raise ValueError("window and interval must be positive")
+        self.eeg = eeg
+        self.window = window
+        self.interval = interval
+        self.min_quality = min_quality
+        self.annotate = annotate
+        self.callback = callback
+        self.checks = 0
+        self._latest: typing.Optional[dict] = None
+        self._degraded: typing.Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Starts the monitor thread, raises BrainAccessException if
+        processor.get_signal_quality has no backend available"""
+        if self.running:
+            return
+        if processor.get_backend("get_signal_quality") == "library" and isinstance(
+            processor._dll, MissingLibrary
+        ):
+            raise BrainAccessException(
+                f"Signal quality unavailable: {processor._dll.error}"
+            )
+        self._stop.clear()
+        self._degraded = set()
+        self._thread = threading.Thread(
+            target=self._run, name="brainaccess-quality-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: typing.Optional[float] = 1.0) -> None:
+        """Stops the monitor thread
+
+        Parameters
+        ------------
+        timeout: float
+            seconds to wait for a running check to finish
+
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self) -> typing.Optional[dict]:
+        """Returns the most recent result without waiting
+
+        Returns
+        --------
+        dict or None
+            None before the first check, otherwise
+            - time: time.time() of the check
+            - quality: channel name to quality level (0, 1 or 2)
+            - degraded: names of channels below min_quality
+        """
+        return self._latest
+
+    def check(self) -> typing.Optional[dict]:
+        """Runs one check on the last window, None if there is not enough data
+
+        Returns
+        --------
+        dict or None
+            result as returned by latest
+        """
+        info = self.eeg.info
+        samples = int(self.window * info["sfreq"])
+        data = self.eeg.get_tail(samples=samples)
+        if data.shape[1] < samples:
+            return None
+        picks = mne.pick_types(info, eeg=True)
+        names = [info["ch_names"][pick] for pick in picks]
+        levels = processor.get_signal_quality(
+            np.ascontiguousarray(data[picks]), sampling_freq=info["sfreq"]
+        )
+        quality = {name: int(level) for name, level in zip(names, levels)}
+        degraded = {name for name in names if quality[name] < self.min_quality}
+        result = {
+            "time": time.time(),
+            "quality": quality,
+            "degraded": [name for name in names if name in degraded],
+        }
+        self._annotate_changes(degraded, names)
+        # replaced as a whole, readers never see a partial result
+        self._latest = result
+        self.checks += 1
+        return result
+
+    def _annotate_changes(self, degraded: typing.Set[str], names: list) -> None:
+        newly_degraded = [name for name in names if name in degraded - self._degraded]
+        recovered = [name for name in names if name in self._degraded - degraded]
+        self._degraded = degraded
+        if not self.annotate:
+            return
+        if newly_degraded:
+            self.eeg.annotate(f"Signal quality degraded: {', '.join(newly_degraded)}")
+        if recovered:
+            self.eeg.annotate(f"Signal quality recovered: {', '.join(recovered)}")
+
+    def _run(self) -> None:
+        next_check = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                result = self.check()
+                if result is not None and self.callback is not None:
+                    self.callback(result)
+            except Exception as e:
+                # keep monitoring, a failed check must not end the recording
+                warnings.warn(f"Signal quality check failed: {e!r}")
+            # fixed rate, a slow check shortens the next wait
+            next_check = max(next_check + self.interval, time.monotonic())
+            self._stop.wait(max(0.0, next_check - time.monotonic()))
@@ -0,0 +1,289 @@
+"""Synthetic EEG stream for running acquisition code without a device"""
+
+import functools
+import threading
+import time
+import typing
+import warnings
+
+import numpy as np
+from scipy import signal
+
+# 1/f (pink) noise filter, -10 dB per decade over three decades of frequency
+_PINK_B = np.array([0.049922035, -0.095993537, 0.050612699, -0.004408786])
+_PINK_A = np.array([1.0, -2.494956002, 2.017265875, -0.522189400])
+
+BLINK_DURATION = 0.3  # seconds
+
+
+@functools.lru_cache(maxsize=1)
+def _pink_gain() -> float:
+    """Standard deviation of the pink filter output for unit white noise"""
+    impulse = np.zeros(1 << 16)
+    impulse[0] = 1.0
+    return float(np.sqrt(np.sum(signal.lfilter(_PINK_B, _PINK_A, impulse) ** 2)))
+
+
+def _weights(
+    ch_names: typing.Optional[typing.Sequence[str]],
+    n_channels: int,
+    prefixes: typing.Sequence[typing.Tuple[str, float]],
+    default: float,
+) -> np.ndarray:
+    """Spatial weight of each channel from the first matching name prefix"""
+    if ch_names is None:
+        return np.ones(n_channels)
+    weights = np.full(n_channels, default)
+    for i, name in enumerate(ch_names):
+        for prefix, weight in prefixes:
+            if name.upper().startswith(prefix):
+                weights[i] = weight
+                break
+    return weights
+
+
+class SyntheticEEG:
+    """Generates continuous EEG-like signals in microvolts, chunk by chunk.
+
+    The signal is the sum of a 1/f background, a waxing and waning alpha
+    rhythm strongest over posterior channels, eye blinks strongest over
+    frontal channels and power line noise. Filter states, phases and blinks
+    carry over from one call to the next, so consecutive chunks join into one
+    continuous signal. Channel names are only used to place alpha and blinks,
+    without them all channels get the same amount of each.
+    """
+
+    def __init__(
+        self,
+        n_channels: int = 32,
+        sfreq: float = 250.0,
+        ch_names: typing.Optional[typing.Sequence[str]] = None,
+        background: float = 10.0,
+        alpha: float = 8.0,
+        alpha_freq: float = 10.0,
+        blink_rate: float = 15.0,
+        blink_amplitude: float = 100.0,
+        line_noise: float = 2.0,
+        line_freq: float = 50.0,
+        seed: typing.Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        ------------
+        n_channels: int
+            number of EEG channels
+        sfreq: float
+            sampling frequency in Hz
+        ch_names: list, default value = None
+            channel names, e.g. from a cap dictionary
+        background: float
+            standard deviation of the 1/f background in microvolts
+        alpha: float
+            mean amplitude of the alpha rhythm in microvolts, 0 disables it
+        alpha_freq: float
+            alpha frequency in Hz
+        blink_rate: float
+            mean number of blinks per minute, 0 disables them
+        blink_amplitude: float
+            peak blink amplitude over frontal channels in microvolts
+        line_noise: float
+            amplitude of the power line noise in microvolts, 0 disables it
+        line_freq: float
+            power line frequency in Hz
+        seed: int, default value = None
+            random seed, the same seed generates the same signal
+
+        """
+        if ch_names is not None and len(ch_names) != n_channels:
+            raise ValueError("ch_names must have n_channels names")
+        self.n_channels = n_channels
+        self.sfreq = sfreq
+        self.background = background
+        self.alpha = alpha
+        self.alpha_freq = alpha_freq
+        self.blink_rate = blink_rate
+        self.blink_amplitude = blink_amplitude
+        self.line_noise = line_noise
+        self.line_freq = line_freq
+        self.rng = np.random.default_rng(seed)
+        # blinks draw from their own generator, so the signal does not depend
+        # on how it is split into chunks
+        self._blink_rng = self.rng.spawn(1)[0]
+        self.alpha_weights = _weights(
+            ch_names, n_channels, [("PO", 1.0), ("O", 1.0), ("P", 0.7)], 0.3
+        )
+        self.blink_weights = _weights(
+            ch_names, n_channels, [("FP", 1.0), ("AF", 0.8), ("F", 0.5)], 0.1
+        )
+        self.blink_shape = np.hanning(max(int(BLINK_DURATION * sfreq), 3))
+        # slow alpha envelope, period between 5 and 15 s per channel
+        self._envelope_freq = self.rng.uniform(1 / 15, 1 / 5, n_channels)
+        self._envelope_phase = self.rng.uniform(0, 2 * np.pi, n_channels)
+        self._line_phase = self.rng.uniform(0, 2 * np.pi, n_channels)
+        self._pink_zi = np.zeros((n_channels, len(_PINK_A) - 1))
+        self._blinks: typing.List[int] = []
+        self._next_blink = self._blink_interval()
+        self.samples = 0
+
+    def _blink_interval(self) -> float:
+        if self.blink_rate <= 0:
+            return np.inf
+        return self._blink_rng.exponential(60.0 * self.sfreq / self.blink_rate)
+
+    def generate(self, n_samples: int) -> np.ndarray:
+        """Generates the next samples of the signal
+
+        Parameters
+        ------------
+        n_samples: int
+            number of samples per channel
+
+        Returns
+        --------
+        np.ndarray
+            signal in microvolts, shape (n_channels, n_samples)
+        """
+        start = self.samples
+        end = start + n_samples
+        data, self._pink_zi = signal.lfilter(
+            _PINK_B,
+            _PINK_A,
+            self.rng.standard_normal((n_samples, self.n_channels)).T,
+            zi=self._pink_zi,
+        )
+        data *= self.background / _pink_gain()
+        t = np.arange(start, end) / self.sfreq
+        if self.alpha:
+            envelope = 1.0 + 0.5 * np.sin(
+                2 * np.pi * self._envelope_freq[:, None] * t
+                + self._envelope_phase[:, None]
+            )
+            data += (self.alpha * self.alpha_weights)[:, None] * envelope * np.sin(
+                2 * np.pi * self.alpha_freq * t
+            )
+        if self.line_noise:
+            data += self.line_noise * np.sin(
+                2 * np.pi * self.line_freq * t + self._line_phase[:, None]
+            )
+        while self._next_blink < end:
+            self._blinks.append(int(self._next_blink))
+            self._next_blink += self._blink_interval()
+        blink = np.zeros(n_samples)
+        length = len(self.blink_shape)
+        for onset in self._blinks:
+            first = max(onset, start)
+            last = min(onset + length, end)
+            blink[first - start : last - start] += self.blink_shape[
+                first - onset : last - onset
+            ]
+        if self._blinks:
+            data += (self.blink_amplitude * self.blink_weights)[:, None] * blink
+        # blinks that ended are not needed for the next chunks
+        self._blinks = [onset for onset in self._blinks if onset + length > end]
+        self.samples = end
+        return data
+
+
+class SyntheticStream:
+    """Calls a chunk callback with synthetic data at the device rate.
+
+    Chunks have the layout of the device stream passed to
+    EEGManager.set_callback_chunk callbacks: a contiguous float64 array with
+    the sample counter in row 0 and the EEG channels in rows 1 to n_channels,
+    passed together with the chunk size. A thread sends one chunk every
+    chunk_size / sfreq seconds on a fixed schedule, so delays of the callback
+    do not accumulate. Dropped chunks are generated but not sent, leaving a
+    gap in the sample counter as lost packets do.
+    """
+
+    def __init__(
+        self,
+        callback: typing.Callable,
+        generator: typing.Optional[SyntheticEEG] = None,
+        chunk_size: int = 10,
+        dropout_rate: float = 0.0,
+        seed: typing.Optional[int] = None,
+    ) -> None:
+        """
+        Parameters
+        ------------
+        callback: Callable
+            function called with (chunk, chunk_size) for every sent chunk
+        generator: SyntheticEEG, default value = None
+            signal source, 32 channels at 250 Hz with default settings if None
+        chunk_size: int
+            samples per chunk
+        dropout_rate: float
+            probability that a chunk is lost
+        seed: int, default value = None
+            random seed of the dropouts
+
+        """
+        self.callback = callback
+        self.generator = generator if generator is not None else SyntheticEEG()
+        self.chunk_size = chunk_size
+        self.dropout_rate = dropout_rate
+        self.rng = np.random.default_rng(seed)
+        self.sent = 0
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def next_chunk(self) -> typing.Optional[np.ndarray]:
+        """Generates the next chunk
+
+        Returns
+        --------
+        np.ndarray or None
+            chunk of shape (n_channels + 1, chunk_size), None if it was dropped
+        """
+        first = self.generator.samples
+        chunk = np.empty((self.generator.n_channels + 1, self.chunk_size))
+        chunk[0] = np.arange(first, first + self.chunk_size)
+        chunk[1:] = self.generator.generate(self.chunk_size)
+        if self.dropout_rate and self.rng.random() < self.dropout_rate:
+            self.dropped += 1
+            return None
+        return chunk
+
+    def send(self) -> None:
+        """Generates the next chunk and passes it to the callback"""
+        chunk = self.next_chunk()
+        if chunk is None:
+            return
+        self.callback(chunk, self.chunk_size)
+        self.sent += 1
+
+    def start(self) -> None:
+        """Starts sending chunks from a background thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="brainaccess-synthetic", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sending chunks"""
+        self._stop.set()
+        if self._thread is not None:
+            # the callback may stop the stream from the stream thread itself
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        period = self.chunk_size / self.generator.sfreq
+        due = time.perf_counter() + period
+        while not self._stop.wait(max(due - time.perf_counter(), 0.0)):
+            try:
+                self.send()
+            except Exception as e:
+                # keep the stream running like the device does
+                warnings.warn(f"Chunk callback failed: {e!r}")
+            due += period
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+import numpy as np
+
+from brainaccess.utils.buffer import GrowableBuffer, RingBuffer
+
+
+def _chunks(rng: np.random.Generator, chans: int, sizes: list) -> list:
+    return [rng.normal(size=(chans, size)) for size in sizes]
+
+
+class TestGrowableBuffer(TestCase):
+    def test_grows_past_initial_capacity(self) -> None:
+        buffer = GrowableBuffer(3, capacity=4)
+        chunks = _chunks(np.random.default_rng(0), 3, [3, 2, 7, 1, 20])
+        for chunk in chunks:
+            buffer.append(chunk)
+        expected = np.concatenate(chunks, axis=1)
+        self.assertEqual(len(buffer), expected.shape[1])
+        # capacity doubles until the data fits
+        self.assertEqual(buffer.capacity, 64)
+        np.testing.assert_array_equal(buffer.view(), expected)
+        np.testing.assert_array_equal(buffer.tail(5), expected[:, -5:])
+        np.testing.assert_array_equal(buffer.tail(100), expected)
+
+    def test_view_does_not_copy(self) -> None:
+        buffer = GrowableBuffer(2, capacity=10)
+        buffer.append(np.ones((2, 4)))
+        self.assertTrue(np.shares_memory(buffer.view(), buffer.tail(2)))
+
+    def test_list_chunks(self) -> None:
+        buffer = GrowableBuffer(2, capacity=1)
+        buffer.append([np.arange(3.0), np.arange(3.0) + 10])
+        np.testing.assert_array_equal(
+            buffer.view(), [[0.0, 1.0, 2.0], [10.0, 11.0, 12.0]]
+        )
+
+    def test_clear_keeps_capacity(self) -> None:
+        buffer = GrowableBuffer(2, capacity=2)
+        buffer.append(np.ones((2, 9)))
+        capacity = buffer.capacity
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.view().shape, (2, 0))
+        self.assertEqual(buffer.capacity, capacity)
+        buffer.append(np.full((2, 3), 2.0))
+        np.testing.assert_array_equal(buffer.view(), np.full((2, 3), 2.0))
+
+
+class TestRingBuffer(TestCase):
+    def setUp(self) -> None:
+        self.buffer = RingBuffer(2, 10)
+        self.written = np.zeros((2, 10))
+
+    def _append(self, chunk: np.ndarray) -> None:
+        self.buffer.append(chunk)
+        self.written = np.concatenate((self.written, chunk), axis=1)
+
+    def test_write_wraps(self) -> None:
+        chunks = _chunks(np.random.default_rng(1), 2, [6, 7])
+        self._append(chunks[0])
+        self.assertEqual(self.buffer.head, 6)
+        # 4 samples fit before the end, 3 go to the start
+        self._append(chunks[1])
+        self.assertEqual(self.buffer.head, 3)
+        np.testing.assert_array_equal(self.buffer.view(), self.written[:, -10:])
+        np.testing.assert_array_equal(self.buffer.oldest(), self.written[:, -10])
+
+    def test_tail_across_wrap(self) -> None:
+        for chunk in _chunks(np.random.default_rng(2), 2, [8, 5]):
+            self._append(chunk)
+        for samples in (1, 3, 4, 9, 10, 20):
+            with self.subTest(samples=samples):
+                tail = self.buffer.tail(samples)
+                np.testing.assert_array_equal(
+                    tail, self.written[:, -min(samples, 10) :]
+                )
+        # a tail before the write head is a view, across the wrap a copy
+        self.assertTrue(np.shares_memory(self.buffer.tail(3), self.buffer._data))
+        self.assertFalse(np.shares_memory(self.buffer.tail(4), self.buffer._data))
+        self.assertFalse(
+            np.shares_memory(self.buffer.tail(3, copy=True), self.buffer._data)
+        )
+
+    def test_chunk_longer_than_window(self) -> None:
+        self._append(_chunks(np.random.default_rng(3), 2, [4])[0])
+        self._append(_chunks(np.random.default_rng(4), 2, [23])[0])
+        self.assertEqual(self.buffer.head, 0)
+        np.testing.assert_array_equal(self.buffer.view(), self.written[:, -10:])
+
+    def test_many_small_writes(self) -> None:
+        for chunk in _chunks(np.random.default_rng(5), 2, [3] * 17):
+            self._append(chunk)
+            np.testing.assert_array_equal(self.buffer.view(), self.written[:, -10:])
+
+    def test_clear(self) -> None:
+        self._append(np.ones((2, 13)))
+        self.buffer.clear()
+        self.assertEqual(self.buffer.head, 0)
+        np.testing.assert_array_equal(self.buffer.view(), np.zeros((2, 10)))
+        self.buffer.append(np.full((2, 2), 3.0))
+        np.testing.assert_array_equal(self.buffer.tail(2), np.full((2, 2), 3.0))
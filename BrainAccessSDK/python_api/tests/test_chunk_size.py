@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+from brainaccess.utils.chunk_size import DEFAULT_TRANSPORT_DELAY, chunk_size_for_latency
+
+
+def _direct(sfreq: float, budget: float, transport: float, limit: int) -> int:
+    """Largest size whose oldest sample is delivered within the budget"""
+    size = 1
+    for candidate in range(1, limit + 1):
+        if (candidate - 1) / sfreq + transport <= budget + 1e-9:
+            size = candidate
+    return size
+
+
+class TestChunkSizeForLatency(TestCase):
+    def test_matches_direct_search(self) -> None:
+        for sfreq in (125.0, 250.0, 500.0, 1000.0):
+            for budget in (0.0, 0.02, 0.021, 0.024, 0.05, 0.1, 0.2537, 0.5, 2.0):
+                for transport in (0.0, DEFAULT_TRANSPORT_DELAY):
+                    with self.subTest(sfreq=sfreq, budget=budget, transport=transport):
+                        self.assertEqual(
+                            chunk_size_for_latency(sfreq, budget, transport),
+                            _direct(sfreq, budget, transport, 250),
+                        )
+
+    def test_exact_multiples_of_the_sample_period(self) -> None:
+        # 0.04 s at 250 Hz is exactly 10 periods, 11 samples fit
+        self.assertEqual(chunk_size_for_latency(250, 0.04, 0.0), 11)
+        self.assertEqual(chunk_size_for_latency(250, 0.06, 0.02), 11)
+
+    def test_limits(self) -> None:
+        self.assertEqual(chunk_size_for_latency(250, 0.001), 1)
+        self.assertEqual(chunk_size_for_latency(250, 10.0), 250)
+        self.assertEqual(chunk_size_for_latency(250, 10.0, max_chunk_size=32), 32)
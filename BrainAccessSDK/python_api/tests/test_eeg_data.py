@@ -0,0 +1,129 @@
+import threading
+from unittest import TestCase, skipIf
+
+import mne
+import numpy as np
+
+try:
+    from brainaccess.utils.acquisition import EEGData, EEGData_roll
+except Exception:
+    # importing brainaccess fails when libbacore cannot be loaded
+    EEGData = EEGData_roll = None
+
+CHANNELS = 4
+SFREQ = 250
+# chunks carry the Sample channel first, info lists it last
+CHANNELS_INDEXES = list(range(1, CHANNELS + 1)) + [0]
+
+
+def _create_info() -> mne.Info:
+    ch_names = [f"EEG{idx}" for idx in range(CHANNELS)] + ["Sample"]
+    ch_types = ["eeg"] * CHANNELS + ["syst"]
+    return mne.create_info(ch_names, ch_types=ch_types, sfreq=SFREQ)
+
+
+def _chunks(rng: np.random.Generator, first: int, sizes: list) -> list:
+    chunks = []
+    for size in sizes:
+        chunk = np.empty((CHANNELS + 1, size))
+        chunk[0] = np.arange(first, first + size)
+        chunk[1:] = rng.normal(size=(CHANNELS, size))
+        chunks.append(chunk)
+        first += size
+    return chunks
+
+
+@skipIf(EEGData is None, "BrainAccess core library not available")
+class TestIncrementalConversion(TestCase):
+    def setUp(self) -> None:
+        self.rng = np.random.default_rng(0)
+        self.data = EEGData(_create_info(), lock=threading.Lock(), zeros_at_start=2)
+
+    def _append(self, first: int, sizes: list) -> None:
+        for chunk in _chunks(self.rng, first, sizes):
+            self.data.append(chunk)
+
+    def _convert(self, incremental: bool) -> np.ndarray:
+        self.data.convert_to_mne(
+            channels_indexes=CHANNELS_INDEXES, incremental=incremental
+        )
+        return self.data.mne_raw.get_data()
+
+    def test_equals_full_conversion(self) -> None:
+        self._append(100, [10, 25])
+        first = self._convert(incremental=True)
+        np.testing.assert_array_equal(first, self._convert(incremental=False))
+        self._append(135, [7, 40, 3])
+        second = self._convert(incremental=True)
+        self.assertEqual(second.shape, (CHANNELS + 1, 2 + 85))
+        np.testing.assert_array_equal(second, self._convert(incremental=False))
+        np.testing.assert_array_equal(second[:, : first.shape[1]], first)
+
+    def test_result_is_read_only(self) -> None:
+        self._append(0, [20])
+        self.data.convert_to_mne(channels_indexes=CHANNELS_INDEXES, incremental=True)
+        data = self.data.mne_raw._data
+        self.assertFalse(data.flags.writeable)
+        with self.assertRaises(ValueError):
+            data[0, 0] = 1.0
+
+    def test_cache_dropped_on_clear(self) -> None:
+        self._append(0, [30, 30])
+        self._convert(incremental=True)
+        self.data.clear()
+        # a new stream, longer than the cached one, must not reuse it
+        self._append(1000, [50, 40])
+        incremental = self._convert(incremental=True)
+        np.testing.assert_array_equal(incremental, self._convert(incremental=False))
+        np.testing.assert_array_equal(incremental[-1, 2:], np.arange(1000, 1090))
+
+    def test_cache_rebuilt_for_other_channel_order(self) -> None:
+        self._append(0, [30])
+        self._convert(incremental=True)
+        self.data.convert_to_mne(incremental=True)
+        np.testing.assert_array_equal(self.data.mne_raw.get_data(), self.data.data)
+
+
+def _direct_onsets(raw: mne.io.BaseRaw, timestamps: list) -> list:
+    """Onset of every annotation found by scanning the Sample channel"""
+    samples = raw.get_data(picks="Sample")[0]
+    onsets = []
+    for timestamp in timestamps:
+        for index, sample in enumerate(samples):
+            if sample == timestamp:
+                onsets.append(index / SFREQ)
+                break
+    return onsets
+
+
+@skipIf(EEGData is None, "BrainAccess core library not available")
+class TestAnnotationAlignment(TestCase):
+    def _record(self, data, first: int, sizes: list) -> None:
+        for chunk in _chunks(np.random.default_rng(1), first, sizes):
+            data.append(chunk)
+
+    def _check(self, data, timestamps: list, **kwargs) -> None:
+        data.annotations = {
+            "annotations": [f"a{idx}" for idx in range(len(timestamps))],
+            "timestamps": timestamps,
+        }
+        data.convert_to_mne(channels_indexes=CHANNELS_INDEXES, **kwargs)
+        raw = data.mne_raw
+        np.testing.assert_allclose(
+            raw.annotations.onset, _direct_onsets(raw, timestamps), atol=1e-9
+        )
+
+    def test_accumulate_with_zeros_at_start(self) -> None:
+        data = EEGData(_create_info(), lock=threading.Lock(), zeros_at_start=5)
+        self._record(data, 500, [20, 30, 80])
+        self._check(data, [500, 517, 612])
+        # onsets relative to the first returned sample
+        self._check(data, [612], samples=50)
+
+    def test_roll_filling_and_full(self) -> None:
+        data = EEGData_roll(_create_info(), lock=threading.Lock(), zeros_at_start=100)
+        self._record(data, 40, [30, 30])
+        self._check(data, [45, 99])
+        self._record(data, 100, [60, 25])
+        self._check(data, [150, 184])
+        self._check(data, [184], samples=20)
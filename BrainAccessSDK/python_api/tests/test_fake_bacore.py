@@ -0,0 +1,242 @@
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import textwrap
+from unittest import TestCase
+
+from brainaccess.libload import FAKE_CORE_VARIABLE
+
+PYTHON_API = pathlib.Path(__file__).resolve().parents[1]
+CAP_NAMES = ["Fp1", "Fp2", "F3", "F4", "C3", "C4", "P3", "P4", "O1", "O2"]
+
+SETUP = f"""
+import json
+import time
+
+import brainaccess.core as bacore
+from brainaccess.core.eeg_manager import EEGManager
+from brainaccess.utils.acquisition import EEG
+
+CAP = dict(enumerate({CAP_NAMES!r}))
+bacore.init()
+fake = bacore._dll
+"""
+
+
+def _run(script: str) -> dict:
+    """Runs script against the fake library, returns the JSON it prints
+
+    A separate interpreter is used, the library is chosen when brainaccess
+    is first imported.
+    """
+    env = dict(os.environ, **{FAKE_CORE_VARIABLE: "1"})
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(PYTHON_API), env.get("PYTHONPATH", "")]
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", SETUP + textwrap.dedent(script)],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestFakeBacore(TestCase):
+    def test_acquisition_end_to_end(self) -> None:
+        result = _run(
+            """
+            eeg = EEG()
+            mgr = EEGManager()
+            eeg.setup(mgr, device_name="BA MAXI", cap=CAP)
+            eeg.start_acquisition()
+            time.sleep(1.0)
+            eeg.annotate("stimulus")
+            time.sleep(0.5)
+            raw = eeg.get_mne()
+            eeg.stop_acquisition()
+            mgr.disconnect()
+            mgr.destroy()
+            eeg.close()
+            print(json.dumps({
+                "library": type(fake).__name__,
+                "ch_names": raw.ch_names,
+                "n_times": int(raw.n_times),
+                "annotations": list(raw.annotations.description),
+                "onset": float(raw.annotations.onset[0]),
+                "packet_loss": int(eeg.get_packet_loss()["missing"]),
+                "std": float(raw.get_data(picks="eeg").std()),
+            }))
+            """
+        )
+        self.assertEqual(result["library"], "FakeBacore")
+        self.assertEqual(
+            result["ch_names"],
+            CAP_NAMES + ["Accel_x", "Accel_y", "Accel_z", "Sample"],
+        )
+        # streamed at the device rate, 250 Hz
+        self.assertGreater(result["n_times"], 300)
+        self.assertLess(result["n_times"], 450)
+        self.assertEqual(result["annotations"], ["stimulus"])
+        self.assertAlmostEqual(result["onset"], 1.0, delta=0.2)
+        self.assertEqual(result["packet_loss"], 0)
+        self.assertGreater(result["std"], 1.0)
+
+    def test_dropouts_are_detected(self) -> None:
+        result = _run(
+            """
+            fake.dropout_rate = 0.2
+            fake.seed = 0
+            eeg = EEG()
+            mgr = EEGManager()
+            eeg.setup(mgr, device_name="BA MAXI", cap=CAP)
+            eeg.start_acquisition()
+            time.sleep(1.0)
+            stream = fake._managers[mgr._manager].stream
+            eeg.stop_acquisition()
+            mgr.destroy()
+            print(json.dumps({
+                "missing": int(eeg.get_packet_loss()["missing"]),
+                "dropped": stream.dropped,
+                "chunk_size": stream.chunk_size,
+            }))
+            """
+        )
+        self.assertGreater(result["dropped"], 0)
+        self.assertEqual(result["missing"], result["dropped"] * result["chunk_size"])
+
+    def test_stream_callbacks(self) -> None:
+        result = _run(
+            """
+            called = []
+            mgr = EEGManager()
+            mgr.connect(0)
+            mgr.load_config()
+            mgr.start_stream(lambda: called.append("start"))
+            mgr.stop_stream(lambda: called.append("stop"))
+            mgr.destroy()
+            print(json.dumps({"called": called}))
+            """
+        )
+        self.assertEqual(result["called"], ["start", "stop"])
+
+
+    def test_annotations_across_gaps(self) -> None:
+        result = _run(
+            """
+            fake.dropout_rate = 0.3
+            fake.seed = 1
+            eeg = EEG()
+            mgr = EEGManager()
+            eeg.setup(mgr, device_name="BA MAXI", cap=CAP)
+            eeg.start_acquisition()
+            time.sleep(1.0)
+            eeg.annotate("stim")
+            time.sleep(0.5)
+            eeg.stop_acquisition()
+            stamps = mgr.get_annotations()["timestamps"]
+            gaps = eeg.gap_detector.gaps
+            raw = eeg.get_mne()
+            mgr.destroy()
+            samples = raw.get_data(picks="Sample")[0]
+            indexes = raw.time_as_index(raw.annotations.onset, use_rounding=True)
+            print(json.dumps({
+                "stamps": [int(stamp) for stamp in stamps],
+                "gaps": [[int(start), int(missing)] for start, missing in gaps],
+                "annotations": list(raw.annotations.description),
+                "samples": [int(samples[i]) for i in indexes],
+                "previous": [int(samples[i - 1]) for i in indexes],
+            }))
+            """
+        )
+        self.assertGreater(len(result["gaps"]), 2)
+        # nothing is dropped as outside of the data
+        self.assertEqual(len(result["annotations"]), len(result["gaps"]) + 1)
+        # annotations are sorted by onset, gap markers stay in gap order
+        markers = list(
+            zip(result["annotations"], result["samples"], result["previous"])
+        )
+        stim = [marker for marker in markers if marker[0] == "stim"]
+        self.assertEqual(len(stim), 1)
+        self.assertEqual(stim[0][1], result["stamps"][0])
+        # gap markers on the first sample after each gap
+        gaps = [marker for marker in markers if marker[0] != "stim"]
+        for (start, missing), (_, sample, previous) in zip(result["gaps"], gaps):
+            self.assertEqual(sample, start + missing)
+            self.assertEqual(previous, start - 1)
+
+    def test_disk_mode_matches_accumulate(self) -> None:
+        result = _run(
+            """
+            import os
+            import tempfile
+
+            import mne
+            import numpy as np
+
+            fake.seed = 0
+            recordings = {}
+            for mode in ("accumulate", "disk"):
+                eeg = EEG(mode=mode, precision="single")
+                mgr = EEGManager()
+                eeg.setup(mgr, device_name="BA MAXI", cap=CAP)
+                if mode == "disk":
+                    eeg.start_acquisition(os.path.join(tempfile.mkdtemp(), "rec"))
+                else:
+                    eeg.start_acquisition()
+                time.sleep(0.6)
+                eeg.annotate("stim")
+                time.sleep(0.4)
+                eeg.stop_acquisition()
+                stamp = mgr.get_annotations()["timestamps"][0]
+                if mode == "disk":
+                    raw = mne.io.read_raw_brainvision(
+                        eeg.data.fname, preload=True, verbose="error"
+                    )
+                else:
+                    raw = eeg.get_mne()
+                mgr.destroy()
+                raw.reorder_channels(list(eeg.info.ch_names))
+                samples = raw.get_data(picks="Sample")[0]
+                index = raw.time_as_index(raw.annotations.onset, use_rounding=True)
+                recordings[mode] = (raw, int(stamp), samples[index].tolist())
+            accumulate, disk = recordings["accumulate"][0], recordings["disk"][0]
+            n_times = min(accumulate.n_times, disk.n_times)
+            print(json.dumps({
+                "ch_names": [accumulate.ch_names, disk.ch_names],
+                "types": [
+                    accumulate.get_channel_types(), disk.get_channel_types()
+                ],
+                "n_times": [int(accumulate.n_times), int(disk.n_times)],
+                "max_difference": float(np.abs(
+                    accumulate.get_data()[:, :n_times]
+                    - disk.get_data()[:, :n_times]
+                ).max()),
+                "annotations": [
+                    list(raw.annotations.description)
+                    for raw, _, _ in recordings.values()
+                ],
+                "stamps": [stamp for _, stamp, _ in recordings.values()],
+                "marked": [marked for _, _, marked in recordings.values()],
+            }))
+            """
+        )
+        accumulate_names, disk_names = result["ch_names"]
+        self.assertEqual(disk_names, accumulate_names)
+        # BrainVision has no system channel type, non EEG channels are misc
+        accumulate_types, disk_types = result["types"]
+        for name, accumulate_type, disk_type in zip(
+            accumulate_names, accumulate_types, disk_types
+        ):
+            expected = "eeg" if accumulate_type == "eeg" else "misc"
+            self.assertEqual(disk_type, expected, name)
+        # the seeded fake streams the same samples in both recordings
+        self.assertGreater(min(result["n_times"]), 200)
+        self.assertEqual(result["max_difference"], 0.0)
+        self.assertEqual(result["annotations"], [["stim"], ["Comment/stim"]])
+        self.assertEqual(result["marked"], [[stamp] for stamp in result["stamps"]])
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase, skipIf
+
+import mne
+import numpy as np
+
+try:
+    from brainaccess.utils.acquisition import EEGData
+except Exception:
+    # importing brainaccess fails when libbacore cannot be loaded
+    EEGData = None
+
+CHANNELS = 32
+SFREQ = 250
+SECONDS = 20
+
+
+def _create_info() -> mne.Info:
+    ch_names = [f"EEG{idx}" for idx in range(CHANNELS)] + ["Sample"]
+    ch_types = ["eeg"] * CHANNELS + ["syst"]
+    return mne.create_info(ch_names, ch_types=ch_types, sfreq=SFREQ)
+
+
+def _create_signal(rng: np.random.Generator) -> np.ndarray:
+    samples = SFREQ * SECONDS
+    eeg = rng.normal(scale=20e-6, size=(CHANNELS, samples))
+    sample_number = np.arange(samples, dtype=np.float64)[np.newaxis]
+    return np.concatenate((eeg, sample_number))
+
+
+@skipIf(EEGData is None, "BrainAccess core library not available")
+class TestPrecision(TestCase):
+    def setUp(self) -> None:
+        self.signal = _create_signal(np.random.default_rng(0))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _record(self, precision: str) -> EEGData:
+        data = EEGData(
+            _create_info(),
+            lock=threading.Lock(),
+            zeros_at_start=0,
+            precision=precision,
+        )
+        for chunk in np.array_split(self.signal, self.signal.shape[1] // 25, axis=1):
+            data.append(chunk)
+        data.convert_to_mne(annotations=False)
+        return data
+
+    def _save(self, data: EEGData, precision: str) -> str:
+        fname = os.path.join(self.tmp_dir.name, f"{precision}_raw.fif")
+        data.save(fname)
+        return fname
+
+    def test_single_precision_halves_buffer_memory(self) -> None:
+        single = self._record("single")
+        double = self._record("double")
+
+        self.assertEqual(np.float32, single.data.dtype)
+        self.assertEqual(np.float64, double.data.dtype)
+        self.assertEqual(double.data.nbytes, 2 * single.data.nbytes)
+
+    def test_single_precision_fif_is_about_half_the_size(self) -> None:
+        single_size = os.path.getsize(self._save(self._record("single"), "single"))
+        double_size = os.path.getsize(self._save(self._record("double"), "double"))
+
+        self.assertAlmostEqual(0.5, single_size / double_size, delta=0.01)
+
+    def test_single_precision_error_is_below_float32_resolution(self) -> None:
+        fname = self._save(self._record("single"), "single")
+        loaded = mne.io.read_raw_fif(fname, preload=True, verbose=False).get_data()
+
+        eeg_error = np.abs(loaded[:CHANNELS] - self.signal[:CHANNELS])
+        resolution = np.finfo(np.float32).eps * np.abs(self.signal[:CHANNELS]).max()
+        self.assertLessEqual(eeg_error.max(), resolution)
+        np.testing.assert_array_equal(self.signal[CHANNELS], loaded[CHANNELS])
+
+    def test_double_precision_is_lossless(self) -> None:
+        fname = self._save(self._record("double"), "double")
+        loaded = mne.io.read_raw_fif(fname, preload=True, verbose=False).get_data()
+
+        np.testing.assert_array_equal(self.signal, loaded)
@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+import numpy as np
+from scipy import signal
+
+from brainaccess.connect.stream_filter import StreamFilter
+from brainaccess.utils.exceptions import BrainAccessException
+
+SFREQ = 250
+
+
+def _single_pass(sos: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Whole signal filtered at once from the steady state of its first sample"""
+    zi = signal.sosfilt_zi(sos)[:, np.newaxis, :] * x[np.newaxis, :, :1]
+    return signal.sosfilt(sos, x, axis=-1, zi=zi)[0]
+
+
+def _chunked(f: StreamFilter, x: np.ndarray, size: int) -> np.ndarray:
+    return np.concatenate(
+        [f.process(x[:, i : i + size]) for i in range(0, x.shape[1], size)], axis=1
+    )
+
+
+class TestStreamFilter(TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.x = rng.normal(size=(4, 1000)) + rng.normal(scale=50.0, size=(4, 1))
+
+    def test_chunks_equal_single_pass(self) -> None:
+        expected = _single_pass(StreamFilter.bandpass(SFREQ, 1.0, 40.0).sos, self.x)
+        for size in (1, 7, self.x.shape[1]):
+            with self.subTest(size=size):
+                f = StreamFilter.bandpass(SFREQ, 1.0, 40.0)
+                np.testing.assert_allclose(_chunked(f, self.x, size), expected)
+
+    def test_reset_restores_initial_state(self) -> None:
+        f = StreamFilter.highpass(SFREQ, 1.0)
+        first = f.process(self.x)
+        f.process(self.x[:, ::-1])
+        f.reset()
+        np.testing.assert_array_equal(f.process(self.x), first)
+
+    def test_chain_equals_filters_in_sequence(self) -> None:
+        bandpass = StreamFilter.bandpass(SFREQ, 1.0, 40.0)
+        notch = StreamFilter.notch(SFREQ, 50.0, 4.0)
+        chained = StreamFilter.chain(bandpass, notch)
+        # starting from zero every filter starts from the zero state
+        x = self.x - self.x[:, :1]
+        sequence = np.concatenate(
+            [
+                notch.process(bandpass.process(x[:, i : i + 7]))
+                for i in range(0, x.shape[1], 7)
+            ],
+            axis=1,
+        )
+        np.testing.assert_allclose(_chunked(chained, x, 7), sequence, atol=1e-9)
+
+    def test_no_transient_for_dc_offset(self) -> None:
+        x = np.full((2, 500), 1000.0)
+        filtered = StreamFilter.bandpass(SFREQ, 1.0, 40.0).process(x)
+        np.testing.assert_allclose(filtered, 0.0, atol=1e-6)
+        # without the initial state the offset rings through the filter
+        sos = StreamFilter.bandpass(SFREQ, 1.0, 40.0).sos
+        self.assertGreater(np.abs(signal.sosfilt(sos, x)).max(), 1.0)
+
+    def test_rejects_channel_change(self) -> None:
+        f = StreamFilter.lowpass(SFREQ, 40.0)
+        f.process(self.x)
+        with self.assertRaises(BrainAccessException):
+            f.process(self.x[:2])
@@ -0,0 +1,102 @@
+import threading
+import time
+from unittest import TestCase
+
+import numpy as np
+from scipy import signal
+
+from brainaccess.utils.sample_gaps import SampleGapDetector
+from brainaccess.utils.synthetic import SyntheticEEG, SyntheticStream
+
+SFREQ = 250.0
+
+
+def _peak(data: np.ndarray, low: float, high: float) -> np.ndarray:
+    freqs, psd = signal.welch(data, fs=SFREQ, nperseg=int(4 * SFREQ))
+    band = (freqs >= low) & (freqs <= high)
+    return psd[..., band].max(axis=-1)
+
+
+class TestSyntheticEEG(TestCase):
+    def test_chunks_join_into_one_signal(self) -> None:
+        whole = SyntheticEEG(n_channels=4, blink_rate=120, seed=3).generate(1000)
+        generator = SyntheticEEG(n_channels=4, blink_rate=120, seed=3)
+        chunked = np.concatenate(
+            [generator.generate(size) for size in (7, 250, 1, 742)], axis=1
+        )
+        np.testing.assert_allclose(chunked, whole, atol=1e-9)
+        self.assertEqual(generator.samples, 1000)
+
+    def test_same_seed_same_signal(self) -> None:
+        np.testing.assert_array_equal(
+            SyntheticEEG(n_channels=2, seed=1).generate(500),
+            SyntheticEEG(n_channels=2, seed=1).generate(500),
+        )
+
+    def test_components(self) -> None:
+        names = ["Fp1", "O1"]
+        data = SyntheticEEG(
+            n_channels=2, sfreq=SFREQ, ch_names=names, blink_rate=0, seed=0
+        ).generate(int(60 * SFREQ))
+        alpha = _peak(data, 9, 11)
+        beta = _peak(data, 20, 30)
+        line = _peak(data, 49, 51)
+        self.assertTrue(np.all(alpha > 5 * beta))
+        self.assertTrue(np.all(line > 4 * beta))
+        # alpha is strongest over occipital channels
+        self.assertGreater(alpha[1], alpha[0])
+        # 1/f background
+        self.assertGreater(_peak(data, 2, 4)[0], _peak(data, 30, 40)[0])
+
+    def test_blinks_over_frontal_channels(self) -> None:
+        data = SyntheticEEG(
+            n_channels=2,
+            ch_names=["Fp1", "O1"],
+            alpha=0,
+            line_noise=0,
+            blink_rate=30,
+            seed=0,
+        ).generate(int(60 * SFREQ))
+        self.assertGreater(np.abs(data[0]).max(), 80)
+        self.assertLess(np.abs(data[1]).max(), 60)
+
+
+class TestSyntheticStream(TestCase):
+    def test_chunk_layout_and_dropouts(self) -> None:
+        chunks = []
+        stream = SyntheticStream(
+            lambda chunk, size: chunks.append(chunk),
+            SyntheticEEG(n_channels=32, seed=0),
+            chunk_size=10,
+            dropout_rate=0.2,
+            seed=0,
+        )
+        for _ in range(200):
+            stream.send()
+        self.assertEqual(len(chunks), stream.sent)
+        self.assertEqual(stream.sent + stream.dropped, 200)
+        self.assertGreater(stream.dropped, 0)
+        self.assertEqual(chunks[0].shape, (33, 10))
+        self.assertTrue(chunks[0].flags["C_CONTIGUOUS"])
+        detector = SampleGapDetector(sample_row=0)
+        for chunk in chunks:
+            detector.check(chunk)
+        self.assertEqual(detector.missing, 10 * stream.dropped)
+
+    def test_real_rate(self) -> None:
+        received = []
+        done = threading.Event()
+
+        def callback(chunk, size) -> None:
+            received.append(size)
+            if sum(received) >= SFREQ / 2:
+                done.set()
+
+        stream = SyntheticStream(callback, chunk_size=25)
+        started = time.perf_counter()
+        stream.start()
+        self.assertTrue(done.wait(2.0))
+        elapsed = time.perf_counter() - started
+        stream.stop()
+        self.assertFalse(stream.running)
+        self.assertGreater(elapsed, 0.4)
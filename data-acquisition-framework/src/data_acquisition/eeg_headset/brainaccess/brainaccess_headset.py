@@ -30,9 +30,12 @@ class BrainAccessHeadset(EEGHeadset, ABC):
 
     def _start(self) -> None:
         self._connect()
-        self._eeg_acquisition.start_acquisition()
+        self._start_acquisition()
         time.sleep(self._after_start_acquisition_delay_secs)
 
+    def _start_acquisition(self) -> None:
+        self._eeg_acquisition.start_acquisition()
+
     @abstractmethod
     def _connect(self) -> None:
         pass
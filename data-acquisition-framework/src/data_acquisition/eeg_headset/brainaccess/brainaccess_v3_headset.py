@@ -1,3 +1,4 @@
+import time
 from logging import Logger
 from pathlib import Path
 from typing import Optional, Sequence
@@ -14,18 +15,27 @@ class BrainAccessV3Headset(BrainAccessHeadset):
         *,
         device_name: str,
         device_channels: Sequence[str],
+        stream_to_disk_dir: Optional[Path] = None,
         debug: bool = False,
         logger: Optional[Logger] = None,
     ) -> None:
+        """
+        :param stream_to_disk_dir: If given, samples are written to a BrainVision
+            file in this directory while recording instead of being kept in memory,
+            and the file is moved next to ``save_path`` on stop.
+        """
         super().__init__(device_channels=device_channels, debug=debug, logger=logger)
 
         self._device_name = device_name
+        self._stream_to_disk_dir = stream_to_disk_dir
         self._was_already_connected = False
 
     def _connect(self) -> None:
         if not self._was_already_connected:
             self._eeg_manager = EEGManager()
-            self._eeg_acquisition = acquisition.EEG()
+            self._eeg_acquisition = acquisition.EEG(
+                mode="accumulate" if self._stream_to_disk_dir is None else "disk"
+            )
 
             device_dict = self._convert_devices_to_dict(self._device_channels)
 
@@ -40,7 +50,21 @@ class BrainAccessV3Headset(BrainAccessHeadset):
             self._eeg_manager, device_name=self._device_name, cap=device_dict
         )
 
+    def _start_acquisition(self) -> None:
+        if self._stream_to_disk_dir is None:
+            self._eeg_acquisition.start_acquisition()
+            return
+
+        scratch_path = self._stream_to_disk_dir / f"recording_{time.time_ns()}.vhdr"
+        self._eeg_acquisition.start_acquisition(str(scratch_path))
+
     def _stop_and_save_at_path_after_delay(self, save_path: Path) -> None:
+        if self._stream_to_disk_dir is not None:
+            self._eeg_acquisition.stop_acquisition()
+            self._eeg_acquisition.data.move(save_path.with_suffix(".vhdr"))
+            self._eeg_manager.clear_annotations()
+            return
+
         self._eeg_acquisition.get_mne()
         self._eeg_acquisition.stop_acquisition()
 
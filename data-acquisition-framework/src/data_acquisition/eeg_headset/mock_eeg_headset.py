@@ -1,22 +1,117 @@
+import threading
 from datetime import datetime
 from logging import Logger
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 from .eeg_headset import EEGHeadset
 
 
 class MockEEGHeadset(EEGHeadset):
-    def __init__(self, *, logger: Optional[Logger] = None) -> None:
+    def __init__(
+        self,
+        *,
+        device_channels: Optional[Sequence[str]] = None,
+        sampling_rate: float = 250.0,
+        chunk_size: int = 10,
+        dropout_rate: float = 0.0,
+        logger: Optional[Logger] = None,
+    ) -> None:
+        """
+        Streams synthetic EEG (1/f background, alpha, blinks, line noise) from
+        ``brainaccess.utils.synthetic`` in chunks at the device rate while
+        running, and saves it as a NumPy ``.npz`` archive. Without the
+        ``synthetic`` extra (brainaccess, numpy, scipy) it only prints when the
+        device would be started, stopped, or annotated.
+
+        :param device_channels: Channel names, 32 unnamed channels if not given.
+        :param sampling_rate: Samples per second of each channel.
+        :param chunk_size: Samples per chunk passed to the chunk callback.
+        :param dropout_rate: Probability that a chunk is lost.
+        """
         super().__init__(debug=False, logger=logger)
 
+        self._device_channels = device_channels
+        self._sampling_rate = sampling_rate
+        self._chunk_size = chunk_size
+        self._dropout_rate = dropout_rate
+        self._stream = None
+        self._chunks: list = []
+        self._annotations: list[tuple[int, str]] = []
+        self._last_sample = 0
+        self._lock = threading.Lock()
+
     def _start(self) -> None:
+        try:
+            from brainaccess.utils.synthetic import SyntheticEEG, SyntheticStream
+        except ImportError as e:
+            self._stream = None
+            self._log_to_console(
+                f"Started EEG acquisition (no synthetic EEG, {e}; "
+                "install the synthetic extra to stream it)"
+            )
+            return
+
+        channels = self._device_channels
+        generator = SyntheticEEG(
+            n_channels=32 if channels is None else len(channels),
+            sfreq=self._sampling_rate,
+            ch_names=channels,
+        )
+        self._chunks = []
+        self._annotations = []
+        self._last_sample = 0
+        self._stream = SyntheticStream(
+            self._on_chunk,
+            generator,
+            chunk_size=self._chunk_size,
+            dropout_rate=self._dropout_rate,
+        )
+        self._stream.start()
+
         self._log_to_console(f"Started EEG acquisition")
 
+    def _on_chunk(self, chunk, chunk_size: int) -> None:
+        with self._lock:
+            self._chunks.append(chunk)
+            self._last_sample = int(chunk[0, -1])
+
     def _stop_and_save_at_path(self, save_path: Path) -> None:
-        self._log_to_console(f"EEG saved at {save_path}")
+        if self._stream is None:
+            self._log_to_console(f"EEG saved at {save_path}")
+            return
+
+        import numpy as np
+
+        self._stream.stop()
+
+        with self._lock:
+            chunks = list(self._chunks)
+        rows = self._stream.generator.n_channels + 1
+        data = np.concatenate(chunks, axis=1) if chunks else np.empty((rows, 0))
+        ch_names = self._device_channels or [
+            f"Ch{idx + 1}" for idx in range(data.shape[0] - 1)
+        ]
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(save_path, "wb") as file:
+            np.savez(
+                file,
+                data=data[1:],
+                sample_numbers=data[0],
+                sampling_rate=self._sampling_rate,
+                ch_names=np.array(ch_names),
+                annotation_samples=np.array([s for s, _ in self._annotations]),
+                annotations=np.array([a for _, a in self._annotations]),
+            )
+
+        self._log_to_console(
+            f"EEG saved at {save_path} ({data.shape[1]} samples, "
+            f"{self._stream.dropped} chunks dropped)"
+        )
 
     def _annotate(self, annotation: str) -> None:
+        # placed at the latest received sample, as the BrainAccess library does
+        self._annotations.append((self._last_sample, annotation))
         self._log_to_console(f"Annotated with {annotation}")
 
     def _log_to_console(self, message: str) -> None:
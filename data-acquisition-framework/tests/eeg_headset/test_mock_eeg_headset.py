@@ -0,0 +1,49 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase, mock, skipIf
+
+from src.data_acquisition.eeg_headset import MockEEGHeadset
+
+try:
+    import brainaccess.utils.synthetic  # noqa: F401
+
+    SYNTHETIC_AVAILABLE = True
+except ImportError:
+    SYNTHETIC_AVAILABLE = False
+
+
+class TestMockEEGHeadset(TestCase):
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._save_path = Path(self._directory.name) / "eeg.npz"
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_logs_only_without_synthetic_extra(self) -> None:
+        headset = MockEEGHeadset()
+
+        with mock.patch.dict(sys.modules, {"brainaccess.utils.synthetic": None}):
+            headset.start()
+        headset.annotate("dummy_annotation")
+        headset.stop_and_save_at_path(self._save_path)
+
+        self.assertFalse(self._save_path.exists())
+
+    @skipIf(not SYNTHETIC_AVAILABLE, "synthetic extra not installed")
+    def test_saves_synthetic_eeg(self) -> None:
+        import numpy as np
+
+        headset = MockEEGHeadset(device_channels=["Fp1", "O1"])
+
+        headset.start()
+        time.sleep(0.2)
+        headset.annotate("dummy_annotation")
+        headset.stop_and_save_at_path(self._save_path)
+
+        saved = np.load(self._save_path)
+        self.assertEqual(saved["data"].shape[0], 2)
+        self.assertGreater(saved["data"].shape[1], 0)
+        self.assertEqual(list(saved["annotations"]), ["dummy_annotation"])
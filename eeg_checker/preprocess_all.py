@@ -0,0 +1,159 @@
+"""Preprocess every recording under data/ in parallel.
+
+Each FIF or BrainVision (.vhdr, disk mode) recording is preprocessed like
+utils.preprocess_data (channel pick, scaling to volts, band-pass and notch
+filter) in a process pool and written
+as a single precision FIF file that mne.io.read_raw_fif reloads directly,
+mirroring the data/ folder structure. Recordings whose output is newer than
+the recording are skipped, and so are the checkpoint segments written next to
+a recording (the *_segments folders).
+
+Usage:
+    python eeg_checker/preprocess_all.py [--data-dir data]
+        [--output-dir data_preprocessed] [--jobs 4] [--force]
+"""
+
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Tuple
+
+import mne
+
+from utils import preprocess_raw
+
+logger = logging.getLogger("eeg_checker")
+
+OUTPUT_SUFFIX = "_preprocessed_raw.fif"
+RECORDING_PATTERNS = ("*.fif", "*.vhdr")
+# checkpoint folders and segment names of brainaccess.utils.checkpoint
+SEGMENTS_SUFFIX = "_segments"
+SEGMENT_PATTERN = "segment_*_raw.fif"
+
+
+def output_path(recording: Path, data_dir: Path, output_dir: Path) -> Path:
+    """Path of the preprocessed file of a recording.
+
+    Args:
+        recording (Path): FIF or BrainVision recording under data_dir.
+        data_dir (Path): Folder with the recordings.
+        output_dir (Path): Folder for the preprocessed files.
+
+    Returns:
+        Path: Output file, same relative folder as the recording.
+    """
+    relative = recording.relative_to(data_dir)
+    name = relative.with_suffix("").name.removesuffix("_raw")
+    return output_dir / relative.parent / f"{name}{OUTPUT_SUFFIX}"
+
+
+def is_current(recording: Path, output: Path) -> bool:
+    """Check whether the output was written after the recording last changed."""
+    return output.exists() and output.stat().st_mtime >= recording.stat().st_mtime
+
+
+def is_checkpoint(recording: Path, data_dir: Path) -> bool:
+    """Check whether a file is a checkpoint segment rather than a recording.
+
+    Args:
+        recording (Path): File under data_dir.
+        data_dir (Path): Folder with the recordings.
+
+    Returns:
+        bool: True for files in a checkpoint folder or named like a segment.
+    """
+    relative = recording.relative_to(data_dir)
+    if any(part.endswith(SEGMENTS_SUFFIX) for part in relative.parent.parts):
+        return True
+    return relative.match(SEGMENT_PATTERN) or relative.name.startswith("partial_")
+
+
+def find_recordings(
+    data_dir: Path, output_dir: Path, force: bool = False
+) -> List[Tuple[Path, Path]]:
+    """Find recordings that need preprocessing.
+
+    Args:
+        data_dir (Path): Folder searched recursively for FIF and BrainVision
+            recordings.
+        output_dir (Path): Folder for the preprocessed files.
+        force (bool): Include recordings whose output is current.
+
+    Returns:
+        List[Tuple[Path, Path]]: Recording and output path pairs.
+    """
+    jobs = []
+    recordings = [
+        recording
+        for pattern in RECORDING_PATTERNS
+        for recording in data_dir.rglob(pattern)
+    ]
+    for recording in sorted(recordings):
+        if output_dir.resolve() in recording.resolve().parents:
+            continue
+        if is_checkpoint(recording, data_dir):
+            continue
+        output = output_path(recording, data_dir, output_dir)
+        if force or not is_current(recording, output):
+            jobs.append((recording, output))
+    return jobs
+
+
+def preprocess_file(recording: Path, output: Path) -> Path:
+    """Preprocess one recording and save it, runs in a worker process.
+
+    Args:
+        recording (Path): FIF or BrainVision recording.
+        output (Path): Output FIF file.
+
+    Returns:
+        Path: The written output file.
+    """
+    raw_data = mne.io.read_raw(recording, preload=True, verbose="error")
+    preprocess_raw(raw_data, n_jobs=1)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    # written under a temporary name so an interrupted run never looks current
+    name = output.name.removesuffix(OUTPUT_SUFFIX)
+    partial = output.with_name(f"{name}_partial_raw.fif")
+    raw_data.save(partial, fmt="single", overwrite=True, verbose="error")
+    os.replace(partial, output)
+    return output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=Path("data"))
+    parser.add_argument("--output-dir", type=Path, default=Path("data_preprocessed"))
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count(), help="number of worker processes"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="also redo recordings with current output"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    mne.set_log_level("error")
+
+    jobs = find_recordings(args.data_dir, args.output_dir, force=args.force)
+    logger.info(f"{len(jobs)} recordings to preprocess in {args.data_dir}")
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {
+            executor.submit(preprocess_file, recording, output): recording
+            for recording, output in jobs
+        }
+        for future in as_completed(futures):
+            recording = futures[future]
+            try:
+                logger.info(f"{recording} -> {future.result()}")
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to preprocess {recording}: {e}")
+    if failed:
+        raise SystemExit(f"{failed} recordings failed")
+
+
+if __name__ == "__main__":
+    main()
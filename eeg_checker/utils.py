@@ -46,14 +46,23 @@ MAX_FREQUENCY = SAMPLING_FREQUENCY // 2
 BANDSTOP_FREQUENCY = np.arange(50, MAX_FREQUENCY, 50)
 
 
-def preprocess_data(file_to_check):
-    data_path = Path.cwd().parent / "data" / file_to_check
-    raw_data = mne.io.read_raw_fif(data_path)
-    raw_data.load_data()
+def _to_volts(data):
+    # scales the whole array in place with one call instead of per channel
+    data *= VOLTS_IN_MICROVOLT
+    return data
 
+
+def preprocess_raw(raw_data, n_jobs=None):
     raw_data.pick(CHANNELS)
-    raw_data.apply_function(fun=lambda x: x * VOLTS_IN_MICROVOLT)
-    raw_data.filter(l_freq=LOWPASS_FREQUENCY, h_freq=HIGHPASS_FREQUENCY)
-    raw_data.notch_filter(BANDSTOP_FREQUENCY)
+    raw_data.apply_function(fun=_to_volts, channel_wise=False)
+    raw_data.filter(l_freq=LOWPASS_FREQUENCY, h_freq=HIGHPASS_FREQUENCY, n_jobs=n_jobs)
+    raw_data.notch_filter(BANDSTOP_FREQUENCY, n_jobs=n_jobs)
 
     return raw_data
+
+
+def preprocess_data(file_to_check):
+    data_path = Path.cwd().parent / "data" / file_to_check
+    raw_data = mne.io.read_raw_fif(data_path, preload=True)
+
+    return preprocess_raw(raw_data)
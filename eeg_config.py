@@ -44,3 +44,45 @@ SAMPLING_RATE = 250
 DATA_FOLDER_PATH = "eeg_data"
 
 USED_DEVICE = BRAINACCESS_HALO_4_CHANNEL
+
+# "accumulate" keeps the recording in memory and saves it as FIF on stop,
+# "disk" streams samples to a BrainVision file (.vhdr/.vmrk/.eeg) while recording
+RECORDING_MODE = "accumulate"
+
+# "single" stores samples as float32 and writes single precision FIF files,
+# "double" uses float64 for both
+SAMPLE_PRECISION = "single"
+
+# Chunks are stored from a separate thread through a queue of this many chunks,
+# so GUI or logging work never stalls the device stream. None stores them
+# directly in the stream callback
+CHUNK_QUEUE_SIZE = 256
+
+# Seconds between background signal quality checks of the last
+# QUALITY_MONITOR_WINDOW seconds while recording, channels that turn bad or
+# recover are annotated in the recording. None disables the monitor
+QUALITY_MONITOR_INTERVAL = 1.0
+QUALITY_MONITOR_WINDOW = 2.5
+
+# In accumulate mode samples and annotations received since the last checkpoint
+# are written every CHECKPOINT_INTERVAL seconds, and at each annotation in
+# CHECKPOINT_ANNOTATIONS, to numbered segment files next to the recording.
+# They are deleted once the recording is saved, after a crash merge them with
+# python -m brainaccess.utils.checkpoint <recording>_segments <recording>_raw.fif
+# None disables checkpoints
+CHECKPOINT_INTERVAL = 60.0
+CHECKPOINT_ANNOTATIONS = ("BREAK_START",)
+
+# Signal streamed by the mock headsets (eeg_headset_mock and --mock-eeg) in
+# MOCK_EEG_CHUNK_SIZE sample chunks at SAMPLING_RATE, like the device does.
+# Amplitudes are in microvolts and the blink rate in blinks per minute,
+# MOCK_EEG_DROPOUT_RATE is the probability that a chunk is lost
+MOCK_EEG_SIGNAL = {
+    "background": 10.0,
+    "alpha": 8.0,
+    "blink_rate": 15.0,
+    "line_noise": 2.0,
+    "line_freq": 50.0,
+}
+MOCK_EEG_CHUNK_SIZE = 10
+MOCK_EEG_DROPOUT_RATE = 0.0
@@ -1,7 +1,10 @@
 # eeg_headset.py
 
 import os
+import queue
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 import numpy as np
 import logging
@@ -30,6 +33,23 @@ class EEGHeadset:
         self._max_attempts = 3
         self._annotations = []
         self._recording_start_time = 0
+        self._recording_start_perf = 0.0
+        self._quality_monitor = None
+        self._checkpointer = None
+        # one writer thread, recordings are saved in the order they were stopped
+        self._save_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="eeg-save"
+        )
+        # cleared while the save thread reads the acquisition buffer
+        self._converted = threading.Event()
+        self._converted.set()
+        # Annotations go to the SDK on the calling (GUI) thread and are
+        # stored and logged by a worker thread
+        self._annotation_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._annotation_worker = threading.Thread(
+            target=self._forward_annotations, name="eeg-annotations", daemon=True
+        )
+        self._annotation_worker.start()
 
         # Create directories for data storage
         self._create_dir_if_not_exist(self._data_folder_path)
@@ -41,11 +61,15 @@ class EEGHeadset:
             import brainaccess.core as bacore
             from brainaccess.core.eeg_manager import EEGManager
             from brainaccess.utils import acquisition
+            from brainaccess.utils.checkpoint import RecordingCheckpointer
+            from brainaccess.utils.quality_monitor import SignalQualityMonitor
             
             self.bacore = bacore
             self.bacore.init(bacore.Version(2, 0, 0))
             self.EEGManager = EEGManager
             self.acquisition = acquisition
+            self.SignalQualityMonitor = SignalQualityMonitor
+            self.RecordingCheckpointer = RecordingCheckpointer
         except ImportError:
             self.logger.error("BrainAccess library not installed. Use pip install brainaccess")
             raise
@@ -61,13 +85,23 @@ class EEGHeadset:
             self.logger.info("Already connected to the headset.")
             return True
 
-        from eeg_config import PORT, USED_DEVICE
+        from eeg_config import (
+            CHUNK_QUEUE_SIZE,
+            PORT,
+            RECORDING_MODE,
+            SAMPLE_PRECISION,
+            USED_DEVICE,
+        )
         self.logger.info(f"Attempting to connect to BrainAccess Halo on port {PORT}...")
 
         while self._connection_attempts < self._max_attempts:
             try:
                 self._eeg_manager = self.EEGManager()
-                self._eeg_acquisition = self.acquisition.EEG()
+                self._eeg_acquisition = self.acquisition.EEG(
+                    mode=RECORDING_MODE,
+                    precision=SAMPLE_PRECISION,
+                    chunk_queue_size=CHUNK_QUEUE_SIZE,
+                )
 
                 # Connect to the headset
                 from eeg_config import DEVICE_NAME
@@ -104,6 +138,8 @@ class EEGHeadset:
 
         if self._is_recording:
             self.stop_recording()
+        self._flush_annotations()
+        self._wait_for_conversion()
 
         try:
             # Stop acquisition if it's running
@@ -145,15 +181,26 @@ class EEGHeadset:
             self.logger.warning("Called start_recording when already recording. Forcing stop of previous one.")
             self.stop_recording()
 
+        # the previous recording must be read before new samples arrive
+        self._wait_for_conversion()
+
         try:
             self.logger.info("Starting EEG data acquisition...")
-            self._eeg_acquisition.start_acquisition()
+            if self._eeg_acquisition.mode == "disk":
+                # Samples are written to disk as they arrive
+                filepath = str(Path(filepath).with_suffix(".vhdr"))
+                self._eeg_acquisition.start_acquisition(filepath)
+            else:
+                self._eeg_acquisition.start_acquisition()
             self._is_recording = True
             self._session_name = os.path.basename(filepath)
             self._filepath = filepath
             self._recording_start_time = time.time()
+            self._recording_start_perf = time.perf_counter()
 
             self._annotate_internal("Recording started")
+            self._start_quality_monitor()
+            self._start_checkpoints()
 
             self.logger.info(f"Recording started: {filepath}")
             return True
@@ -163,53 +210,232 @@ class EEGHeadset:
 
     def stop_recording(self) -> bool:
         """
-        Stop recording and save the data.
+        Stop recording and save the data, waiting until the file is written.
 
         Returns:
             bool: True if data was saved successfully, False otherwise.
         """
+        return self.stop_recording_async().result()
+
+    def stop_recording_async(self) -> Future:
+        """
+        Stop recording and save the data in a background thread.
+
+        Only the stream is stopped before returning. Converting the buffer to
+        MNE, writing and verifying the FIF file happen in the background and
+        are reported to the log; a new recording waits for the conversion.
+
+        Returns:
+            Future: Resolves to True if data was saved and verified, False otherwise.
+        """
         if not self._is_recording:
             self.logger.info("No active recording to stop.")
-            return False
+            return self._completed(False)
 
         try:
+            self._stop_quality_monitor()
             self._annotate_internal("Recording ended")
-
-            self.logger.info("Processing recorded data...")
-            raw_data = self._eeg_acquisition.get_mne()
-
-            if raw_data is not None:
-                self.logger.info(f"Saving EEG data to {self._filepath}")
-                Path(self._filepath).parent.mkdir(parents=True, exist_ok=True)
-                raw_data.save(self._filepath)
-
-                # Also stop the acquisition
+            # the annotation list and checkpoint requests are complete before saving
+            if not self._flush_annotations():
+                self.logger.warning("Annotation queue not drained, last annotations may be missing")
+
+            loss = self._eeg_acquisition.get_packet_loss()
+            self.logger.info(
+                f"Samples lost: {loss['missing']} in {loss['gaps']} gaps "
+                f"({loss['loss_ratio']:.2%})"
+            )
+
+            if self._eeg_acquisition.mode == "disk":
+                # Only the header and markers are left to write
                 self._eeg_acquisition.stop_acquisition()
                 self._eeg_manager.clear_annotations()
-
-                self.logger.info("Recording stopped and data saved successfully.")
-            else:
-                self.logger.warning("No data to save - get_mne() returned None")
-                # Still stop the acquisition even if no data
-                try:
-                    self._eeg_acquisition.stop_acquisition()
-                except:
-                    pass
-                return False
-
-            return True
+                self.logger.info(f"Recording stopped and data saved to {self._filepath}")
+                return self._completed(True)
+
+            checkpointer = self._stop_checkpoints()
+            # the buffer no longer changes once the stream is stopped
+            self._eeg_acquisition.stop_acquisition()
+
+            self.logger.info("Recording stopped, saving in the background.")
+            self._converted.clear()
+            return self._save_executor.submit(
+                self._convert_and_save,
+                self._filepath,
+                self._eeg_acquisition.precision,
+                checkpointer,
+            )
         except Exception as e:
             self.logger.error(f"Error stopping recording: {e}", exc_info=True)
+            # Segments written so far are kept for merging
+            self._stop_checkpoints()
             # Try to stop acquisition even if saving failed
             try:
                 self._eeg_acquisition.stop_acquisition()
             except:
                 pass
-            return False
+            return self._completed(False)
         finally:
             # Always reset the recording state to prevent the experiment from getting stuck
             self._is_recording = False
 
+    def _convert_and_save(
+        self, filepath: str, precision: str, checkpointer: Any = None
+    ) -> bool:
+        """
+        Convert the stopped recording to MNE and save it, runs in the save thread.
+
+        Args:
+            filepath (str): Destination FIF file.
+            precision (str): FIF sample format, "single" or "double".
+            checkpointer (RecordingCheckpointer): Checkpoints of the recording.
+
+        Returns:
+            bool: True if the file was written and reads back complete.
+        """
+        try:
+            self.logger.info("Processing recorded data...")
+            raw_data = self._eeg_acquisition.get_mne()
+            self._eeg_manager.clear_annotations()
+        except Exception as e:
+            self.logger.error(f"Error converting recording: {e}", exc_info=True)
+            return False
+        finally:
+            self._converted.set()
+
+        if raw_data is None:
+            self.logger.warning("No data to save - get_mne() returned None")
+            return False
+        return self._save_raw(raw_data, filepath, precision, checkpointer)
+
+    def _wait_for_conversion(self) -> None:
+        """Block until the save thread has read the last stopped recording."""
+        if not self._converted.is_set():
+            self.logger.info("Waiting for the previous recording to be converted...")
+            self._converted.wait()
+
+    def _save_raw(
+        self, raw_data: Any, filepath: str, precision: str, checkpointer: Any = None
+    ) -> bool:
+        """
+        Write a recording to a FIF file and verify it, runs in the save thread.
+
+        Args:
+            raw_data (mne.io.Raw): Recording to save.
+            filepath (str): Destination FIF file.
+            precision (str): FIF sample format, "single" or "double".
+            checkpointer (RecordingCheckpointer): Checkpoints of the recording,
+                their segment files are deleted once the file is verified.
+
+        Returns:
+            bool: True if the file was written and reads back complete.
+        """
+        import mne
+
+        try:
+            start = time.perf_counter()
+            self.logger.info(
+                f"Saving EEG data to {filepath} "
+                f"({raw_data.n_times} samples, {len(raw_data.ch_names)} channels)"
+            )
+            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+            raw_data.save(filepath, fmt=precision)
+            size_mb = os.path.getsize(filepath) / 1e6
+            self.logger.info(
+                f"Written {size_mb:.1f} MB in {time.perf_counter() - start:.1f}s, verifying..."
+            )
+
+            saved = mne.io.read_raw_fif(filepath, preload=False, verbose="error")
+            if saved.n_times != raw_data.n_times or saved.ch_names != raw_data.ch_names:
+                self.logger.error(
+                    f"Verification failed for {filepath}: expected "
+                    f"{raw_data.n_times} samples, found {saved.n_times}"
+                )
+                return False
+            if checkpointer is not None:
+                checkpointer.remove()
+            self.logger.info("Recording stopped and data saved successfully.")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving recording to {filepath}: {e}", exc_info=True)
+            return False
+
+    @staticmethod
+    def _completed(result: bool) -> Future:
+        """Future that is already resolved to result."""
+        future = Future()
+        future.set_result(result)
+        return future
+
+
+    def get_signal_quality(self) -> Optional[Dict[str, Any]]:
+        """
+        Latest result of the background signal quality monitor, never blocks.
+
+        Returns:
+            Optional[Dict[str, Any]]: None before the first check, otherwise the
+            check time, the quality level (0 bad, 1 amplitude ok, 2 good) of each
+            channel and the names of degraded channels.
+        """
+        if self._quality_monitor is None:
+            return None
+        return self._quality_monitor.latest()
+
+    def _start_quality_monitor(self) -> None:
+        """Starts checking signal quality in the background if configured."""
+        from eeg_config import QUALITY_MONITOR_INTERVAL, QUALITY_MONITOR_WINDOW
+
+        if QUALITY_MONITOR_INTERVAL is None:
+            return
+        self._quality_monitor = self.SignalQualityMonitor(
+            self._eeg_acquisition,
+            window=QUALITY_MONITOR_WINDOW,
+            interval=QUALITY_MONITOR_INTERVAL,
+            callback=self._log_quality_change,
+        )
+        self._degraded_channels = []
+        try:
+            self._quality_monitor.start()
+        except Exception as e:
+            # e.g. no bci connect library, the recording works without the monitor
+            self.logger.warning(f"Signal quality monitor not started: {e}")
+            self._quality_monitor = None
+
+    def _stop_quality_monitor(self) -> None:
+        """Stops the background signal quality monitor if it is running."""
+        if self._quality_monitor is not None:
+            self._quality_monitor.stop()
+
+    def _start_checkpoints(self) -> None:
+        """Starts writing crash-safe segment files of the recording if configured."""
+        from eeg_config import CHECKPOINT_INTERVAL
+
+        if CHECKPOINT_INTERVAL is None or self._eeg_acquisition.mode != "accumulate":
+            self._checkpointer = None
+            return
+        segment_dir = Path(self._filepath).with_suffix("").as_posix() + "_segments"
+        self._checkpointer = self.RecordingCheckpointer(
+            self._eeg_acquisition, segment_dir, interval=CHECKPOINT_INTERVAL
+        )
+        self._checkpointer.start()
+        self.logger.info(f"Checkpoints every {CHECKPOINT_INTERVAL}s to {segment_dir}")
+
+    def _stop_checkpoints(self) -> Any:
+        """Stops checkpoints without writing the rest, the full recording follows."""
+        checkpointer, self._checkpointer = self._checkpointer, None
+        if checkpointer is not None:
+            checkpointer.stop(final=False)
+        return checkpointer
+
+    def _log_quality_change(self, result: Dict[str, Any]) -> None:
+        """Logs channels whose signal quality changed, runs in the monitor thread."""
+        if result["degraded"] != self._degraded_channels:
+            self._degraded_channels = result["degraded"]
+            if self._degraded_channels:
+                self.logger.warning(
+                    f"Poor signal quality: {', '.join(self._degraded_channels)}"
+                )
+            else:
+                self.logger.info("Signal quality good on all channels")
 
     def annotate(self, annotation: str) -> None:
         """
@@ -224,20 +450,58 @@ class EEGHeadset:
         """
         Internal method to add an annotation to the EEG data.
 
+        The SDK stamps the annotation with the latest sample when it is called,
+        so it is called right away; storing, checkpoint requests and logging
+        are left to a worker thread, so they do not delay stimulus presentation.
+
         Args:
             annotation (str): Annotation text to add.
         """
         if not self._is_connected:
             self.logger.warning(f"Cannot annotate '{annotation}': Not connected to the headset.")
             return
-
+        timestamp = (
+            time.perf_counter() - self._recording_start_perf if self._is_recording else 0
+        )
         try:
-            timestamp = time.time() - self._recording_start_time if self._is_recording else 0
             self._eeg_acquisition.annotate(annotation)
-            self._annotations.append({"timestamp": timestamp, "annotation": annotation})
-            self.logger.info(f"Annotation added: '{annotation}' at {timestamp:.2f}s")
         except Exception as e:
-            self.logger.error(f"Error adding annotation: {str(e)}")
+            self.logger.error(f"Error adding annotation '{annotation}': {str(e)}")
+            return
+        self._annotation_queue.put((timestamp, annotation))
+
+    def _flush_annotations(self, timeout: float = 1.0) -> bool:
+        """
+        Wait until every queued annotation was stored and logged.
+
+        Args:
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the queue was drained.
+        """
+        drained = threading.Event()
+        self._annotation_queue.put(drained)
+        return drained.wait(timeout)
+
+    def _forward_annotations(self) -> None:
+        """
+        Worker loop storing, logging and checkpointing annotations already
+        passed to the SDK.
+        """
+        from eeg_config import CHECKPOINT_ANNOTATIONS
+
+        while True:
+            item = self._annotation_queue.get()
+            if isinstance(item, threading.Event):
+                # flush requests are answered once everything before them is done
+                item.set()
+                continue
+            timestamp, annotation = item
+            self._annotations.append({"timestamp": timestamp, "annotation": annotation})
+            if self._checkpointer is not None and annotation in CHECKPOINT_ANNOTATIONS:
+                self._checkpointer.request()
+            self.logger.info(f"Annotation added: '{annotation}' at {timestamp:.4f}s")
 
     def is_recording(self) -> bool:
         """Check if the headset is recording data"""
@@ -3,16 +3,53 @@ eeg_headset_mock.py
 
 A mock version of the EEG headset that simulates the functionality without requiring
 the actual BrainAccess library. This allows the application to run on ARM64 systems
-until the proper ARM64 library is available.
+until the proper ARM64 library is available. While recording, synthetic 32-channel
+EEG is streamed in chunks at the device rate through a chunk callback, like the real
+headset delivers it, and saved as a FIF file of the full session in a background
+thread. Without brainaccess.utils.synthetic the recording is only logged.
 """
 
 import os
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 import numpy as np
 import logging
 from pathlib import Path
 
+def synthetic_stream(callback):
+    """
+    Create a synthetic EEG stream configured in eeg_config.
+
+    Args:
+        callback (Callable): Called with (chunk, chunk_size) from the stream
+            thread, the chunk has the sample counter in row 0 and the EEG
+            channels in microvolts in the following rows.
+
+    Returns:
+        SyntheticStream: Stream sending chunks once started.
+
+    Raises:
+        ImportError: If brainaccess.utils.synthetic is not available.
+    """
+    from brainaccess.utils.synthetic import SyntheticEEG, SyntheticStream
+    from eeg_config import (
+        MOCK_EEG_CHUNK_SIZE,
+        MOCK_EEG_DROPOUT_RATE,
+        MOCK_EEG_SIGNAL,
+        SAMPLING_RATE,
+        channels,
+    )
+
+    generator = SyntheticEEG(
+        n_channels=len(channels), sfreq=SAMPLING_RATE, ch_names=channels, **MOCK_EEG_SIGNAL
+    )
+    return SyntheticStream(
+        callback, generator, chunk_size=MOCK_EEG_CHUNK_SIZE, dropout_rate=MOCK_EEG_DROPOUT_RATE
+    )
+
+
 class EEGHeadset:
     """
     Mock version of EEG headset interface that simulates connection and data acquisition
@@ -37,6 +74,14 @@ class EEGHeadset:
         self._max_attempts = 3
         self._annotations = []
         self._recording_start_time = 0
+        self._stream = None
+        self._first_annotation = 0
+        self._chunks: List[np.ndarray] = []
+        self._last_sample = 0
+        self._chunk_lock = threading.Lock()
+        self._save_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="eeg-save"
+        )
 
         # Create directories for data storage
         self._create_dir_if_not_exist(self._data_folder_path)
@@ -100,6 +145,17 @@ class EEGHeadset:
 
         try:
             self.logger.info("Starting EEG data acquisition... (mock)")
+            with self._chunk_lock:
+                self._chunks = []
+                self._last_sample = 0
+            self._first_annotation = len(self._annotations)
+            try:
+                self._stream = synthetic_stream(self._store_chunk)
+            except ImportError as e:
+                self._stream = None
+                self.logger.warning(f"No synthetic EEG ({e}), the recording is only logged (mock)")
+            else:
+                self._stream.start()
             self._is_recording = True
             self._session_name = os.path.basename(filepath)
             self._filepath = filepath
@@ -115,79 +171,150 @@ class EEGHeadset:
 
     def stop_recording(self) -> bool:
         """
-        Mock stop recording and save simulated data.
+        Mock stop recording and save simulated data, waiting until the file is written.
 
         Returns:
             bool: True if data was saved successfully, False otherwise.
         """
+        return self.stop_recording_async().result()
+
+    def stop_recording_async(self) -> Future:
+        """
+        Mock stop recording and save the simulated data in a background thread.
+
+        Only the stream is stopped before returning. Converting the received
+        chunks to MNE and writing the FIF file happen in the background and are
+        reported to the log.
+
+        Returns:
+            Future: Resolves to True if data was saved successfully, False otherwise.
+        """
         if not self._is_recording:
             self.logger.info("No active recording to stop.")
-            return False
+            return self._completed(False)
 
         try:
             self._annotate_internal("Recording ended (mock)")
+            if self._stream is None:
+                self.logger.info(f"Recording stopped, nothing saved to {self._filepath} without synthetic EEG (mock)")
+                return self._completed(True)
+            self._stream.stop()
+            if self._stream.dropped:
+                self.logger.warning(
+                    f"Packet loss: {self._stream.dropped} of "
+                    f"{self._stream.dropped + self._stream.sent} chunks dropped (mock)"
+                )
+
+            # the next recording starts with new lists
+            with self._chunk_lock:
+                chunks = self._chunks
+            annotations = self._annotations[self._first_annotation:]
+
+            from eeg_config import SAMPLE_PRECISION
+            self.logger.info("Recording stopped, saving in the background. (mock)")
+            return self._save_executor.submit(
+                self._convert_and_save, chunks, annotations, self._filepath, SAMPLE_PRECISION
+            )
+        except Exception as e:
+            self.logger.error(f"Error stopping recording: {e}", exc_info=True)
+            return self._completed(False)
+        finally:
+            # Always reset the recording state to prevent the experiment from getting stuck
+            self._is_recording = False
+
+    def _convert_and_save(
+        self, chunks: List[np.ndarray], annotations: List[Dict[str, Any]], filepath: str, precision: str
+    ) -> bool:
+        """
+        Convert the received chunks to MNE and save them, runs in the save thread.
+
+        Args:
+            chunks (List[np.ndarray]): Chunks received during the recording.
+            annotations (List[Dict[str, Any]]): Annotations of the recording.
+            filepath (str): Destination FIF file.
+            precision (str): FIF sample format, "single" or "double".
 
+        Returns:
+            bool: True if the file was written.
+        """
+        try:
             self.logger.info("Processing recorded data... (mock)")
-            
-            # Generate simulated EEG data
-            from eeg_config import SAMPLING_RATE
-            duration = 10  # seconds of simulated data
-            n_channels = len([ch for ch in range(32)])  # Using the channel count from config
-            n_samples = duration * SAMPLING_RATE
-            
-            # Create mock EEG data (random noise with some structure)
-            mock_data = np.random.normal(0, 10, (n_channels, n_samples)).astype(np.float32)
-            
-            # Add some simulated signal patterns
-            t = np.linspace(0, duration, n_samples)
-            for i in range(min(n_channels, 4)):  # Add alpha waves to first 4 channels
-                mock_data[i, :] += 5 * np.sin(2 * np.pi * 10 * t)  # 10Hz alpha waves
-            
-            # Create a mock MNE Raw object-like structure
-            class MockRaw:
-                def __init__(self, data, sfreq, ch_names):
-                    self.data = data
-                    self.info = {'sfreq': sfreq}
-                    self.ch_names = ch_names
-                
-                def save(self, fname):
-                    # Save the mock data to the specified file
-                    import pickle
-                    mock_data_dict = {
-                        'data': self.data,
-                        'sfreq': self.info['sfreq'],
-                        'ch_names': self.ch_names,
-                        'annotations': getattr(self, '_annotations', [])
-                    }
-                    Path(fname).parent.mkdir(parents=True, exist_ok=True)
-                    with open(fname, 'wb') as f:
-                        pickle.dump(mock_data_dict, f)
-                    self.logger.info(f"Mock EEG data saved to {fname}")
-            
-            # Create mock raw object with channel names from config
-            from eeg_config import channels
-            ch_names = channels[:n_channels]  # Use appropriate number of channels
-            raw_data = MockRaw(mock_data, SAMPLING_RATE, ch_names)
-            raw_data._annotations = self._annotations
-            raw_data.logger = self.logger
-
-            if raw_data is not None:
-                self.logger.info(f"Saving mock EEG data to {self._filepath}")
-                raw_data.save(self._filepath)
-
-                self.logger.info("Recording stopped and mock data saved successfully.")
-            else:
-                self.logger.warning("No data to save - get_mne() returned None")
+            raw_data = self._get_mne(chunks, annotations)
+            if raw_data is None:
+                self.logger.warning("No data to save - no chunks were received")
                 return False
 
+            self.logger.info(f"Saving mock EEG data to {filepath}")
+            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+            raw_data.save(filepath, fmt=precision, overwrite=True, verbose="error")
+            self.logger.info(
+                f"Mock data saved successfully "
+                f"({raw_data.n_times} samples, {len(raw_data.ch_names)} channels)."
+            )
             return True
         except Exception as e:
-            self.logger.error(f"Error stopping recording: {e}", exc_info=True)
+            self.logger.error(f"Error saving recording: {e}", exc_info=True)
             return False
-        finally:
-            # Always reset the recording state to prevent the experiment from getting stuck
-            self._is_recording = False
 
+    @staticmethod
+    def _completed(result: bool) -> Future:
+        """Future that is already resolved to result."""
+        future = Future()
+        future.set_result(result)
+        return future
+
+    def _store_chunk(self, chunk: np.ndarray, chunk_size: int) -> None:
+        """
+        Chunk callback of the synthetic stream, keeps the chunk in memory.
+
+        Args:
+            chunk (np.ndarray): Sample counter and EEG channels, shape (33, chunk_size).
+            chunk_size (int): Number of samples in the chunk.
+        """
+        with self._chunk_lock:
+            self._chunks.append(chunk)
+            self._last_sample = int(chunk[0, -1])
+
+    def _get_mne(self, chunks: List[np.ndarray], annotations: List[Dict[str, Any]]):
+        """
+        Convert received chunks to an MNE Raw object laid out like the real recording.
+
+        Args:
+            chunks (List[np.ndarray]): Chunks with the sample counter in row 0.
+            annotations (List[Dict[str, Any]]): Annotations placed at a sample.
+
+        Returns:
+            mne.io.RawArray: EEG channels followed by the Sample channel, None without data.
+        """
+        import mne
+        from eeg_config import SAMPLING_RATE, channels
+
+        if not chunks:
+            return None
+        data = np.concatenate(chunks, axis=1)
+        info = mne.create_info(
+            list(channels) + ["Sample"], SAMPLING_RATE, ch_types=["eeg"] * len(channels) + ["syst"]
+        )
+        raw_data = mne.io.RawArray(np.roll(data, -1, axis=0), info, verbose="error")
+        # lost chunks leave gaps in the sample counter, not in the data
+        positions = np.searchsorted(data[0], [annotation["sample"] for annotation in annotations])
+        raw_data.set_annotations(
+            mne.Annotations(
+                positions / SAMPLING_RATE,
+                np.zeros(len(annotations)),
+                [annotation["annotation"] for annotation in annotations],
+            )
+        )
+        return raw_data
+
+    def get_signal_quality(self) -> Optional[Dict[str, Any]]:
+        """
+        Mock signal quality, no quality monitor runs without a headset.
+
+        Returns:
+            Optional[Dict[str, Any]]: Always None.
+        """
+        return None
 
     def annotate(self, annotation: str) -> None:
         """
@@ -211,8 +338,10 @@ class EEGHeadset:
 
         try:
             timestamp = time.time() - self._recording_start_time if self._is_recording else 0
-            # In mock, we just store the annotation
-            self._annotations.append({"timestamp": timestamp, "annotation": annotation})
+            # placed at the latest received sample, as the BrainAccess library does
+            self._annotations.append(
+                {"timestamp": timestamp, "annotation": annotation, "sample": self._last_sample}
+            )
             self.logger.info(f"Annotation added: '{annotation}' at {timestamp:.2f}s")
         except Exception as e:
             self.logger.error(f"Error adding annotation: {str(e)}")
@@ -9,6 +9,7 @@ from typing import List, Dict, Optional
 import time
 import json
 import dataclasses
+from concurrent.futures import Future
 from datetime import datetime
 from gui import ExperimentGUI
 from audio_manager import AudioManager
@@ -19,21 +20,45 @@ class MockEEGHeadset:
     def __init__(self, logger):
         self.logger = logger
         self.recording = False
+        self.stream = None
+        self.samples = 0
 
     def connect(self):
         self.logger.info("[MOCK EEG] Connected")
         return True
 
     def start_recording(self, filepath):
+        from eeg_headset_mock import synthetic_stream
+
+        # synthetic chunks are streamed and counted so the experiment runs
+        # under the load of a real recording, nothing is saved
+        self.samples = 0
+        self.stream = synthetic_stream(self._count_chunk)
+        self.stream.start()
         self.recording = True
         self.logger.info(f"[MOCK EEG] Started recording: {filepath}")
         return True
 
+    def _count_chunk(self, chunk, chunk_size):
+        self.samples += chunk_size
+
     def stop_recording(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.logger.info(
+                f"[MOCK EEG] Received {self.samples} samples, "
+                f"{self.stream.dropped} chunks dropped"
+            )
+            self.stream = None
         self.recording = False
         self.logger.info("[MOCK EEG] Stopped recording")
         return True
 
+    def stop_recording_async(self):
+        future = Future()
+        future.set_result(self.stop_recording())
+        return future
+
     def annotate(self, annotation):
         self.logger.info(f"[MOCK EEG] Annotation: {annotation}")
 
@@ -66,6 +91,8 @@ class EEG2TextExperiment:
 
         self.trial_data: List[Dict] = []
         self.eeg = None
+        # Pending background save of the EEG recording
+        self.eeg_save: Optional[Future] = None
         self.is_cleaned_up = False
         self.initialize_eeg()
 
@@ -377,7 +404,9 @@ class EEG2TextExperiment:
 
             self.eeg.annotate("EXPERIMENT_END")
             self.save_data()
-            self.gui.show_completion()
+            # EEG file is written while the completion screen is shown
+            self.eeg_save = self.eeg.stop_recording_async()
+            self.gui.show_completion(self.eeg_save)
 
         except Exception as e:
             self.logger.error(f"Critical error: {e}", exc_info=True)
@@ -405,5 +434,9 @@ class EEG2TextExperiment:
         self.logger.info("Cleaning up...")
         if self.eeg:
             if self.eeg.is_recording(): self.eeg.stop_recording()
+            if self.eeg_save is not None:
+                self.logger.info("Waiting for EEG data to be saved...")
+                if not self.eeg_save.result():
+                    self.logger.error("EEG data was not saved correctly, check the log above.")
             if hasattr(self.eeg, 'disconnect'): self.eeg.disconnect()
         if hasattr(self, 'gui') and self.gui: self.gui.close()
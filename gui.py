@@ -315,7 +315,9 @@ class ExperimentGUI:
         time.sleep(2.0)
         self.clear()
 
-    def show_completion(self):
+    def show_completion(self, save_future=None):
+        """Shows the end screen; with save_future, the EEG save status is
+        updated on screen once the background save finishes."""
         self.clear()
         self.canvas.configure(bg='#E8F5E9')
 
@@ -328,19 +330,40 @@ class ExperimentGUI:
             justify='center'
         )
 
-        self.canvas.create_text(
+        saving = save_future is not None and not save_future.done()
+        status = self._save_status(save_future)
+        status_text = self.canvas.create_text(
             self.screen_width // 2,
             self.screen_height // 2 + 50,
-            text="Dziękujemy za Twój udział!\n\nDane EEG zostały zapisane.\n\nNaciśnij SPACJĘ by wyjść.",
+            text=status,
             font=self.instruction_font,
             fill='black',
             justify='center'
         )
 
+        def poll_save():
+            if not save_future.done():
+                self.root.after(200, poll_save)
+                return
+            self.canvas.itemconfigure(status_text, text=self._save_status(save_future))
+
+        if saving:
+            self.root.after(200, poll_save)
+
         self.root.update()
         self.wait_for_space()
         self.canvas.configure(bg=self.bg_color)
 
+    @staticmethod
+    def _save_status(save_future) -> str:
+        if save_future is None or (save_future.done() and save_future.result()):
+            eeg_status = "Dane EEG zostały zapisane."
+        elif save_future.done():
+            eeg_status = "Błąd zapisu danych EEG - sprawdź log."
+        else:
+            eeg_status = "Trwa zapisywanie danych EEG..."
+        return f"Dziękujemy za Twój udział!\n\n{eeg_status}\n\nNaciśnij SPACJĘ by wyjść."
+
     def _on_key_press(self, event, valid_keys):
         if event.keysym.lower() in valid_keys:
             self.key_pressed = event.keysym